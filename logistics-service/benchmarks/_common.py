@@ -0,0 +1,92 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks talk to the database configured in Settings (POSTGRES_* variables), so
+point them at a disposable database; each script documents what it creates.
+"""
+import argparse
+import datetime
+import json
+import statistics
+import subprocess
+import time
+from contextlib import contextmanager
+from typing import Iterator, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.logistics.core.config import settings
+
+
+def make_engine(**kwargs) -> AsyncEngine:
+    return create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI), **kwargs)
+
+
+def base_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON instead of a table")
+    return parser
+
+
+@contextmanager
+def timer() -> Iterator[list]:
+    """Yields a one-element list that holds the elapsed seconds once the block exits."""
+    elapsed = [0.0]
+    start = time.perf_counter()
+    try:
+        yield elapsed
+    finally:
+        elapsed[0] = time.perf_counter() - start
+
+
+def percentiles(samples: Sequence[float]) -> dict:
+    """p50/p95/p99 and mean of latency samples given in seconds, reported in milliseconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(pick(0.50), 3),
+        "p95_ms": round(pick(0.95), 3),
+        "p99_ms": round(pick(0.99), 3),
+    }
+
+
+def report(rows: list[dict], as_json: bool) -> None:
+    """Prints one result row per line as an aligned table, or the whole list as JSON."""
+    if as_json:
+        print(json.dumps(rows, indent=2, default=str))
+        return
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    widths = {c: max(len(c), *(len(str(row.get(c, ""))) for row in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns))
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit (with "-dirty" for local changes), or "unknown"."""
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(path: str, benchmark: str, args: argparse.Namespace, rows: list[dict]) -> None:
+    """Writes a JSON results file tagged with the commit, so runs can be diffed across commits."""
+    document = {
+        "benchmark": benchmark,
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "args": {k: v for k, v in vars(args).items() if k not in ("json", "output")},
+        "results": rows,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, default=str)
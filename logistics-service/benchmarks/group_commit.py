@@ -0,0 +1,112 @@
+"""
+Throughput and latency of POST /api/v1/orders/ with and without group commit.
+
+Fires --requests orders from --concurrency concurrent clients in-process (httpx ASGI
+transport) once on the direct path, then once per ORDER_GROUP_COMMIT_WAIT_MS x
+ORDER_GROUP_COMMIT_MAX_BATCH combination. Longer windows and larger batches mean fewer
+commits (higher throughput) at the cost of each order waiting for its batch to close.
+Seeds its own products (named "bench-group-*") and deletes them and its orders afterwards.
+
+    uv run python -m benchmarks.group_commit --requests 2000 --concurrency 64 --wait-ms 1 5 20 --max-batch 16 100
+"""
+import asyncio
+import logging
+import time
+import uuid
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, insert
+
+from benchmarks._common import base_parser, percentiles, report, timer
+from src.logistics.db.session import AsyncSessionLocal, engine
+from src.logistics.main import app
+from src.logistics.models.order import Order, OrderItem
+from src.logistics.models.product import Product
+from src.logistics.services.order_batcher import BATCH_SIZE, OrderBatcher
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+async def seed_products(count: int) -> list[uuid.UUID]:
+    ids = [uuid.uuid4() for _ in range(count)]
+    async with AsyncSessionLocal() as session, session.begin():
+        await session.execute(insert(Product), [
+            {"id": pid, "name": f"bench-group-{pid}", "price": 9.99, "stock_quantity": 10_000_000}
+            for pid in ids
+        ])
+    return ids
+
+
+async def cleanup(product_ids: list[uuid.UUID], order_ids: list[str]) -> None:
+    async with AsyncSessionLocal() as session, session.begin():
+        await session.execute(delete(OrderItem).where(OrderItem.product_id.in_(product_ids)))
+        await session.execute(delete(Order).where(Order.id.in_(order_ids)))
+        await session.execute(delete(Product).where(Product.id.in_(product_ids)))
+
+
+async def run(client: AsyncClient, product_ids: list[uuid.UUID], args, order_ids: list[str]) -> dict:
+    latency: list[float] = []
+    counter = iter(range(args.requests))
+
+    async def worker() -> None:
+        for n in counter:
+            items = [
+                {"product_id": str(product_ids[(n + i) % len(product_ids)]), "quantity": 1}
+                for i in range(args.items)
+            ]
+            with timer() as elapsed:
+                response = await client.post("/api/v1/orders/", json={"items": items})
+            response.raise_for_status()
+            latency.append(elapsed[0])
+            order_ids.append(response.json()["id"])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    wall = time.perf_counter() - started
+    return {"orders_per_s": round(len(latency) / wall, 1), **percentiles(latency)}
+
+
+async def main() -> None:
+    parser = base_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--items", type=int, default=3, help="Order lines per order")
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--wait-ms", type=float, nargs="+", default=[1.0, 5.0, 20.0])
+    parser.add_argument("--max-batch", type=int, nargs="+", default=[16, 100])
+    args = parser.parse_args()
+
+    product_ids = await seed_products(args.products)
+    order_ids: list[str] = []
+    rows = []
+
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            app.state.order_batcher = None
+            rows.append({"mode": "direct", "wait_ms": "", "max_batch": "", "mean_batch": "",
+                         **await run(client, product_ids, args, order_ids)})
+
+            for wait_ms in args.wait_ms:
+                for max_batch in args.max_batch:
+                    batcher = OrderBatcher(AsyncSessionLocal, max_batch_size=max_batch, max_wait_seconds=wait_ms / 1000)
+                    batcher.start()
+                    app.state.order_batcher = batcher
+                    batches_before, orders_before = BATCH_SIZE.count(), BATCH_SIZE.sum()
+                    try:
+                        result = await run(client, product_ids, args, order_ids)
+                    finally:
+                        await batcher.stop()
+                        app.state.order_batcher = None
+                    batches = BATCH_SIZE.count() - batches_before
+                    mean_batch = round((BATCH_SIZE.sum() - orders_before) / batches, 1) if batches else 0
+                    rows.append({"mode": "group", "wait_ms": wait_ms, "max_batch": max_batch,
+                                 "mean_batch": mean_batch, **result})
+    finally:
+        await cleanup(product_ids, order_ids)
+        await engine.dispose()
+
+    report(rows, args.json)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
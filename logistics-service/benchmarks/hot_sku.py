@@ -0,0 +1,101 @@
+"""
+Order throughput on a single hot product, unsharded vs sharded stock.
+
+Every order buys one unit of the same product, so on the unsharded path all of them
+queue on that product's row lock. Runs --requests orders from --concurrency workers,
+each with its own session calling OrderService.create_order, once per --shards value
+(0 = unsharded). The lock is held until commit; --hold-ms keeps each transaction open
+that much longer (pg_sleep after the order is created) to stand in for the network
+round trips and fsync a remote database adds, which is what makes the row lock hot.
+Seeds one product per run (named "bench-hot-*") and deletes it and its orders afterwards.
+
+    uv run python -m benchmarks.hot_sku --requests 2000 --concurrency 16 --shards 0 4 16 --hold-ms 20
+"""
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import delete, insert, select, text
+
+from benchmarks._common import base_parser, percentiles, report, timer
+from src.logistics.db.session import AsyncSessionLocal, engine
+from src.logistics.models.order import Order, OrderItem
+from src.logistics.models.product import Product, ProductStockShard
+from src.logistics.schemas.order import OrderCreate
+from src.logistics.services.order_service import OrderService
+from src.logistics.services.product_service import ProductService
+
+
+async def seed_product(stock: int) -> uuid.UUID:
+    product_id = uuid.uuid4()
+    async with AsyncSessionLocal() as session, session.begin():
+        await session.execute(insert(Product), [
+            {"id": product_id, "name": f"bench-hot-{product_id}", "price": 9.99, "stock_quantity": stock}
+        ])
+    return product_id
+
+
+async def remaining_stock(product_id: uuid.UUID) -> int:
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(select(Product.total_stock).where(Product.id == product_id))
+
+
+async def cleanup(product_id: uuid.UUID) -> None:
+    async with AsyncSessionLocal() as session, session.begin():
+        order_ids = select(OrderItem.order_id).where(OrderItem.product_id == product_id)
+        await session.execute(delete(Order).where(Order.id.in_(order_ids.scalar_subquery())))
+        await session.execute(delete(OrderItem).where(OrderItem.product_id == product_id))
+        await session.execute(delete(ProductStockShard).where(ProductStockShard.product_id == product_id))
+        await session.execute(delete(Product).where(Product.id == product_id))
+
+
+async def run(shards: int, args) -> dict:
+    product_id = await seed_product(args.requests)
+    latency: list[float] = []
+    counter = iter(range(args.requests))
+    order = OrderCreate(items=[{"product_id": product_id, "quantity": 1}])
+
+    async def worker() -> None:
+        for _ in counter:
+            with timer() as elapsed:
+                async with AsyncSessionLocal() as session, session.begin():
+                    await OrderService(session).create_order(order)
+                    if args.hold_ms:
+                        await session.execute(text("SELECT pg_sleep(:s)"), {"s": args.hold_ms / 1000})
+            latency.append(elapsed[0])
+
+    try:
+        if shards:
+            async with AsyncSessionLocal() as session:
+                await ProductService(session).set_stock_shards(product_id, shards)
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        wall = time.perf_counter() - started
+        # Every unit was sold exactly once: nothing oversold, nothing lost between shards
+        left = await remaining_stock(product_id)
+    finally:
+        await cleanup(product_id)
+
+    return {"shards": shards, "orders_per_s": round(len(latency) / wall, 1), "stock_left": left, **percentiles(latency)}
+
+
+async def main() -> None:
+    parser = base_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16, help="Keep below the pool size")
+    parser.add_argument("--shards", type=int, nargs="+", default=[0, 4, 16])
+    parser.add_argument("--hold-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    rows = []
+    try:
+        for shards in args.shards:
+            rows.append(await run(shards, args))
+    finally:
+        await engine.dispose()
+
+    report(rows, args.json)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
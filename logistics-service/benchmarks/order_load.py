@@ -0,0 +1,259 @@
+"""
+Concurrent load and contention benchmark for POST /api/v1/orders/.
+
+Runs --requests orders from each --concurrency level of concurrent clients, for each
+product mix:
+
+    uniform  every order picks its products uniformly from the catalog
+    zipf     products are picked with Zipfian popularity (--zipf-s), a few very hot
+    hot      every order contains the same single hot product, plus uniform ones
+
+By default the app is driven in-process (httpx ASGI transport). With --base-url it
+drives a running server instead (e.g. `uvicorn src.logistics.main:app --workers 4`),
+which must use the same database; pool figures are then not available.
+
+Reports throughput, latency percentiles, outcome counts by response (conflicts after
+deadlocks or serialization failures, a busy database after lock or statement timeouts,
+requests shed by admission control, other database errors), deadlocks from
+pg_stat_database, the number of sessions waiting on locks (sampled from pg_stat_activity)
+and how often the connection pool was exhausted. In-process runs also break retries and
+failures down by database error, from the transaction metrics. --output writes the rows as JSON tagged with the commit.
+Seeds its own products (named "bench-load-*") and deletes them and its orders afterwards.
+
+    uv run python -m benchmarks.order_load --mix uniform zipf hot --concurrency 8 32 --output load.json
+"""
+import asyncio
+import itertools
+import logging
+import random
+import statistics
+import time
+import uuid
+from collections import Counter
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, insert, text
+
+from benchmarks._common import base_parser, make_engine, percentiles, report, timer, write_results
+from src.logistics.core.config import settings
+from src.logistics.core.metrics import REQUEST_POOL_WAIT
+from src.logistics.db.transaction import RETRYABLE_SQLSTATES, TRANSACTION_FAILURES, TRANSACTION_RETRIES
+from src.logistics.db.session import AsyncSessionLocal, engine
+from src.logistics.main import app
+from src.logistics.models.order import Order, OrderItem
+from src.logistics.models.product import Product
+
+ROUTE = ("POST", "/api/v1/orders/")
+MIXES = ("uniform", "zipf", "hot")
+
+OPERATION = "create_order"
+
+# Error responses worth telling apart, by status and detail; the SQLSTATE never leaves the app
+RESPONSE_OUTCOMES = {
+    (409, "The request conflicted with concurrent updates. Please retry."): "conflict",
+    (503, "The database is busy. Please retry shortly."): "db_busy",
+    (503, "The service is overloaded. Please retry shortly."): "shed",
+    (500, "A database error occurred. Please try again later."): "db_error",
+}
+# Per-reason labels of the transaction metrics, read in-process
+DB_REASONS = (*RETRYABLE_SQLSTATES.values(), "connection_lost", "statement_timeout")
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+async def seed_products(count: int) -> list[uuid.UUID]:
+    ids = [uuid.uuid4() for _ in range(count)]
+    async with AsyncSessionLocal() as session, session.begin():
+        await session.execute(insert(Product), [
+            {"id": pid, "name": f"bench-load-{pid}", "price": 9.99, "stock_quantity": 10_000_000}
+            for pid in ids
+        ])
+    return ids
+
+
+async def cleanup(product_ids: list[uuid.UUID], order_ids: list[str]) -> None:
+    async with AsyncSessionLocal() as session, session.begin():
+        await session.execute(delete(OrderItem).where(OrderItem.product_id.in_(product_ids)))
+        await session.execute(delete(Order).where(Order.id.in_(order_ids)))
+        await session.execute(delete(Product).where(Product.id.in_(product_ids)))
+
+
+def product_picker(mix: str, product_ids: list[uuid.UUID], items: int, zipf_s: float):
+    """Returns a function producing the distinct product ids of one order."""
+    if mix == "uniform":
+        return lambda: random.sample(product_ids, items)
+
+    if mix == "zipf":
+        cum_weights = list(itertools.accumulate(1 / (rank + 1) ** zipf_s for rank in range(len(product_ids))))
+
+        def pick_zipf():
+            chosen: dict = {}
+            while len(chosen) < items:
+                chosen.setdefault(random.choices(product_ids, cum_weights=cum_weights)[0], None)
+            return list(chosen)
+        return pick_zipf
+
+    hot, rest = product_ids[0], product_ids[1:]
+    return lambda: [hot, *random.sample(rest, items - 1)]
+
+
+def classify(response) -> str:
+    if response.status_code < 400:
+        return str(response.status_code)
+    try:
+        detail = response.json().get("detail")
+    except ValueError:
+        detail = None
+    return RESPONSE_OUTCOMES.get((response.status_code, detail), str(response.status_code))
+
+
+def transaction_errors() -> dict:
+    """Retries and failures of the order transaction so far, by database error."""
+    return {
+        kind: {reason: metric.value(OPERATION, reason) for reason in DB_REASONS}
+        for kind, metric in (("retries", TRANSACTION_RETRIES), ("failures", TRANSACTION_FAILURES))
+    }
+
+
+class ContentionSampler:
+    """Periodically samples lock waiters (pg_stat_activity) and, in-process, pool checkouts."""
+
+    def __init__(self, interval: float, in_process: bool, pool_capacity: int):
+        self.interval = interval
+        self.in_process = in_process
+        self.pool_capacity = pool_capacity
+        self.lock_waiters: list[int] = []
+        self.pool_busy: list[int] = []
+        self._engine = make_engine(pool_size=1, max_overflow=0)
+        self._task = None
+
+    async def deadlocks(self) -> int:
+        async with self._engine.connect() as conn:
+            return await conn.scalar(text("SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()"))
+
+    async def _run(self) -> None:
+        async with self._engine.connect() as conn:
+            while True:
+                waiting = await conn.scalar(text(
+                    "SELECT count(*) FROM pg_stat_activity"
+                    " WHERE datname = current_database() AND wait_event_type = 'Lock'"
+                ))
+                self.lock_waiters.append(waiting)
+                if self.in_process:
+                    self.pool_busy.append(engine.pool.checkedout())
+                await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self.lock_waiters.clear()
+        self.pool_busy.clear()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def summary(self) -> dict:
+        result = {
+            "lock_waiters_mean": round(statistics.fmean(self.lock_waiters), 2) if self.lock_waiters else 0,
+            "lock_waiters_max": max(self.lock_waiters, default=0),
+        }
+        if self.in_process:
+            exhausted = sum(1 for busy in self.pool_busy if busy >= self.pool_capacity)
+            result["pool_exhausted_pct"] = round(100 * exhausted / len(self.pool_busy), 1) if self.pool_busy else 0
+        return result
+
+    async def dispose(self) -> None:
+        await self._engine.dispose()
+
+
+async def run(client: AsyncClient, sampler: ContentionSampler, mix: str, concurrency: int,
+              product_ids: list[uuid.UUID], order_ids: list[str], args) -> dict:
+    pick = product_picker(mix, product_ids, args.items, args.zipf_s)
+    latency: list[float] = []
+    outcomes: Counter = Counter()
+    counter = iter(range(args.requests))
+
+    async def worker() -> None:
+        for _ in counter:
+            items = [{"product_id": str(pid), "quantity": 1} for pid in pick()]
+            with timer() as elapsed:
+                try:
+                    response = await client.post("/api/v1/orders/", json={"items": items})
+                except Exception as exc:
+                    outcomes[f"error:{type(exc).__name__}"] += 1
+                    continue
+            if response.status_code == 201:
+                latency.append(elapsed[0])
+                order_ids.append(response.json()["id"])
+            outcomes[classify(response)] += 1
+
+    deadlocks_before = await sampler.deadlocks()
+    pool_wait_before = REQUEST_POOL_WAIT.sum(*ROUTE)
+    errors_before = transaction_errors()
+    sampler.start()
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        wall = time.perf_counter() - started
+        await sampler.stop()
+    # Backends report their statistics shortly after the transaction ends
+    await asyncio.sleep(1)
+
+    row = {
+        "mix": mix,
+        "concurrency": concurrency,
+        "orders_per_s": round(len(latency) / wall, 1),
+        **percentiles(latency),
+        "outcomes": dict(sorted(outcomes.items())),
+        "deadlocks": await sampler.deadlocks() - deadlocks_before,
+        **sampler.summary(),
+    }
+    if sampler.in_process:
+        row["pool_wait_ms_mean"] = round((REQUEST_POOL_WAIT.sum(*ROUTE) - pool_wait_before) / args.requests * 1000, 3)
+        for kind, counts in transaction_errors().items():
+            delta = {reason: int(n - errors_before[kind][reason]) for reason, n in counts.items()}
+            row[f"db_{kind}"] = {reason: n for reason, n in delta.items() if n}
+    return row
+
+
+async def main() -> None:
+    parser = base_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--mix", choices=MIXES, nargs="+", default=list(MIXES))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--requests", type=int, default=1000, help="Orders per mix and concurrency level")
+    parser.add_argument("--items", type=int, default=3, help="Distinct products per order")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="Zipf exponent; higher is more skewed")
+    parser.add_argument("--sample-ms", type=float, default=20.0, help="Lock and pool sampling interval")
+    parser.add_argument("--base-url", help="Drive a running server instead of the app in-process")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    in_process = args.base_url is None
+    transport = ASGITransport(app=app) if in_process else None
+    sampler = ContentionSampler(args.sample_ms / 1000, in_process, settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+    product_ids = await seed_products(args.products)
+    order_ids: list[str] = []
+    rows = []
+
+    try:
+        async with AsyncClient(transport=transport, base_url=args.base_url or "http://bench", timeout=60) as client:
+            for mix in args.mix:
+                for concurrency in args.concurrency:
+                    rows.append(await run(client, sampler, mix, concurrency, product_ids, order_ids, args))
+    finally:
+        await cleanup(product_ids, order_ids)
+        await sampler.dispose()
+        await engine.dispose()
+
+    report(rows, args.json)
+    if args.output:
+        write_results(args.output, "order_load", args, rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
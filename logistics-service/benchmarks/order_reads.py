@@ -0,0 +1,89 @@
+"""
+GET /api/v1/orders/{id}: ORM + Pydantic path vs the single-query json_agg projection.
+
+Seeds one order per size (1, 10 and 500 items by default) with its own products
+(named "bench-read-*"), reads each one repeatedly through both paths in-process,
+then deletes everything it created.
+
+    uv run python -m benchmarks.order_reads --reads 500 --sizes 1 10 500
+"""
+import asyncio
+import logging
+import uuid
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, insert
+
+from benchmarks._common import base_parser, percentiles, report, timer
+from src.logistics.core.config import settings
+from src.logistics.core.metrics import REQUEST_QUERIES
+from src.logistics.db.session import AsyncSessionLocal, engine
+from src.logistics.main import app
+from src.logistics.models.order import Order, OrderItem
+from src.logistics.models.product import Product
+from src.logistics.schemas.enums import OrderStatus
+
+ROUTE = ("GET", "/api/v1/orders/{order_id}")
+PATHS = {"orm": False, "json_agg": True}
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+async def seed_order(size: int) -> tuple[uuid.UUID, list[uuid.UUID]]:
+    order_id = uuid.uuid4()
+    product_ids = [uuid.uuid4() for _ in range(size)]
+    async with AsyncSessionLocal() as session, session.begin():
+        await session.execute(insert(Product), [
+            {"id": pid, "name": f"bench-read-{pid}", "price": 19.99, "stock_quantity": 100}
+            for pid in product_ids
+        ])
+        await session.execute(insert(Order), [{"id": order_id, "status": OrderStatus.PENDING}])
+        await session.execute(insert(OrderItem), [
+            {"order_id": order_id, "product_id": pid, "quantity": 2, "price_at_order": 19.99}
+            for pid in product_ids
+        ])
+    return order_id, product_ids
+
+
+async def cleanup(order_ids: list[uuid.UUID], product_ids: list[uuid.UUID]) -> None:
+    async with AsyncSessionLocal() as session, session.begin():
+        await session.execute(delete(Order).where(Order.id.in_(order_ids)))
+        await session.execute(delete(Product).where(Product.id.in_(product_ids)))
+
+
+async def main() -> None:
+    parser = base_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--reads", type=int, default=500, help="Reads per order size and path")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 500])
+    args = parser.parse_args()
+
+    orders = {size: await seed_order(size) for size in args.sizes}
+    results = []
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            for size, (order_id, _) in orders.items():
+                for path, projection in PATHS.items():
+                    settings.ORDER_READ_JSON_PROJECTION = projection
+                    before = REQUEST_QUERIES.count(*ROUTE), REQUEST_QUERIES.sum(*ROUTE)
+                    latency = []
+                    for _ in range(args.reads):
+                        with timer() as elapsed:
+                            response = await client.get(f"/api/v1/orders/{order_id}")
+                        response.raise_for_status()
+                        latency.append(elapsed[0])
+                    queries = (REQUEST_QUERIES.sum(*ROUTE) - before[1]) / (REQUEST_QUERIES.count(*ROUTE) - before[0])
+                    results.append({
+                        "items": size, "path": path, "queries": queries,
+                        "bytes": len(response.content), **percentiles(latency),
+                    })
+    finally:
+        await cleanup(
+            [order_id for order_id, _ in orders.values()],
+            [pid for _, product_ids in orders.values() for pid in product_ids],
+        )
+        await engine.dispose()
+    report(results, args.json)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""
+Insert throughput, primary-key index size and WAL volume for uuid4 vs UUIDv7 keys.
+
+Creates two scratch tables shaped like order_items (bench_keys_uuid4 / bench_keys_uuid7),
+loads the same number of rows into each in batches, and drops them afterwards.
+
+    uv run python -m benchmarks.uuid_keys --rows 1000000 --batch 1000
+"""
+import asyncio
+import uuid
+from decimal import Decimal
+
+from sqlalchemy import Column, Integer, MetaData, Numeric, Table, insert, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from benchmarks._common import base_parser, make_engine, report, timer
+from src.logistics.core.ids import uuid7
+
+SCHEMES = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+
+def _table(name: str) -> Table:
+    return Table(
+        name, MetaData(),
+        Column("id", UUID(as_uuid=True), primary_key=True),
+        Column("order_id", UUID(as_uuid=True), nullable=False),
+        Column("product_id", UUID(as_uuid=True), nullable=False),
+        Column("quantity", Integer, nullable=False),
+        Column("price_at_order", Numeric(10, 2), nullable=False),
+    )
+
+
+async def run_scheme(engine, scheme: str, rows: int, batch: int) -> dict:
+    new_id = SCHEMES[scheme]
+    table = _table(f"bench_keys_{scheme}")
+    product_ids = [uuid.uuid4() for _ in range(1000)]
+
+    async with engine.begin() as conn:
+        await conn.run_sync(table.drop, checkfirst=True)
+        await conn.run_sync(table.create)
+        await conn.execute(text("CHECKPOINT"))
+        wal_start = (await conn.execute(text("SELECT pg_current_wal_insert_lsn()"))).scalar_one()
+
+    try:
+        with timer() as elapsed:
+            for offset in range(0, rows, batch):
+                order_id = new_id()
+                payload = [
+                    {
+                        "id": new_id(),
+                        "order_id": order_id,
+                        "product_id": product_ids[(offset + i) % len(product_ids)],
+                        "quantity": 1,
+                        "price_at_order": Decimal("9.99"),
+                    }
+                    for i in range(min(batch, rows - offset))
+                ]
+                async with engine.begin() as conn:
+                    await conn.execute(insert(table), payload)
+
+        async with engine.connect() as conn:
+            stats = (await conn.execute(text("""
+                SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), :wal_start) AS wal_bytes,
+                       pg_relation_size(:pkey) AS pkey_bytes,
+                       pg_relation_size(:table) AS heap_bytes
+            """), {"wal_start": wal_start, "pkey": f"{table.name}_pkey", "table": table.name})).one()
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(table.drop, checkfirst=True)
+
+    return {
+        "scheme": scheme,
+        "rows": rows,
+        "seconds": round(elapsed[0], 2),
+        "rows_per_s": round(rows / elapsed[0]),
+        "pkey_mb": round(stats.pkey_bytes / 2**20, 1),
+        "heap_mb": round(stats.heap_bytes / 2**20, 1),
+        "wal_mb": round(stats.wal_bytes / 2**20, 1),
+    }
+
+
+async def main() -> None:
+    parser = base_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--schemes", nargs="+", choices=list(SCHEMES), default=list(SCHEMES))
+    args = parser.parse_args()
+
+    engine = make_engine()
+    try:
+        results = [await run_scheme(engine, s, args.rows, args.batch) for s in args.schemes]
+    finally:
+        await engine.dispose()
+    report(results, args.json)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""
+Latency and SQL statement count of the order write endpoints.
+
+Drives POST /api/v1/orders/ and PATCH /api/v1/orders/{id}/status in-process (httpx ASGI
+transport, no network hop) against the configured database. Seeds its own products
+(named "bench-write-*") and deletes them and the orders it created afterwards.
+
+    uv run python -m benchmarks.write_paths --requests 2000 --items 3
+"""
+import asyncio
+import logging
+import uuid
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, insert
+
+from benchmarks._common import base_parser, percentiles, report, timer
+from src.logistics.core.metrics import REQUEST_QUERIES
+from src.logistics.db.session import AsyncSessionLocal, engine
+from src.logistics.main import app
+from src.logistics.models.order import Order, OrderItem
+from src.logistics.models.product import Product
+
+CREATE_ROUTE = ("POST", "/api/v1/orders/")
+STATUS_ROUTE = ("PATCH", "/api/v1/orders/{order_id}/status")
+
+# The app logs every request at INFO through httpx; keep the report readable
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+async def seed_products(count: int) -> list[uuid.UUID]:
+    ids = [uuid.uuid4() for _ in range(count)]
+    async with AsyncSessionLocal() as session, session.begin():
+        await session.execute(insert(Product), [
+            {"id": pid, "name": f"bench-write-{pid}", "price": 9.99, "stock_quantity": 10_000_000}
+            for pid in ids
+        ])
+    return ids
+
+
+async def cleanup(product_ids: list[uuid.UUID], order_ids: list[str]) -> None:
+    async with AsyncSessionLocal() as session, session.begin():
+        await session.execute(delete(OrderItem).where(OrderItem.product_id.in_(product_ids)))
+        await session.execute(delete(Order).where(Order.id.in_(order_ids)))
+        await session.execute(delete(Product).where(Product.id.in_(product_ids)))
+
+
+def _queries_per_request(route, before: tuple) -> float:
+    count = REQUEST_QUERIES.count(*route) - before[0]
+    return round((REQUEST_QUERIES.sum(*route) - before[1]) / count, 2) if count else 0
+
+
+async def main() -> None:
+    parser = base_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=3, help="Order lines per order")
+    parser.add_argument("--products", type=int, default=100)
+    args = parser.parse_args()
+
+    product_ids = await seed_products(args.products)
+    order_ids: list[str] = []
+    create_latency, status_latency = [], []
+    before = {r: (REQUEST_QUERIES.count(*r), REQUEST_QUERIES.sum(*r)) for r in (CREATE_ROUTE, STATUS_ROUTE)}
+
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            for n in range(args.requests):
+                items = [
+                    {"product_id": str(product_ids[(n + i) % len(product_ids)]), "quantity": 1}
+                    for i in range(args.items)
+                ]
+                with timer() as elapsed:
+                    response = await client.post("/api/v1/orders/", json={"items": items})
+                response.raise_for_status()
+                create_latency.append(elapsed[0])
+                order_ids.append(response.json()["id"])
+
+            for order_id in order_ids:
+                with timer() as elapsed:
+                    response = await client.patch(f"/api/v1/orders/{order_id}/status", json={"status": "shipped"})
+                response.raise_for_status()
+                status_latency.append(elapsed[0])
+    finally:
+        await cleanup(product_ids, order_ids)
+        await engine.dispose()
+
+    report([
+        {"endpoint": " ".join(CREATE_ROUTE), "queries": _queries_per_request(CREATE_ROUTE, before[CREATE_ROUTE]), **percentiles(create_latency)},
+        {"endpoint": " ".join(STATUS_ROUTE), "queries": _queries_per_request(STATUS_ROUTE, before[STATUS_ROUTE]), **percentiles(status_latency)},
+    ], args.json)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
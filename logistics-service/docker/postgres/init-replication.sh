@@ -0,0 +1,4 @@
+#!/bin/sh
+# Runs once, when the primary's data volume is initialised: allow the db_replica
+# service to stream WAL using the application credentials.
+echo "host replication ${POSTGRES_USER} all scram-sha-256" >> "$PGDATA/pg_hba.conf"
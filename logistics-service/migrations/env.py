@@ -9,8 +9,9 @@ from alembic import context
 
 # Import models and env
 from src.logistics.db.base import Base
-from src.logistics.models.product import Product
-from src.logistics.models.order import Order, OrderItem
+from src.logistics.models.product import Product, ProductChange, ProductStockShard
+from src.logistics.models.order import Order, OrderIdempotencyKey, OrderItem
+from src.logistics.models.reservation import StockReservation, StockReservationItem
 from src.logistics.core.config import settings
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,37 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 3f9a1c7d2b84
+Revises: ad0f50f4830c
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c7d2b84'
+down_revision: Union[str, Sequence[str], None] = 'ad0f50f4830c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Partial indexes matching the keyset seek `(created_at, id) > :cursor AND deleted_at IS NULL`
+    op.create_index(
+        'ix_products_active_created_at_id', 'products', ['created_at', 'id'],
+        unique=False, postgresql_where=sa.text('deleted_at IS NULL')
+    )
+    op.create_index(
+        'ix_orders_active_created_at_id', 'orders', ['created_at', 'id'],
+        unique=False, postgresql_where=sa.text('deleted_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_active_created_at_id', table_name='orders')
+    op.drop_index('ix_products_active_created_at_id', table_name='products')
@@ -0,0 +1,42 @@
+"""add_soft_delete_partial_indexes
+
+Revision ID: 5d7b3e91c4a6
+Revises: 8c2e5b0a9d17
+Create Date: 2026-10-18 11:20:05.104417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7b3e91c4a6'
+down_revision: Union[str, Sequence[str], None] = '8c2e5b0a9d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Every name lookup filters on deleted_at IS NULL, so the full index only
+    # carries soft-deleted rows nobody reads. Build the replacement first.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_products_active_name', 'products', ['name'],
+            unique=False,
+            postgresql_where=sa.text('deleted_at IS NULL'),
+            postgresql_concurrently=True,
+        )
+        op.drop_index('ix_products_name', table_name='products', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_products_name', 'products', ['name'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.drop_index('ix_products_active_name', table_name='products', postgresql_concurrently=True)
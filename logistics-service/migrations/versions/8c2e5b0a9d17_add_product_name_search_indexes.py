@@ -0,0 +1,48 @@
+"""add_product_name_search_indexes
+
+Revision ID: 8c2e5b0a9d17
+Revises: 3f9a1c7d2b84
+Create Date: 2026-10-18 10:03:27.552981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2e5b0a9d17'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c7d2b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CONCURRENTLY cannot run inside a transaction; building it this way keeps
+    # the products table writable while the index is created on a large catalog.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_products_name_prefix', 'products',
+            [sa.text('lower(name) COLLATE "C"'), 'id'],
+            unique=False,
+            postgresql_where=sa.text('deleted_at IS NULL'),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_products_name_trgm', 'products', ['name'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+            postgresql_where=sa.text('deleted_at IS NULL'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_products_name_trgm', table_name='products', postgresql_concurrently=True)
+        op.drop_index('ix_products_name_prefix', table_name='products', postgresql_concurrently=True)
@@ -0,0 +1,38 @@
+"""add_order_idempotency_keys
+
+Revision ID: a4c2e8f91b36
+Revises: e5a90b3c7f14
+Create Date: 2026-10-18 21:05:12.480317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c2e8f91b36'
+down_revision: Union[str, Sequence[str], None] = 'e5a90b3c7f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'order_idempotency_keys',
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('request_hash', sa.String(length=64), nullable=False),
+        sa.Column('response', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_index('ix_order_idempotency_keys_created_at', 'order_idempotency_keys', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_order_idempotency_keys_created_at', table_name='order_idempotency_keys')
+    op.drop_table('order_idempotency_keys')
@@ -0,0 +1,49 @@
+"""use_uuid7_primary_keys
+
+Revision ID: a7c4e2f19b35
+Revises: 5d7b3e91c4a6
+Create Date: 2026-10-18 13:02:41.558210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c4e2f19b35'
+down_revision: Union[str, Sequence[str], None] = '5d7b3e91c4a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('products', 'orders', 'order_items')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing uuid4 keys stay as they are: the column type is unchanged and only
+    # new rows get time-ordered ids, so this is a catalog-only change (no rewrite).
+    op.execute("""
+        CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid
+        LANGUAGE sql VOLATILE PARALLEL SAFE AS $$
+            SELECT encode(
+                set_bit(set_bit(
+                    overlay(
+                        uuid_send(gen_random_uuid())
+                        PLACING substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                        FROM 1 FOR 6
+                    ),
+                52, 1), 53, 1),
+            'hex')::uuid
+        $$
+    """)
+    for table in TABLES:
+        op.alter_column(table, 'id', server_default=sa.text('uuid_generate_v7()'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.alter_column(table, 'id', server_default=None)
+    op.execute("DROP FUNCTION uuid_generate_v7()")
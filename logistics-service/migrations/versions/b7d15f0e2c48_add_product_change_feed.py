@@ -0,0 +1,77 @@
+"""add_product_change_feed
+
+Revision ID: b7d15f0e2c48
+Revises: a4c2e8f91b36
+Create Date: 2026-10-18 22:14:51.902634
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d15f0e2c48'
+down_revision: Union[str, Sequence[str], None] = 'a4c2e8f91b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'product_changes',
+        sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+        sa.Column('txid', sa.BigInteger(), nullable=False),
+        sa.Column('product_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('operation', sa.String(length=10), nullable=False),
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_product_changes_txid_id', 'product_changes', ['txid', 'id'], unique=False)
+    op.create_index('ix_product_changes_changed_at', 'product_changes', ['changed_at'], unique=False)
+    # Existing products are not backfilled: consumers bootstrap from the listing, then follow the feed
+    op.execute("""
+        CREATE FUNCTION log_product_inserts() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO product_changes (txid, product_id, operation)
+            SELECT pg_current_xact_id()::text::bigint, id, 'insert' FROM inserted_products;
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE FUNCTION log_product_update() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO product_changes (txid, product_id, operation)
+            VALUES (
+                pg_current_xact_id()::text::bigint,
+                NEW.id,
+                CASE WHEN NEW.deleted_at IS NOT NULL AND OLD.deleted_at IS NULL THEN 'delete' ELSE 'update' END
+            );
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE TRIGGER products_log_inserts AFTER INSERT ON products
+        REFERENCING NEW TABLE AS inserted_products
+        FOR EACH STATEMENT EXECUTE FUNCTION log_product_inserts()
+    """)
+    op.execute("""
+        CREATE TRIGGER products_log_update AFTER UPDATE OF name, price, deleted_at ON products
+        FOR EACH ROW
+        WHEN ((OLD.name, OLD.price, OLD.deleted_at) IS DISTINCT FROM (NEW.name, NEW.price, NEW.deleted_at))
+        EXECUTE FUNCTION log_product_update()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER products_log_update ON products")
+    op.execute("DROP TRIGGER products_log_inserts ON products")
+    op.execute("DROP FUNCTION log_product_update()")
+    op.execute("DROP FUNCTION log_product_inserts()")
+    op.drop_index('ix_product_changes_changed_at', table_name='product_changes')
+    op.drop_index('ix_product_changes_txid_id', table_name='product_changes')
+    op.drop_table('product_changes')
@@ -0,0 +1,52 @@
+"""add_order_listing_composite_indexes
+
+Revision ID: c31d8f6a7e02
+Revises: a7c4e2f19b35
+Create Date: 2026-10-18 15:47:12.903316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c31d8f6a7e02'
+down_revision: Union[str, Sequence[str], None] = 'a7c4e2f19b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The composite indexes lead with the same column as the single-column ones they
+    # replace, so those become redundant once the new ones are built.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_orders_active_status_created_at_id', 'orders', ['status', 'created_at', 'id'],
+            unique=False,
+            postgresql_where=sa.text('deleted_at IS NULL'),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_order_items_product_id_order_id', 'order_items', ['product_id', 'order_id'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.drop_index('ix_orders_status', table_name='orders', postgresql_concurrently=True)
+        op.drop_index('ix_order_items_product_id', table_name='order_items', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_order_items_product_id', 'order_items', ['product_id'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_orders_status', 'orders', ['status'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.drop_index('ix_order_items_product_id_order_id', table_name='order_items', postgresql_concurrently=True)
+        op.drop_index('ix_orders_active_status_created_at_id', table_name='orders', postgresql_concurrently=True)
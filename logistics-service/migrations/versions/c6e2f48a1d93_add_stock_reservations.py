@@ -0,0 +1,54 @@
+"""add_stock_reservations
+
+Revision ID: c6e2f48a1d93
+Revises: b7d15f0e2c48
+Create Date: 2026-10-18 23:02:37.615204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6e2f48a1d93'
+down_revision: Union[str, Sequence[str], None] = 'b7d15f0e2c48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'stock_reservations',
+        sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('uuid_generate_v7()'), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('id'),
+    )
+    op.create_index('ix_stock_reservations_expires_at', 'stock_reservations', ['expires_at'], unique=False)
+    op.create_table(
+        'stock_reservation_items',
+        sa.Column('reservation_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('product_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('price_at_reservation', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.CheckConstraint('quantity > 0', name='check_reservation_quantity_positive'),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+        sa.ForeignKeyConstraint(['reservation_id'], ['stock_reservations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('reservation_id', 'product_id'),
+    )
+    op.create_index(
+        'ix_stock_reservation_items_product_id', 'stock_reservation_items', ['product_id', 'quantity'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stock_reservation_items_product_id', table_name='stock_reservation_items')
+    op.drop_table('stock_reservation_items')
+    op.drop_index('ix_stock_reservations_expires_at', table_name='stock_reservations')
+    op.drop_table('stock_reservations')
@@ -0,0 +1,57 @@
+"""add_sharded_stock_counters
+
+Revision ID: e5a90b3c7f14
+Revises: c31d8f6a7e02
+Create Date: 2026-10-18 18:20:37.114205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a90b3c7f14'
+down_revision: Union[str, Sequence[str], None] = 'c31d8f6a7e02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Constant default: a catalog-only change, existing rows are not rewritten
+    op.add_column(
+        'products',
+        sa.Column('stock_shard_count', sa.SmallInteger(), server_default=sa.text('0'), nullable=False),
+    )
+    op.create_table(
+        'product_stock_shards',
+        sa.Column('product_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('shard_no', sa.SmallInteger(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.CheckConstraint('quantity >= 0', name='check_stock_shard_non_negative'),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+        sa.PrimaryKeyConstraint('product_id', 'shard_no'),
+    )
+    op.execute("""
+        CREATE VIEW product_stock_totals AS
+        SELECT product_id, sum(quantity)::integer AS stock_quantity
+        FROM product_stock_shards
+        GROUP BY product_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Fold sharded stock back into products before the shards go away
+    op.execute("""
+        UPDATE products AS p
+        SET stock_quantity = t.stock_quantity
+        FROM product_stock_totals AS t
+        WHERE t.product_id = p.id AND p.stock_shard_count > 0
+    """)
+    op.execute("DROP VIEW product_stock_totals")
+    op.drop_table('product_stock_shards')
+    op.drop_column('products', 'stock_shard_count')
@@ -1,41 +1,166 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.logistics.db.session import get_db
+from src.logistics.core.admission import Priority, admit
+from src.logistics.core.config import settings
+from src.logistics.db.session import get_db, get_read_db
 from src.logistics.services.order_service import OrderService
-from src.logistics.schemas.order import OrderCreate, OrderRead, OrderUpdateStatus
-from src.logistics.schemas.enums import OrderStatus
+from src.logistics.schemas.order import (
+    OrderCreate, OrderRead, OrderListRead, OrderUpdateStatus, OrderBatchCreate, OrderBatchRead,
+    OrderBulkStatusUpdate, OrderBulkStatusRead,
+)
+from src.logistics.schemas.pagination import Page
+from src.logistics.schemas.enums import OrderStatus, ExportFormat
+from src.logistics.services.order_export import ENCODERS
+from typing import Optional
+from datetime import datetime
 from uuid import UUID
 
 router = APIRouter(prefix="/orders", tags=["Order"])
 
-@router.post("/", response_model=OrderRead, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/", response_model=OrderRead, status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admit("create_order", Priority.CRITICAL))],
+)
 async def create_order(
     order_in: OrderCreate, 
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(
+        None, max_length=255, description="Retries with the same key return the first response"
+    ),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Critical Logic: Creates an order transactionally, checking and reducing stock.
     Handles insufficient stock error with proper HTTP codes[cite: 22, 39].
+    In group-commit mode the order is committed together with other concurrent orders.
+    With an `Idempotency-Key` the order is created at most once; a repeat gets the stored
+    order back with `Idempotent-Replayed: true` (such requests bypass group commit).
     """
+    if idempotency_key is not None:
+        order, replayed = await OrderService(db).create_order_idempotent(order_in, idempotency_key)
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return order
+
+    batcher = getattr(request.app.state, "order_batcher", None)
+    if batcher is not None:
+        return await batcher.submit(order_in)
     service = OrderService(db)
     return await service.create_order(order_in)
 
-@router.get("/{order_id}", response_model=OrderRead)
+@router.get(
+    "/", response_model=Page[OrderListRead],
+    dependencies=[Depends(admit("list_orders", Priority.LOW))],
+)
+async def list_orders(
+    status: Optional[OrderStatus] = Query(None),
+    created_from: Optional[datetime] = Query(None, description="Inclusive lower bound on created_at"),
+    created_to: Optional[datetime] = Query(None, description="Exclusive upper bound on created_at"),
+    product_id: Optional[UUID] = Query(None, description="Only orders containing this product"),
+    include_items: bool = Query(False, description="Embed each order's items"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Lists orders newest first with keyset pagination.
+    Filters combine with AND; items are omitted (null) unless `include_items=true`.
+    """
+    service = OrderService(db)
+    return await service.list_orders(
+        status=status, created_from=created_from, created_to=created_to, product_id=product_id,
+        cursor=cursor, limit=limit, include_items=include_items,
+    )
+
+@router.post(
+    "/batch", response_model=OrderBatchRead,
+    dependencies=[Depends(admit("create_orders_batch", Priority.NORMAL))],
+)
+async def create_orders_batch(
+    batch_in: OrderBatchCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bulk ingestion: creates many orders in one transaction with one sorted lock pass.
+    Each order succeeds or fails on its own; see `results[].status_code`.
+    """
+    service = OrderService(db)
+    results = await service.create_orders_batch(batch_in.orders)
+    return OrderBatchRead(results=results)
+
+@router.patch(
+    "/status", response_model=OrderBulkStatusRead,
+    dependencies=[Depends(admit("update_order_statuses", Priority.NORMAL))],
+)
+async def update_order_statuses(
+    update_in: OrderBulkStatusUpdate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bulk status transition for fulfillment waves: moves the listed `order_ids`, or up to
+    `limit` orders matching `filter`, with one set-based UPDATE in one transaction.
+    Cancelled orders return their items to stock. Each order succeeds or fails on its
+    own; see `results[].status_code`. With a filter, repeat the call until no results come back.
+    """
+    service = OrderService(db)
+    results = await service.update_statuses(
+        update_in.status, order_ids=update_in.order_ids, filter=update_in.filter, limit=update_in.limit
+    )
+    return OrderBulkStatusRead(status=update_in.status, results=results)
+
+@router.get(
+    "/export",
+    dependencies=[Depends(admit("export_orders", Priority.LOW))],
+)
+async def export_orders(
+    format: ExportFormat = Query(ExportFormat.NDJSON),
+    status: Optional[OrderStatus] = Query(None),
+    created_from: Optional[datetime] = Query(None, description="Inclusive lower bound on created_at"),
+    created_to: Optional[datetime] = Query(None, description="Exclusive upper bound on created_at"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Streams order history (NDJSON: one order per line, CSV: one item per row)
+    straight from a server-side cursor, so memory stays bounded for any export size.
+    """
+    service = OrderService(db)
+    _, media_type = ENCODERS[format]
+    return StreamingResponse(
+        service.export_orders(format, status=status, created_from=created_from, created_to=created_to),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="orders.{format.value}"'},
+    )
+
+@router.get(
+    "/{order_id}", response_model=OrderRead,
+    dependencies=[Depends(admit("get_order", Priority.NORMAL))],
+)
 async def get_order(
     order_id: UUID, 
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Retrieves order details including nested items.
+    With ORDER_READ_JSON_PROJECTION enabled the body is built by PostgreSQL in one query.
     """
     service = OrderService(db)
+    if settings.ORDER_READ_JSON_PROJECTION:
+        body = await service.get_order_json(order_id)
+        if body is None:
+            raise HTTPException(status_code=404, detail="Order not found")
+        return Response(content=body, media_type="application/json")
+
     order = await service.get_order(order_id)
     if not order:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Order not found")
     return order
 
-@router.patch("/{order_id}/status", response_model=OrderRead)
+@router.patch(
+    "/{order_id}/status", response_model=OrderRead,
+    dependencies=[Depends(admit("update_order_status", Priority.CRITICAL))],
+)
 async def update_order_status(
     order_id: UUID,
     status_update: OrderUpdateStatus,
@@ -1,14 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+from uuid import UUID
 
-from src.logistics.db.session import get_db
+from src.logistics.core.admission import Priority, admit
+from src.logistics.core.config import settings
+from src.logistics.db.session import get_db, get_read_db
+from src.logistics.services.product_cache import ProductCache, read_cache
 from src.logistics.services.product_service import ProductService
-from src.logistics.schemas.product import ProductCreate, ProductRead
+from src.logistics.services.stock_stream import sse_events, stock_broadcaster
+from src.logistics.schemas.product import (
+    ProductCreate, ProductRead, ProductImportResult, ProductStockShards, ProductChangeFeed,
+    ProductLookup, ProductLookupRead, ProductStockRead,
+)
+from src.logistics.schemas.enums import ImportFormat
+from src.logistics.schemas.pagination import Page
 
 router = APIRouter(prefix="/products", tags=["Product"])
 
-@router.post("/", response_model=ProductRead, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/", response_model=ProductRead, status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admit("create_product", Priority.NORMAL))],
+)
 async def create_product(
     product_in: ProductCreate, 
     db: AsyncSession = Depends(get_db)
@@ -16,11 +30,171 @@ async def create_product(
     service = ProductService(db)
     return await service.create_product(product_in)
 
-@router.get("/", response_model=List[ProductRead])
+@router.post(
+    "/import", response_model=ProductImportResult,
+    dependencies=[Depends(admit("import_products", Priority.LOW))],
+)
+async def import_products(
+    request: Request,
+    format: ImportFormat = Query(ImportFormat.CSV, description="Body format: csv (name,price,stock_quantity header) or ndjson"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bulk catalog import: inserts new products and updates price/stock of existing ones (matched by name).
+    The request body is streamed into PostgreSQL with COPY, so memory use does not depend on its size.
+    """
+    service = ProductService(db)
+    return await service.import_products(request.stream(), format)
+
+@router.post(
+    "/lookup", response_model=ProductLookupRead, response_model_exclude_unset=True,
+    dependencies=[Depends(admit("lookup_products", Priority.NORMAL))],
+)
+async def lookup_products(
+    lookup_in: ProductLookup,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Fetches up to 500 products by id in one round trip, in request order, with the ids
+    that were not found. `fields` limits each item to those fields (`id` is always included).
+    """
+    service = ProductService(db)
+    return await service.lookup_products(lookup_in.ids, lookup_in.fields)
+
+@router.get(
+    "/", response_model=List[ProductRead],
+    dependencies=[Depends(admit("list_products", Priority.LOW))],
+)
 async def list_products(
-    skip: int = Query(0, ge=0),
+    skip: int = Query(0, ge=0, description="Offset; latency grows with it, prefer /page for deep listings"),
     limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    cache: ProductCache = Depends(read_cache)
+):
+    """Lists active products as a plain array, ordered by (created_at, id)."""
+    service = ProductService(db, cache)
+    page = await service.get_all_products(skip=skip, limit=limit)
+    return page.items
+
+@router.get(
+    "/page", response_model=Page[ProductRead],
+    dependencies=[Depends(admit("list_products", Priority.LOW))],
+)
+async def list_products_page(
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    cache: ProductCache = Depends(read_cache)
+):
+    """Lists active products with keyset pagination: a `Page` with `next_cursor`."""
+    service = ProductService(db, cache)
+    return await service.get_all_products(limit=limit, cursor=cursor)
+
+@router.get(
+    "/search", response_model=Page[ProductRead],
+    dependencies=[Depends(admit("search_products", Priority.NORMAL))],
+)
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=255, description="Name prefix, fragment or misspelling"),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Type-ahead product search: names starting with `q` first (alphabetically), then names
+    containing a word similar to `q` (pg_trgm word similarity, best match first).
+    """
+    service = ProductService(db)
+    return await service.search_products(q, limit=limit, cursor=cursor)
+
+@router.get(
+    "/changes", response_model=ProductChangeFeed,
+    dependencies=[Depends(admit("list_product_changes", Priority.NORMAL))],
+)
+async def list_product_changes(
+    since: Optional[str] = Query(None, description="next_cursor of the previous call; omit to start from the oldest retained change"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Incremental catalog sync: inserts, updates (name, price) and soft deletes of products,
+    in commit-safe order, each with the product's current state. Keep calling with the
+    returned `next_cursor`; a cursor never skips a change, though a product may appear
+    again if it changed again. Stock levels are not part of the feed.
+    """
+    service = ProductService(db)
+    return await service.list_changes(since=since, limit=limit)
+
+@router.get("/stream")
+async def stream_stock(
+    product_id: Optional[List[UUID]] = Query(None, max_length=100, description="Only these products; all if omitted"),
+):
+    """
+    Live stock levels as Server-Sent Events (`event: stock`, data `{"id", "stock_quantity"}`),
+    pushed when an order, cancellation or batch commits. Slow clients get only the latest
+    level of each product. Holds no database connection and no admission slot.
+    """
+    if not settings.PRODUCT_STOCK_STREAM_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Stock streaming is not enabled")
+    subscription = stock_broadcaster.subscribe(product_id)
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many stock stream subscribers. Please retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+    return StreamingResponse(
+        sse_events(stock_broadcaster, subscription, settings.PRODUCT_STREAM_KEEPALIVE_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.put(
+    "/{product_id}/stock-shards", response_model=ProductRead,
+    dependencies=[Depends(admit("set_stock_shards", Priority.NORMAL))],
+)
+async def set_stock_shards(
+    product_id: UUID,
+    shards_in: ProductStockShards,
     db: AsyncSession = Depends(get_db)
 ):
+    """
+    Splits a hot product's stock over `shard_count` sub-counters so concurrent orders
+    stop queueing on one row lock (0 merges them back). The total stock is unchanged.
+    """
+    service = ProductService(db)
+    product = await service.set_stock_shards(product_id, shards_in.shard_count)
+    if product is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    return product
+
+@router.get(
+    "/{product_id}/stock", response_model=ProductStockRead,
+    dependencies=[Depends(admit("get_product_stock", Priority.NORMAL))],
+)
+async def get_product_stock(
+    product_id: UUID,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Stock still available to orders and reservations, and stock held by open reservations."""
     service = ProductService(db)
-    return await service.get_all_products(skip=skip, limit=limit)
\ No newline at end of file
+    stock = await service.get_stock(product_id)
+    if stock is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    return stock
+
+# Declared last so "/{product_id}" does not shadow the fixed paths above
+@router.get(
+    "/{product_id}", response_model=ProductRead,
+    dependencies=[Depends(admit("get_product", Priority.NORMAL))],
+)
+async def get_product(
+    product_id: UUID,
+    db: AsyncSession = Depends(get_read_db),
+    cache: ProductCache = Depends(read_cache)
+):
+    service = ProductService(db, cache)
+    product = await service.get_product_by_id(product_id)
+    if product is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    return product
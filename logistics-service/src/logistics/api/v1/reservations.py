@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+
+from src.logistics.core.admission import Priority, admit
+from src.logistics.db.session import get_db
+from src.logistics.services.reservation_service import ReservationService
+from src.logistics.schemas.order import OrderRead
+from src.logistics.schemas.reservation import ReservationCreate, ReservationRead
+
+router = APIRouter(prefix="/reservations", tags=["Reservation"])
+
+@router.post(
+    "/", response_model=ReservationRead, status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admit("create_reservation", Priority.NORMAL))],
+)
+async def create_reservation(
+    reservation_in: ReservationCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Holds stock for a cart until `expires_at`. Fails like an order would (404 unknown
+    product, 400 insufficient stock), so shortages show up before checkout.
+    """
+    service = ReservationService(db)
+    return await service.create_reservation(reservation_in)
+
+@router.post(
+    "/{reservation_id}/order", response_model=OrderRead, status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admit("create_order_from_reservation", Priority.CRITICAL))],
+)
+async def create_order_from_reservation(
+    reservation_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Checkout: turns the reservation into a pending order at the reserved prices, without
+    checking or locking stock again. 410 once the reservation has expired.
+    """
+    service = ReservationService(db)
+    return await service.create_order(reservation_id)
+
+@router.delete(
+    "/{reservation_id}", status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(admit("release_reservation", Priority.NORMAL))],
+)
+async def release_reservation(
+    reservation_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Abandons the cart and returns its stock right away instead of at expiry."""
+    service = ReservationService(db)
+    await service.release_reservation(reservation_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,66 @@
+"""
+Operational commands for the logistics service.
+
+Usage:
+    uv run python -m src.logistics.cli import-products catalog.csv
+    uv run python -m src.logistics.cli import-products catalog.ndjson --format ndjson
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+
+from src.logistics.db.session import AsyncSessionLocal, engine
+from src.logistics.schemas.enums import ImportFormat
+from src.logistics.services.product_service import ProductService
+
+CHUNK_SIZE = 64 * 1024
+
+
+async def _read_chunks(path: Path) -> AsyncIterator[bytes]:
+    with path.open("rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
+async def import_products(path: Path, format: ImportFormat) -> None:
+    try:
+        async with AsyncSessionLocal() as session:
+            service = ProductService(session)
+            result = await service.import_products(_read_chunks(path), format)
+    except HTTPException as exc:
+        sys.exit(f"Import failed: {exc.detail}")
+    finally:
+        await engine.dispose()
+    print(
+        f"received={result.received} inserted={result.inserted} "
+        f"updated={result.updated} unchanged={result.unchanged}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="logistics")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import-products", help="Bulk upsert products from a CSV or NDJSON file")
+    importer.add_argument("path", type=Path)
+    importer.add_argument(
+        "--format",
+        type=ImportFormat,
+        choices=list(ImportFormat),
+        help="Defaults to the file extension (.csv / .ndjson / .jsonl)",
+    )
+
+    args = parser.parse_args()
+    if args.command == "import-products":
+        format = args.format or (
+            ImportFormat.NDJSON if args.path.suffix in (".ndjson", ".jsonl") else ImportFormat.CSV
+        )
+        asyncio.run(import_products(args.path, format))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import asyncio
+import bisect
+import itertools
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import AsyncGenerator, Dict, List, Optional
+
+from fastapi import HTTPException, status
+
+from src.logistics.core.config import settings
+from src.logistics.core.metrics import Counter, Gauge, Histogram, registry
+
+
+class Priority(IntEnum):
+    """Lower value wins. Critical routes may use the reserved slots; low ones are shed first."""
+    CRITICAL = 0
+    NORMAL = 1
+    LOW = 2
+
+
+ADMISSION_SHED = registry.register(Counter(
+    "admission_shed_total", "Requests rejected with 503 before reaching the database.", ("route", "reason"),
+))
+ADMISSION_WAIT = registry.register(Histogram(
+    "admission_wait_seconds", "Time admitted requests waited in the admission queue.", ("route",),
+))
+ADMISSION_QUEUE_DEPTH = registry.register(Gauge(
+    "admission_queue_depth", "Requests waiting for a database slot, by priority.", ("priority",),
+))
+ADMISSION_IN_FLIGHT = registry.register(Gauge(
+    "admission_in_flight", "Requests currently holding a database slot.",
+))
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    route: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class AdmissionController:
+    """
+    Bounds how many requests use the database at once, per process.
+
+    A request gets a slot immediately while fewer than `capacity` are in flight and its
+    route is under its own limit; `reserved_critical` of the slots are kept for critical
+    routes, so a flood of listings cannot starve order creation. Otherwise it waits in a
+    bounded queue served in priority order. When the queue is full the lowest-priority,
+    newest waiter is shed to make room for a more important request (or the newcomer is
+    shed), and nobody waits longer than `queue_timeout` seconds. Shed requests fail fast
+    with 503 + Retry-After instead of queueing for the pool's 30 s checkout timeout.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        reserved_critical: int = 0,
+        max_queue: int = 100,
+        queue_timeout: float = 2.0,
+        retry_after: int = 1,
+        route_limits: Optional[Dict[str, int]] = None,
+        enabled: bool = True,
+    ):
+        self.capacity = capacity
+        self.reserved_critical = min(reserved_critical, capacity - 1)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.route_limits = dict(route_limits or {})
+        self.enabled = enabled
+        self.in_flight = 0
+        self._route_in_flight: Dict[str, int] = {}
+        self._waiters: List[_Waiter] = []  # Sorted: highest priority, then oldest, first
+        self._seq = itertools.count()
+        self.shed: Dict[str, int] = {}
+
+    def _can_run(self, route: str, priority: int) -> bool:
+        capacity = self.capacity if priority == Priority.CRITICAL else self.capacity - self.reserved_critical
+        limit = self.route_limits.get(route)
+        return self.in_flight < capacity and (limit is None or self._route_in_flight.get(route, 0) < limit)
+
+    def _grant(self, route: str) -> None:
+        self.in_flight += 1
+        self._route_in_flight[route] = self._route_in_flight.get(route, 0) + 1
+
+    def _shed(self, route: str, reason: str) -> HTTPException:
+        ADMISSION_SHED.inc(route, reason)
+        self.shed[reason] = self.shed.get(reason, 0) + 1
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The service is overloaded. Please retry shortly.",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    def _update_gauges(self) -> None:
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+        for priority in Priority:
+            ADMISSION_QUEUE_DEPTH.set(
+                sum(1 for w in self._waiters if w.priority == priority), priority.name.lower()
+            )
+
+    def _wake(self) -> None:
+        """Admits every waiter that fits, in priority order; waiters blocked only by their route limit are passed over."""
+        for waiter in list(self._waiters):
+            if self._can_run(waiter.route, waiter.priority):
+                self._waiters.remove(waiter)
+                self._grant(waiter.route)
+                waiter.future.set_result(None)
+
+    async def acquire(self, route: str, priority: Priority) -> None:
+        # Every queued waiter is blocked (`_wake` runs on each release), so a request that
+        # fits now takes its slot without jumping anyone; only requests that wait hit the queue bound
+        if self._can_run(route, priority):
+            self._grant(route)
+            self._update_gauges()
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            victim = self._waiters[-1]
+            if victim.priority <= priority:
+                raise self._shed(route, "queue_full")
+            self._waiters.pop()
+            victim.future.set_exception(self._shed(victim.route, "evicted"))
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority, next(self._seq), route, loop.create_future())
+        bisect.insort(self._waiters, waiter)
+        self._wake()
+        self._update_gauges()
+        started = loop.time()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not waiter.future.done():
+                self._waiters.remove(waiter)
+                raise self._shed(route, "timeout")
+            # Admitted (or evicted) in the same loop iteration the timeout fired
+            waiter.future.result()
+        except asyncio.CancelledError:
+            # Client went away: give back the slot if it was granted in the meantime
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.future.done() and waiter.future.exception() is None:
+                self.release(route)
+            raise
+        finally:
+            self._update_gauges()
+        ADMISSION_WAIT.observe(loop.time() - started, route)
+
+    def release(self, route: str) -> None:
+        self.in_flight -= 1
+        self._route_in_flight[route] -= 1
+        self._wake()
+        self._update_gauges()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "shed": dict(self.shed),
+        }
+
+
+def admit(route: str, priority: Priority = Priority.NORMAL):
+    """
+    Route dependency that holds a database slot for the whole request (including a
+    streamed response body). Declare it on every route that talks to the database:
+
+        @router.get("/", dependencies=[Depends(admit("list_orders", Priority.LOW))])
+    """
+    async def dependency() -> AsyncGenerator[None, None]:
+        if not admission.enabled:
+            yield
+            return
+        await admission.acquire(route, priority)
+        try:
+            yield
+        finally:
+            admission.release(route)
+
+    return dependency
+
+
+admission = AdmissionController(
+    capacity=settings.ADMISSION_MAX_CONCURRENCY or settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+    reserved_critical=settings.ADMISSION_RESERVED_CRITICAL,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_MS / 1000,
+    retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+    route_limits=settings.ADMISSION_ROUTE_LIMITS,
+    enabled=settings.ADMISSION_ENABLED,
+)
@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import PostgresDsn, computed_field
 from functools import lru_cache
+from typing import Dict, Optional
 import os
 
 class Settings(BaseSettings):
@@ -26,11 +27,88 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     POSTGRES_PORT: int = 5432
 
+    # Read Replica (optional): GET routes read from it when POSTGRES_READ_SERVER is set
+    POSTGRES_READ_SERVER: Optional[str] = None
+    POSTGRES_READ_PORT: Optional[int] = None  # Defaults to POSTGRES_PORT
+    READ_REPLICA_STICKY_SECONDS: float = 5.0  # Read-your-writes: a client reads from the primary this long after a write
+    READ_REPLICA_RETRY_SECONDS: float = 30.0  # After a failed replica connection, use the primary this long
+    READ_REPLICA_CONNECT_TIMEOUT: float = 2.0
+
     # Database Pool Settings
     DB_POOL_SIZE: int = 20
     DB_MAX_OVERFLOW: int = 10
     DB_POOL_PRE_PING: bool = True
 
+    # Admission control in front of the pool: requests beyond the concurrency limit wait in a
+    # bounded priority queue, and are shed with 503 + Retry-After instead of waiting for pool_timeout
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENCY: Optional[int] = None  # Defaults to DB_POOL_SIZE + DB_MAX_OVERFLOW
+    ADMISSION_RESERVED_CRITICAL: int = 5  # Slots only critical routes (order writes) may use
+    ADMISSION_MAX_QUEUE: int = 100
+    ADMISSION_QUEUE_TIMEOUT_MS: float = 2000.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    ADMISSION_ROUTE_LIMITS: Dict[str, int] = {
+        "export_orders": 2,
+        "import_products": 1,
+        "list_orders": 10,
+        "list_products": 10,
+        "update_order_statuses": 2,
+    }
+
+    # Timeouts (ms, 0 = none) applied to every connection; a stuck lock holder fails writers fast
+    DB_LOCK_TIMEOUT_MS: int = 2000
+    DB_STATEMENT_TIMEOUT_MS: int = 15000
+    PRODUCT_IMPORT_STATEMENT_TIMEOUT_MS: int = 0  # A large catalog COPY may legitimately run long
+
+    # Write transactions that hit a deadlock, lock timeout, serialization failure or dropped
+    # connection are re-run with jittered exponential backoff within these limits.
+    # The budget is wall-clock time from the first attempt, so it must leave room for a
+    # failed attempt: several DB_LOCK_TIMEOUT_MS, and deadlocks only surface after the
+    # server's deadlock_timeout (1 s by default).
+    DB_RETRY_MAX_ATTEMPTS: int = 3
+    DB_RETRY_BASE_DELAY_MS: float = 10.0
+    DB_RETRY_MAX_DELAY_MS: float = 200.0
+    DB_RETRY_BUDGET_MS: float = 5000.0
+
+    # Product Cache Settings
+    PRODUCT_CACHE_ENABLED: bool = True
+    PRODUCT_CACHE_TTL_SECONDS: float = 30.0
+    PRODUCT_CACHE_MAX_SIZE: int = 10_000
+
+    # Product change feed (GET /products/changes): consumers must resume within the retention
+    PRODUCT_CHANGES_RETENTION_HOURS: float = 168.0
+    PRODUCT_CHANGES_SWEEP_INTERVAL_SECONDS: float = 600.0
+    PRODUCT_CHANGES_SWEEP_BATCH: int = 5000
+
+    # Live stock over SSE (opt-in, GET /products/stream): order transactions NOTIFY the new stock
+    # of the products they changed, and one LISTEN connection per worker fans it out. Costs one
+    # statement per order transaction plus the server-wide NOTIFY queue lock at commit.
+    PRODUCT_STOCK_STREAM_ENABLED: bool = False
+    PRODUCT_STREAM_MAX_SUBSCRIBERS: int = 1000  # Per worker
+    PRODUCT_STREAM_MAX_PENDING: int = 1000  # Products buffered per slow subscriber; older updates are dropped
+    PRODUCT_STREAM_KEEPALIVE_SECONDS: float = 15.0
+
+    # Group-commit ingestion (opt-in): POST /orders/ is queued and committed in micro-batches
+    ORDER_GROUP_COMMIT_ENABLED: bool = False
+    ORDER_GROUP_COMMIT_MAX_BATCH: int = 100  # Flush once this many orders are queued...
+    ORDER_GROUP_COMMIT_WAIT_MS: float = 5.0  # ...or this long after the first one arrived
+    ORDER_GROUP_COMMIT_MAX_QUEUE: int = 1000  # Callers wait for room beyond this many queued orders
+
+    # Idempotency-Key on POST /orders/: retries within the TTL replay the stored response
+    ORDER_IDEMPOTENCY_TTL_HOURS: float = 24.0
+    ORDER_IDEMPOTENCY_SWEEP_INTERVAL_SECONDS: float = 300.0
+    ORDER_IDEMPOTENCY_SWEEP_BATCH: int = 1000  # Keys deleted per sweeper transaction
+
+    # Stock reservations (POST /reservations/): stock is held from the reservation until it
+    # becomes an order, is released, or expires and is returned by the sweeper
+    RESERVATION_DEFAULT_TTL_SECONDS: int = 900
+    RESERVATION_MAX_TTL_SECONDS: int = 3600
+    RESERVATION_SWEEP_INTERVAL_SECONDS: float = 15.0
+    RESERVATION_SWEEP_BATCH: int = 500  # Reservations released per sweeper transaction
+
+    # Serve GET /orders/{id} as one json_agg query instead of ORM + Pydantic
+    ORDER_READ_JSON_PROJECTION: bool = False
+
     @computed_field  # type: ignore[misc]
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> PostgresDsn:
@@ -43,6 +121,20 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    @computed_field  # type: ignore[misc]
+    @property
+    def SQLALCHEMY_READ_DATABASE_URI(self) -> Optional[PostgresDsn]:
+        if not self.POSTGRES_READ_SERVER:
+            return None
+        return PostgresDsn.build(
+            scheme="postgresql+asyncpg",
+            username=self.POSTGRES_USER,
+            password=self.POSTGRES_PASSWORD,
+            host=self.POSTGRES_READ_SERVER,
+            port=self.POSTGRES_READ_PORT or self.POSTGRES_PORT,
+            path=self.POSTGRES_DB,
+        )
+
     @computed_field
     @property
     def SQLALCHEMY_TEST_DATABASE_URI(self) -> PostgresDsn:
@@ -0,0 +1,54 @@
+import os
+import threading
+import time
+import uuid
+
+# Mirrors uuid7() for rows created in SQL (catalog import merge, ad-hoc inserts).
+# Same layout: 48-bit Unix milliseconds, then random bits with the version set to 7.
+UUID7_SQL_FUNCTION = """
+CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid
+LANGUAGE sql VOLATILE PARALLEL SAFE AS $$
+    SELECT encode(
+        set_bit(set_bit(
+            overlay(
+                uuid_send(gen_random_uuid())
+                PLACING substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                FROM 1 FOR 6
+            ),
+        52, 1), 53, 1),
+    'hex')::uuid
+$$
+"""
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (RFC 9562, version 7) used as the default primary key.
+
+    The 12-bit `rand_a` field holds a counter seeded at random every millisecond,
+    so ids generated by one process are strictly increasing even within the same
+    millisecond. New rows therefore land on the rightmost B-tree leaf instead of a
+    random page, and ids from different processes still sort by creation time.
+    """
+    global _last_ms, _counter
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms = ms
+            # Leave head-room so the counter rarely overflows into the next millisecond
+            _counter = int.from_bytes(os.urandom(2)) & 0x7FF
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                # Counter exhausted (or the clock went backwards): borrow the next millisecond
+                _last_ms += 1
+                _counter = 0
+        ms, counter = _last_ms, _counter
+
+    rand_b = int.from_bytes(os.urandom(8)) & 0x3FFF_FFFF_FFFF_FFFF
+    value = (ms & 0xFFFF_FFFF_FFFF) << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | rand_b
+    return uuid.UUID(int=value)
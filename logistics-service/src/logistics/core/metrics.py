@@ -0,0 +1,277 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.logistics.core.config import settings
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 8, 13, 21, 50, 100)
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names, rendered as a Prometheus `counter`."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            for labels, value in self._values.items():
+                yield self.name, _format_labels(self.labelnames, labels), value
+
+
+class Gauge:
+    """Value that can go up and down, with a fixed set of label names, rendered as a Prometheus `gauge`."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            for labels, value in self._values.items():
+                yield self.name, _format_labels(self.labelnames, labels), value
+
+
+class Histogram:
+    """Cumulative-bucket histogram, rendered as a Prometheus `histogram`."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: ([count per bucket, +Inf last], [sum, count])
+        self._series: Dict[LabelValues, Tuple[list, list]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0, 0])
+            bucket_counts, totals = series
+            bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[1][1] if series else 0
+
+    def sum(self, *labels: str) -> float:
+        series = self._series.get(labels)
+        return series[1][0] if series else 0.0
+
+    def samples(self):
+        with self._lock:
+            for labels, (bucket_counts, (total, count)) in self._series.items():
+                cumulative = 0
+                for bound, bucket_count in zip((*self.buckets, float("inf")), bucket_counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else _format_value(bound)
+                    yield f"{self.name}_bucket", _format_labels(self.labelnames, labels, f'le="{le}"'), cumulative
+                yield f"{self.name}_sum", _format_labels(self.labelnames, labels), total
+                yield f"{self.name}_count", _format_labels(self.labelnames, labels), count
+
+
+class Registry:
+    """
+    In-process metric registry with Prometheus text exposition (format 0.0.4).
+    Metrics are per worker process; Prometheus aggregates across workers by instance.
+    """
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+_ROUTE_LABELS = ("method", "route")
+
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status code.", (*_ROUTE_LABELS, "status"),
+))
+HTTP_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds", "Total request latency, including streaming the response body.", _ROUTE_LABELS,
+))
+REQUEST_QUERIES = registry.register(Histogram(
+    "http_request_db_queries", "SQL statements executed per request.", _ROUTE_LABELS, QUERY_COUNT_BUCKETS,
+))
+REQUEST_DB_TIME = registry.register(Histogram(
+    "http_request_db_seconds", "Time spent executing SQL statements per request.", _ROUTE_LABELS,
+))
+REQUEST_POOL_WAIT = registry.register(Histogram(
+    "http_request_db_pool_wait_seconds", "Time spent waiting for a pooled connection per request.", _ROUTE_LABELS,
+))
+
+
+@dataclass
+class RequestStats:
+    """Database work attributed to the current request."""
+    queries: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+
+
+# Set per request by MetricsMiddleware. The object is mutated in place, so increments made
+# inside SQLAlchemy's greenlets (which copy the task's context) are visible to the middleware.
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+_QUERY_START_KEY = "metrics_query_start"
+
+
+def _record_query(conn) -> None:
+    started = conn.info.pop(_QUERY_START_KEY, None)
+    stats = current_request_stats.get()
+    if started is not None and stats is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info[_QUERY_START_KEY] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_query(conn)
+
+
+@event.listens_for(Engine, "handle_error")
+def _after_failed_query(exception_context):
+    # after_cursor_execute does not fire for statements that raise; they still cost a round trip
+    if exception_context.connection is not None:
+        _record_query(exception_context.connection)
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Queue pool that attributes the time spent waiting for a connection to the current request."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            stats = current_request_stats.get()
+            if stats is not None:
+                stats.pool_wait_seconds += time.perf_counter() - started
+
+
+def _route_label(scope) -> str:
+    """
+    Path template of the matched route (/api/v1/orders/{order_id}, not every id), which keeps
+    label cardinality bounded. Requests that match no route share one label.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    # Recent FastAPI versions keep an included route's path relative to its router. The
+    # include prefix is literal: it is whatever precedes the template's segments in the path
+    prefix = scope["path"].rsplit("/", route.path.count("/"))[0]
+    return prefix + route.path
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware that records per-route latency and database work.
+    With DEBUG enabled the query count is also returned in the `X-DB-Query-Count` header
+    (counted up to the moment the headers are sent, so streamed bodies are not included).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.DEBUG:
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERY_COUNT_HEADER.lower().encode(), str(stats.queries).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request_stats.reset(token)
+            labels = (scope["method"], _route_label(scope))
+            HTTP_REQUESTS.inc(*labels, str(status_code))
+            HTTP_LATENCY.observe(time.perf_counter() - started, *labels)
+            REQUEST_QUERIES.observe(stats.queries, *labels)
+            REQUEST_DB_TIME.observe(stats.db_seconds, *labels)
+            REQUEST_POOL_WAIT.observe(stats.pool_wait_seconds, *labels)
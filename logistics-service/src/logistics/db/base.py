@@ -1,4 +1,6 @@
+from sqlalchemy import DDL, event
 from sqlalchemy.orm import DeclarativeBase
+from src.logistics.core.ids import UUID7_SQL_FUNCTION
 
 class Base(DeclarativeBase):
     """
@@ -6,4 +8,7 @@ class Base(DeclarativeBase):
     This is isolated to prevent circular imports when models import Base,
     and the session manager imports models.
     """
-    pass
\ No newline at end of file
+    pass
+
+# Primary keys default to uuid_generate_v7() server-side, so the function must exist before the tables
+event.listen(Base.metadata, "before_create", DDL(UUID7_SQL_FUNCTION))
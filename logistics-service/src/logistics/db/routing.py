@@ -0,0 +1,77 @@
+import math
+import time
+from fastapi import Request
+from src.logistics.core.config import settings
+
+# Set on successful writes; while it is valid, reads from that client go to the primary
+PRIMARY_STICKY_COOKIE = "db_primary_until"
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class ReplicaHealth:
+    """
+    Per-process circuit breaker for the read replica.
+    After a failed connection the replica is skipped for READ_REPLICA_RETRY_SECONDS,
+    so an outage costs one connect timeout per worker instead of one per request.
+    """
+
+    def __init__(self):
+        self.down_until = 0.0
+        self.failures = 0
+
+    def available(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def mark_down(self) -> None:
+        self.failures += 1
+        self.down_until = time.monotonic() + settings.READ_REPLICA_RETRY_SECONDS
+
+    def reset(self) -> None:
+        self.down_until = 0.0
+
+
+replica_health = ReplicaHealth()
+
+
+def wants_primary(request: Request) -> bool:
+    """True while the client's read-your-writes window from a recent write is open."""
+    try:
+        until = float(request.cookies.get(PRIMARY_STICKY_COOKIE, ""))
+    except ValueError:
+        return False
+    now = time.time()
+    # The cookie is unsigned: a window longer than we ever hand out is forged, not honoured
+    return now < until <= now + settings.READ_REPLICA_STICKY_SECONDS
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware that opens a read-your-writes window for the client after a
+    successful write (non-safe method, status < 400), via a short-lived cookie that
+    `get_read_db` honours. Does nothing unless a read replica is configured.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] in SAFE_METHODS
+            or not settings.POSTGRES_READ_SERVER # Same check as the DSN, without building it per request
+            or settings.READ_REPLICA_STICKY_SECONDS <= 0
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                window = settings.READ_REPLICA_STICKY_SECONDS
+                cookie = (
+                    f"{PRIMARY_STICKY_COOKIE}={time.time() + window:.3f}; "
+                    f"Max-Age={math.ceil(window)}; Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode())]}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
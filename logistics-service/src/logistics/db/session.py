@@ -1,10 +1,24 @@
+import asyncio
+import logging
 from typing import AsyncGenerator
+from fastapi import Request
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     create_async_engine,
     async_sessionmaker,
 )
 from src.logistics.core.config import settings
+from src.logistics.core.metrics import InstrumentedAsyncPool
+from src.logistics.db.routing import replica_health, wants_primary
+
+logger = logging.getLogger(__name__)
+
+# Session defaults for every connection; TransactionPolicy overrides them per operation
+SERVER_SETTINGS = {
+    "lock_timeout": f"{settings.DB_LOCK_TIMEOUT_MS}ms",
+    "statement_timeout": f"{settings.DB_STATEMENT_TIMEOUT_MS}ms",
+}
 
 # Create the Async Engine
 engine = create_async_engine(
@@ -14,6 +28,8 @@ engine = create_async_engine(
     pool_size=settings.DB_POOL_SIZE,
     max_overflow=settings.DB_MAX_OVERFLOW,
     pool_pre_ping=settings.DB_POOL_PRE_PING,
+    poolclass=InstrumentedAsyncPool, # Reports connection checkout wait to /metrics
+    connect_args={"server_settings": SERVER_SETTINGS},
 )
 
 # Create the Session Factory
@@ -24,6 +40,29 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Optional read replica: its own engine and pool, so reads never queue behind writes
+read_engine = None
+AsyncReadSessionLocal = None
+if settings.SQLALCHEMY_READ_DATABASE_URI is not None:
+    read_engine = create_async_engine(
+        str(settings.SQLALCHEMY_READ_DATABASE_URI),
+        echo=settings.DEBUG,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        poolclass=InstrumentedAsyncPool,
+        connect_args={
+            "timeout": settings.READ_REPLICA_CONNECT_TIMEOUT, # Fail fast if the replica is unreachable
+            "server_settings": SERVER_SETTINGS,
+        },
+    )
+    AsyncReadSessionLocal = async_sessionmaker(
+        bind=read_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+    )
+
 # Dependency Injection for FastAPI
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -34,4 +73,33 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for read-only routes. Uses the replica when one is configured, except
+    inside the client's read-your-writes window or while the replica is marked down;
+    the primary is used in those cases.
+    """
+    session = await _open_read_session(request)
+    try:
+        yield session
+    finally:
+        await session.close()
+
+async def _open_read_session(request: Request) -> AsyncSession:
+    if AsyncReadSessionLocal is None or wants_primary(request) or not replica_health.available():
+        return AsyncSessionLocal()
+
+    session = AsyncReadSessionLocal()
+    try:
+        # Check out a connection now, so an unreachable replica is detected before the handler runs
+        await session.connection()
+    except (SQLAlchemyError, OSError, asyncio.TimeoutError) as exc:
+        await session.close()
+        replica_health.mark_down()
+        logger.warning(
+            f"Read replica unavailable, using the primary for {settings.READ_REPLICA_RETRY_SECONDS}s: {exc}"
+        )
+        return AsyncSessionLocal()
+    return session
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import random
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.logistics.core.config import settings
+from src.logistics.core.metrics import Counter, registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# SQLSTATEs that abort only the current attempt; running the transaction again can succeed
+RETRYABLE_SQLSTATES = {
+    "40001": "serialization_failure",
+    "40P01": "deadlock",
+    "55P03": "lock_timeout",
+}
+# Safe to retry inside a savepoint too: the error is raised by one statement and rolling
+# back to the savepoint releases the locks taken since. Serialization failures and lost
+# connections doom the enclosing transaction, so only a transaction we own can retry them.
+SAVEPOINT_RETRYABLE = {"deadlock", "lock_timeout"}
+
+CONNECTION_LOST = "connection_lost"
+STATEMENT_TIMEOUT_SQLSTATE = "57014"
+
+TRANSACTION_RETRIES = registry.register(Counter(
+    "db_transaction_retries_total", "Transactions re-run after a retryable database error.", ("operation", "reason"),
+))
+TRANSACTION_FAILURES = registry.register(Counter(
+    "db_transaction_failures_total",
+    "Transactions given up on after a retryable error or timeout (answered 409/503).", ("operation", "reason"),
+))
+
+
+@dataclass(frozen=True)
+class TransactionPolicy:
+    """
+    Timeouts and retry limits for one kind of write. Timeouts are in milliseconds, 0 disables them.
+    Connections already default to DB_LOCK_TIMEOUT_MS / DB_STATEMENT_TIMEOUT_MS, so those only
+    cost an extra `SET LOCAL` round trip when an operation overrides them.
+    """
+    lock_timeout_ms: int = settings.DB_LOCK_TIMEOUT_MS
+    statement_timeout_ms: int = settings.DB_STATEMENT_TIMEOUT_MS
+    max_attempts: int = settings.DB_RETRY_MAX_ATTEMPTS
+    budget_ms: float = settings.DB_RETRY_BUDGET_MS
+
+
+DEFAULT_POLICY = TransactionPolicy()
+
+
+def _retry_reason(exc: DBAPIError) -> Optional[str]:
+    if exc.connection_invalidated:
+        return CONNECTION_LOST
+    return RETRYABLE_SQLSTATES.get(getattr(exc.orig, "sqlstate", None))
+
+
+def _backoff_seconds(attempt: int) -> float:
+    """Full-jitter exponential backoff, so retrying writers do not collide again in lockstep."""
+    ceiling = min(settings.DB_RETRY_MAX_DELAY_MS, settings.DB_RETRY_BASE_DELAY_MS * 2 ** (attempt - 1))
+    return random.uniform(0, ceiling) / 1000
+
+
+def _give_up(operation: str, reason: str) -> HTTPException:
+    TRANSACTION_FAILURES.inc(operation, reason)
+    if reason in ("deadlock", "serialization_failure"):
+        # Lost a race with a concurrent write; the request itself is fine to resend
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The request conflicted with concurrent updates. Please retry.",
+        )
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="The database is busy. Please retry shortly.",
+        headers={"Retry-After": "1"},
+    )
+
+
+_SET_TIMEOUTS = text(
+    "SELECT set_config('lock_timeout', :lock, true), set_config('statement_timeout', :stmt, true)"
+)
+
+
+async def _apply_timeouts(db: AsyncSession, policy: TransactionPolicy, nested: bool) -> Optional[tuple]:
+    """
+    Applies the policy's timeouts for the current transaction. Inside a savepoint the
+    values in force before are returned, to be put back with `_restore_timeouts`.
+    """
+    if (policy.lock_timeout_ms, policy.statement_timeout_ms) == (
+        DEFAULT_POLICY.lock_timeout_ms, DEFAULT_POLICY.statement_timeout_ms
+    ):
+        return None
+    previous = None
+    if nested:
+        # SET LOCAL outlives a released savepoint: it would stay in force for the caller's
+        # later statements. (A rolled back savepoint reverts it by itself.)
+        previous = tuple((await db.execute(
+            text("SELECT current_setting('lock_timeout'), current_setting('statement_timeout')")
+        )).one())
+    # set_config(..., true) is SET LOCAL with bind parameters: reverts when the transaction ends
+    await db.execute(_SET_TIMEOUTS, {"lock": f"{policy.lock_timeout_ms}ms", "stmt": f"{policy.statement_timeout_ms}ms"})
+    return previous
+
+
+async def _restore_timeouts(db: AsyncSession, previous: tuple) -> None:
+    lock, stmt = previous
+    await db.execute(_SET_TIMEOUTS, {"lock": lock, "stmt": stmt})
+
+
+async def run_in_transaction(
+    db: AsyncSession,
+    operation: str,
+    work: Callable[[], Awaitable[T]],
+    policy: TransactionPolicy = DEFAULT_POLICY,
+) -> T:
+    """
+    Runs `work` in a transaction (a savepoint if one is already open) and returns its result.
+
+    Deadlocks, lock timeouts, serialization failures and dropped connections roll the
+    attempt back and run `work` again after a jittered backoff, until `policy.max_attempts`
+    or `policy.budget_ms` is used up. The client then gets a 409 (conflict) or 503 with
+    Retry-After (busy) instead of a 500; a statement timeout answers 503 right away.
+    `work` must be safe to run again: build every ORM object inside it.
+    """
+    nested = db.in_transaction()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + policy.budget_ms / 1000
+    attempt = 1
+    while True:
+        try:
+            async with (db.begin_nested() if nested else db.begin()):
+                previous = await _apply_timeouts(db, policy, nested)
+                result = await work()
+                if previous is not None:
+                    await _restore_timeouts(db, previous)
+                return result
+        except DBAPIError as exc:
+            if getattr(exc.orig, "sqlstate", None) == STATEMENT_TIMEOUT_SQLSTATE:
+                raise _give_up(operation, "statement_timeout") from exc
+            reason = _retry_reason(exc)
+            if reason is None or (nested and reason not in SAVEPOINT_RETRYABLE):
+                raise
+            delay = _backoff_seconds(attempt)
+            if attempt >= policy.max_attempts or loop.time() + delay > deadline:
+                logger.warning(f"{operation}: giving up after {attempt} attempt(s): {reason}")
+                raise _give_up(operation, reason) from exc
+            TRANSACTION_RETRIES.inc(operation, reason)
+            logger.info(f"{operation}: retrying after {reason} (attempt {attempt})")
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -1,25 +1,89 @@
 from fastapi import FastAPI, Request, status, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import text
 import logging
+from contextlib import asynccontextmanager
 
 from src.logistics.api.v1.products import router as products
 from src.logistics.api.v1.orders import router as orders
+from src.logistics.api.v1.reservations import router as reservations
+from src.logistics.core.admission import admission
 from src.logistics.core.config import settings
-from src.logistics.db.session import get_db
+from src.logistics.core.metrics import MetricsMiddleware, registry
+from src.logistics.db.routing import ReadYourWritesMiddleware
+from src.logistics.db.session import AsyncSessionLocal, get_db
+from src.logistics.services.order_batcher import OrderBatcher
+from src.logistics.services.order_service import OrderService
+from src.logistics.services.product_cache import product_cache
+from src.logistics.services.product_service import ProductService
+from src.logistics.services.reservation_service import ReservationService
+from src.logistics.services.stock_stream import stock_broadcaster
+from src.logistics.services.sweeper import Sweeper
 
 # Setup logging for production monitoring
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Starts the background workers (group commit when enabled, sweepers) and stops them on shutdown."""
+    app.state.order_batcher = None
+    if settings.ORDER_GROUP_COMMIT_ENABLED:
+        app.state.order_batcher = OrderBatcher(
+            AsyncSessionLocal,
+            max_batch_size=settings.ORDER_GROUP_COMMIT_MAX_BATCH,
+            max_wait_seconds=settings.ORDER_GROUP_COMMIT_WAIT_MS / 1000,
+            max_queue_size=settings.ORDER_GROUP_COMMIT_MAX_QUEUE,
+        )
+        app.state.order_batcher.start()
+    app.state.sweepers = [
+        Sweeper(
+            "order_idempotency_keys",
+            AsyncSessionLocal,
+            lambda session, limit: OrderService(session).expire_idempotency_keys(limit),
+            interval_seconds=settings.ORDER_IDEMPOTENCY_SWEEP_INTERVAL_SECONDS,
+            batch_size=settings.ORDER_IDEMPOTENCY_SWEEP_BATCH,
+        ),
+        Sweeper(
+            "product_changes",
+            AsyncSessionLocal,
+            lambda session, limit: ProductService(session).expire_changes(limit),
+            interval_seconds=settings.PRODUCT_CHANGES_SWEEP_INTERVAL_SECONDS,
+            batch_size=settings.PRODUCT_CHANGES_SWEEP_BATCH,
+        ),
+        Sweeper(
+            "stock_reservations",
+            AsyncSessionLocal,
+            lambda session, limit: ReservationService(session).expire_reservations(limit),
+            interval_seconds=settings.RESERVATION_SWEEP_INTERVAL_SECONDS,
+            batch_size=settings.RESERVATION_SWEEP_BATCH,
+        ),
+    ]
+    for sweeper in app.state.sweepers:
+        sweeper.start()
+    if settings.PRODUCT_STOCK_STREAM_ENABLED:
+        stock_broadcaster.start()
+    yield
+    await stock_broadcaster.stop()
+    for sweeper in app.state.sweepers:
+        await sweeper.stop()
+    if app.state.order_batcher is not None:
+        await app.state.order_batcher.stop()
+
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.APP_NAME,
     version="1.0.0",
     openapi_url=f"{settings.API_V1_STR}/openapi.json"
 )
 
+# Per-route latency, SQL query counts, DB time and pool wait, exposed at /metrics
+app.add_middleware(MetricsMiddleware)
+# Sends a client's reads to the primary for a short window after it writes
+app.add_middleware(ReadYourWritesMiddleware)
+
 # --- Global Exception Handlers ---
 
 @app.exception_handler(SQLAlchemyError)
@@ -37,6 +101,7 @@ async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
 
 app.include_router(products, prefix=settings.API_V1_STR)
 app.include_router(orders, prefix=settings.API_V1_STR)
+app.include_router(reservations, prefix=settings.API_V1_STR)
 
 @app.get("/health", tags=["Health"])
 async def health_check(db: AsyncSession = Depends(get_db)):
@@ -49,4 +114,19 @@ async def health_check(db: AsyncSession = Depends(get_db)):
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             # content={"status": "unhealthy", "detail": "Database connection failed"}
             content={"status": "unhealthy", "detail": str(e)}
-        )
\ No newline at end of file
+        )
+
+@app.get("/health/cache", tags=["Health"])
+async def cache_stats():
+    """Hit/miss counters and occupancy of the product read cache."""
+    return product_cache.stats()
+
+@app.get("/health/admission", tags=["Health"])
+async def admission_stats():
+    """Database slots in use, queued requests and shed counts of this worker."""
+    return admission.stats()
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of this worker's request and database metrics."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
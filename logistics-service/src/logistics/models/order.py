@@ -1,20 +1,19 @@
-from sqlalchemy import Column, Integer, ForeignKey, Numeric, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, ForeignKey, Numeric, DateTime, Index, String, Enum as SQLEnum
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import UUID
-import uuid
+from sqlalchemy.sql import func, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from src.logistics.core.ids import uuid7
 from src.logistics.db.base import Base
 from src.logistics.schemas.enums import OrderStatus # Reusing the domain Enum
 
 class Order(Base):
     __tablename__ = "orders"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7, server_default=text('uuid_generate_v7()'), unique=True, nullable=False)
     status = Column(
         SQLEnum(OrderStatus),
         nullable=False, 
-        default=OrderStatus.PENDING, 
-        index=True
+        default=OrderStatus.PENDING
     )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -23,15 +22,50 @@ class Order(Base):
     # Relationship for Eager Loading
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination over active orders, scanned backwards for newest-first listings
+        Index(
+            'ix_orders_active_created_at_id', created_at, id,
+            postgresql_where=deleted_at.is_(None)
+        ),
+        # Listing filtered by status, newest first: equality on status, then an ordered range on created_at
+        Index(
+            'ix_orders_active_status_created_at_id', status, created_at, id,
+            postgresql_where=deleted_at.is_(None)
+        ),
+    )
+
 class OrderItem(Base):
     __tablename__ = "order_items"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7, server_default=text('uuid_generate_v7()'), unique=True, nullable=False)
     order_id = Column(UUID(as_uuid=True), ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True)
-    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id"), nullable=False, index=True)
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
     price_at_order = Column(Numeric(10, 2), nullable=False) # Historical integrity 
 
     # Relationships
     order = relationship("Order", back_populates="items")
-    product = relationship("Product")
\ No newline at end of file
+    product = relationship("Product")
+
+    __table_args__ = (
+        # "Orders containing product X": an index-only semi-join from product to order ids
+        Index('ix_order_items_product_id_order_id', product_id, order_id),
+    )
+
+class OrderIdempotencyKey(Base):
+    """
+    An `Idempotency-Key` sent with POST /orders/. Claimed before any stock is touched and
+    completed with the stored response in the same transaction as the order it created.
+    """
+    __tablename__ = "order_idempotency_keys"
+
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)  # sha256 of the request body; a reused key must match it
+    response = Column(JSONB, nullable=True)  # The OrderRead returned to the first request, set before commit
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # TTL sweep: oldest keys first
+        Index('ix_order_idempotency_keys_created_at', created_at),
+    )
@@ -1,16 +1,19 @@
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, CheckConstraint
-from sqlalchemy.sql import func
+from sqlalchemy import BigInteger, Column, Identity, Integer, SmallInteger, String, Numeric, DateTime, CheckConstraint, ForeignKey, Index, DDL, event, case, select
+from sqlalchemy.orm import column_property
+from sqlalchemy.sql import func, text, table, column
 from sqlalchemy.dialects.postgresql import UUID
-import uuid
+from src.logistics.core.ids import uuid7
 from src.logistics.db.base import Base
 
 class Product(Base):
     __tablename__ = "products"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, nullable=False)
-    name = Column(String(255), nullable=False, index=True) # Indexed for high-throughput searching 
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7, server_default=text('uuid_generate_v7()'), unique=True, nullable=False)
+    name = Column(String(255), nullable=False) # Indexed (active rows only) for high-throughput searching
     price = Column(Numeric(10, 2), nullable=False)
     stock_quantity = Column(Integer, nullable=False, default=0)
+    # Hot SKUs keep their stock in this many product_stock_shards rows instead (0 = unsharded)
+    stock_shard_count = Column(SmallInteger, nullable=False, default=0, server_default=text('0'))
 
     # Metadata for auditing and Soft Delete
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -19,4 +22,149 @@ class Product(Base):
 
     __table_args__ = (
         CheckConstraint('stock_quantity >= 0', name='check_stock_non_negative'),
-    )
\ No newline at end of file
+        # Exact lookups by name (get_by_name, catalog import merge) on active rows
+        Index('ix_products_active_name', name, postgresql_where=deleted_at.is_(None)),
+        # Keyset pagination over active products: (created_at, id) > :cursor
+        Index(
+            'ix_products_active_created_at_id', created_at, id,
+            postgresql_where=deleted_at.is_(None)
+        ),
+        # Type-ahead search, prefix tier: LIKE 'q%' range scan already in (lower(name), id) order
+        Index(
+            'ix_products_name_prefix', func.lower(name).collate('C'), id,
+            postgresql_where=deleted_at.is_(None)
+        ),
+        # Type-ahead search, fuzzy tier: trigram GIN serves word-similarity (<%) matches
+        Index(
+            'ix_products_name_trgm', name,
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+            postgresql_where=deleted_at.is_(None)
+        ),
+    )
+
+
+class ProductStockShard(Base):
+    """
+    One sub-counter of a sharded product's stock. Orders decrement a single shard,
+    so concurrent orders for the same hot product lock different rows.
+    """
+    __tablename__ = "product_stock_shards"
+
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id"), primary_key=True)
+    shard_no = Column(SmallInteger, primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        CheckConstraint('quantity >= 0', name='check_stock_shard_non_negative'),
+    )
+
+
+class ProductChange(Base):
+    """
+    Change log behind GET /products/changes, written by triggers on `products`: one row
+    per inserted product and per update of its catalog fields (name, price, deleted_at).
+    Stock levels are not logged; they change with every order.
+    """
+    __tablename__ = "product_changes"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    # pg_current_xact_id() of the writing transaction; the feed only returns changes of
+    # transactions older than every one still running, so a cursor never skips a late commit
+    txid = Column(BigInteger, nullable=False)
+    # No foreign key: no per-change FK check, and the log may outlive a hard-deleted product
+    product_id = Column(UUID(as_uuid=True), nullable=False)
+    operation = Column(String(10), nullable=False)  # insert / update / delete (soft)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Feed order and keyset cursor
+        Index('ix_product_changes_txid_id', txid, id),
+        # Retention sweep: oldest changes first
+        Index('ix_product_changes_changed_at', changed_at),
+    )
+
+
+# Inserts are logged per statement from the transition table, so a bulk import costs one
+# extra INSERT ... SELECT; updates only fire when a catalog column is in the SET list,
+# so stock decrements on the order path do not run the trigger at all.
+PRODUCT_CHANGE_TRIGGERS = [
+    """
+    CREATE FUNCTION log_product_inserts() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO product_changes (txid, product_id, operation)
+        SELECT pg_current_xact_id()::text::bigint, id, 'insert' FROM inserted_products;
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE FUNCTION log_product_update() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO product_changes (txid, product_id, operation)
+        VALUES (
+            pg_current_xact_id()::text::bigint,
+            NEW.id,
+            CASE WHEN NEW.deleted_at IS NOT NULL AND OLD.deleted_at IS NULL THEN 'delete' ELSE 'update' END
+        );
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE TRIGGER products_log_inserts AFTER INSERT ON products
+    REFERENCING NEW TABLE AS inserted_products
+    FOR EACH STATEMENT EXECUTE FUNCTION log_product_inserts()
+    """,
+    """
+    CREATE TRIGGER products_log_update AFTER UPDATE OF name, price, deleted_at ON products
+    FOR EACH ROW
+    WHEN ((OLD.name, OLD.price, OLD.deleted_at) IS DISTINCT FROM (NEW.name, NEW.price, NEW.deleted_at))
+    EXECUTE FUNCTION log_product_update()
+    """,
+]
+DROP_PRODUCT_CHANGE_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS products_log_update ON products",
+    "DROP TRIGGER IF EXISTS products_log_inserts ON products",
+    "DROP FUNCTION IF EXISTS log_product_update()",
+    "DROP FUNCTION IF EXISTS log_product_inserts()",
+]
+
+# Attached to products: the function bodies only resolve product_changes when they run
+for statement in PRODUCT_CHANGE_TRIGGERS:
+    event.listen(Product.__table__, "after_create", DDL(statement))
+for statement in DROP_PRODUCT_CHANGE_TRIGGERS:
+    event.listen(Product.__table__, "before_drop", DDL(statement))
+
+
+# Total stock of every sharded product; unsharded products keep theirs in products.stock_quantity
+PRODUCT_STOCK_TOTALS_VIEW = """
+CREATE VIEW product_stock_totals AS
+SELECT product_id, sum(quantity)::integer AS stock_quantity
+FROM product_stock_shards
+GROUP BY product_id
+"""
+
+event.listen(ProductStockShard.__table__, "after_create", DDL(PRODUCT_STOCK_TOTALS_VIEW))
+event.listen(ProductStockShard.__table__, "before_drop", DDL("DROP VIEW IF EXISTS product_stock_totals"))
+
+product_stock_totals = table(
+    "product_stock_totals",
+    column("product_id", UUID(as_uuid=True)),
+    column("stock_quantity", Integer),
+)
+
+# Stock as clients see it. The view is only consulted for sharded products, so unsharded
+# reads cost nothing extra; sharded ones sum their shards through the grouped view.
+Product.total_stock = column_property(
+    case(
+        (
+            Product.stock_shard_count > 0,
+            func.coalesce(
+                select(product_stock_totals.c.stock_quantity)
+                .where(product_stock_totals.c.product_id == Product.id)
+                .scalar_subquery(),
+                0,
+            ),
+        ),
+        else_=Product.stock_quantity,
+    )
+)
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, ForeignKey, Numeric, DateTime, Index, CheckConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func, text
+from sqlalchemy.dialects.postgresql import UUID
+from src.logistics.core.ids import uuid7
+from src.logistics.db.base import Base
+
+class StockReservation(Base):
+    """
+    Stock held for a cart until `expires_at`. The quantities are taken from the products
+    when the reservation is made, so turning it into an order locks no product row;
+    releasing it, or letting the sweeper expire it, puts them back.
+    """
+    __tablename__ = "stock_reservations"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7, server_default=text('uuid_generate_v7()'), unique=True, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    items = relationship("StockReservationItem", back_populates="reservation", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Expiry sweep: oldest deadlines first
+        Index('ix_stock_reservations_expires_at', expires_at),
+    )
+
+class StockReservationItem(Base):
+    __tablename__ = "stock_reservation_items"
+
+    reservation_id = Column(UUID(as_uuid=True), ForeignKey("stock_reservations.id", ondelete="CASCADE"), primary_key=True)
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id"), primary_key=True)
+    quantity = Column(Integer, nullable=False)
+    price_at_reservation = Column(Numeric(10, 2), nullable=False)  # Becomes the order's price_at_order
+
+    reservation = relationship("StockReservation", back_populates="items")
+
+    __table_args__ = (
+        CheckConstraint('quantity > 0', name='check_reservation_quantity_positive'),
+        # Reserved stock of a product: an index-only sum
+        Index('ix_stock_reservation_items_product_id', product_id, quantity),
+    )
@@ -1,6 +1,6 @@
-from typing import Generic, TypeVar, Type, Optional, List, Any
+from typing import Generic, TypeVar, Type, Optional, List, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select, update, tuple_
 from src.logistics.db.base import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -20,19 +20,48 @@ class BaseRepository(Generic[ModelType]):
         return result.scalar_one_or_none()
 
     async def list(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
-        """List records with pagination"""
+        """
+        List records with offset pagination (legacy).
+        Cost grows with `skip`; prefer `list_after` for deep pages.
+        """
         query = (
             select(self.model)
             .where(self.model.deleted_at == None)
+            .order_by(self.model.created_at, self.model.id)
             .offset(skip)
             .limit(limit)
         )
         result = await self.db_session.execute(query)
         return list(result.scalars().all())
 
+    async def list_after(
+        self,
+        after: Optional[Tuple[Any, Any]] = None,
+        limit: int = 100,
+        descending: bool = False,
+    ) -> List[ModelType]:
+        """
+        Keyset pagination on (created_at, id).
+        Seeks straight past the `after` key, so every page is an index range scan
+        on the partial `(created_at, id) WHERE deleted_at IS NULL` index.
+        """
+        query = self._keyset(select(self.model), after, descending).limit(limit)
+        result = await self.db_session.execute(query)
+        return list(result.scalars().all())
+
+    def _keyset(self, query, after: Optional[Tuple[Any, Any]], descending: bool):
+        """Applies the soft-delete filter, seek predicate and ordering for (created_at, id)."""
+        key = tuple_(self.model.created_at, self.model.id)
+        query = query.where(self.model.deleted_at == None)
+        if after is not None:
+            query = query.where(key < tuple_(*after) if descending else key > tuple_(*after))
+        if descending:
+            return query.order_by(self.model.created_at.desc(), self.model.id.desc())
+        return query.order_by(self.model.created_at, self.model.id)
+
     async def create(self, obj_in_data: dict) -> ModelType:
         """Create a new database record."""
         db_obj = self.model(**obj_in_data)
         self.db_session.add(db_obj)
         # No commit here; the Service layer manages the transaction boundary
-        return db_obj
\ No newline at end of file
+        return db_obj
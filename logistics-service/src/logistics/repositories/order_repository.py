@@ -1,8 +1,12 @@
-from typing import Optional, List
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from src.logistics.models.order import Order, OrderItem
+from typing import Optional, List, Any, Tuple, Sequence, AsyncIterator
+from datetime import datetime
+from sqlalchemy import select, insert, update, delete, case, cast, func, literal_column, Row, Text
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
+from sqlalchemy.orm import selectinload, load_only, noload
+from sqlalchemy.orm.attributes import set_committed_value
+from src.logistics.models.order import Order, OrderIdempotencyKey, OrderItem
 from src.logistics.repositories.base import BaseRepository
+from src.logistics.schemas.enums import OrderStatus
 from uuid import UUID
 
 class OrderRepository(BaseRepository[Order]):
@@ -21,23 +25,360 @@ class OrderRepository(BaseRepository[Order]):
         result = await self.db_session.execute(query)
         return result.scalar_one_or_none()
 
-    async def list_with_items(self, skip: int = 0, limit: int = 100) -> List[Order]:
+    def _order_json(self):
         """
-        Lists orders with items eagerly loaded, applying pagination and soft-delete filters.
+        `json_build_object` expression rendering an order and its items exactly like `OrderRead`:
+        same keys and key order, status as the enum value, prices as strings, UTC timestamps.
+        Items are aggregated by a correlated subquery on ix_order_items_order_id.
         """
-        query = (
-            select(self.model)
-            .options(selectinload(self.model.items))
-            .where(self.model.deleted_at == None)
-            .offset(skip)
-            .limit(limit)
-            .order_by(self.model.created_at.desc())
+        item = func.json_build_object(
+            "product_id", OrderItem.product_id,
+            "quantity", OrderItem.quantity,
+            "id", OrderItem.id,
+            "price_at_order", cast(OrderItem.price_at_order, Text),
+        )
+        items = (
+            select(func.coalesce(
+                func.json_agg(aggregate_order_by(item, OrderItem.id)),
+                literal_column("'[]'::json"),
+            ))
+            .where(OrderItem.order_id == self.model.id)
+            .scalar_subquery()
+        )
+        # Pydantic prints microseconds only when there are any: ...T10:00:00Z, ...T10:00:00.120000Z
+        created_at = func.timezone("UTC", self.model.created_at)
+        fraction = case(
+            (func.date_trunc("second", created_at) == created_at, ""),
+            else_=func.to_char(created_at, '.US'),
+        )
+        return func.json_build_object(
+            "id", self.model.id,
+            "status", case(*((self.model.status == s, s.value) for s in OrderStatus)),
+            "created_at", func.concat(func.to_char(created_at, 'YYYY-MM-DD"T"HH24:MI:SS'), fraction, "Z"),
+            "items", items,
+        )
+
+    async def get_json(self, order_id: UUID) -> Optional[str]:
+        """
+        Fetches an order with its items as one pre-serialized JSON document in a single
+        query, skipping ORM hydration and response-model validation entirely.
+        """
+        query = select(cast(self._order_json(), Text)).where(
+            self.model.id == order_id,
+            self.model.deleted_at == None
         )
         result = await self.db_session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def list_with_items(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[Any, Any]] = None,
+    ) -> List[Order]:
+        """
+        Lists orders newest first with items eagerly loaded, applying pagination and soft-delete filters.
+        When `after` (a (created_at, id) key) is given, seeks past it instead of using OFFSET.
+        """
+        query = self._keyset(
+            select(self.model).options(selectinload(self.model.items)),
+            after,
+            descending=True,
+        )
+        if after is None and skip:
+            query = query.offset(skip)
+        result = await self.db_session.execute(query.limit(limit))
         return list(result.scalars().all())
 
+    async def list_filtered(
+        self,
+        status: Optional[OrderStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        product_id: Optional[UUID] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        limit: int = 100,
+        include_items: bool = False,
+    ) -> List[Order]:
+        """
+        Lists active orders newest first, seeking past the `after` (created_at, id) key.
+        With a status filter this is a backward range scan on (status, created_at, id);
+        without items only indexed columns are read, so it can be index-only.
+        The product filter is a semi-join served by (product_id, order_id).
+        """
+        query = self._apply_filters(select(self.model), status, created_from, created_to)
+        if product_id is not None:
+            query = query.where(
+                select(OrderItem.order_id)
+                .where(OrderItem.order_id == self.model.id, OrderItem.product_id == product_id)
+                .exists()
+            )
+        if include_items:
+            query = query.options(selectinload(self.model.items))
+        else:
+            query = query.options(
+                load_only(self.model.id, self.model.status, self.model.created_at),
+                noload(self.model.items),
+            )
+        query = self._keyset(query, after, descending=True).limit(limit)
+        result = await self.db_session.execute(query)
+        return list(result.scalars().all())
+
+    def _apply_filters(
+        self,
+        query,
+        status: Optional[OrderStatus],
+        created_from: Optional[datetime],
+        created_to: Optional[datetime],
+    ):
+        """Status and half-open [created_from, created_to) filters shared by listing and export."""
+        if status is not None:
+            query = query.where(self.model.status == status)
+        if created_from is not None:
+            query = query.where(self.model.created_at >= created_from)
+        if created_to is not None:
+            query = query.where(self.model.created_at < created_to)
+        return query
+
     def add_order_item(self, order_item: OrderItem) -> None:
         """
         Helper to add an item to the session.
         """
-        self.db_session.add(order_item)
\ No newline at end of file
+        self.db_session.add(order_item)
+
+    async def insert_many(self, orders: List[dict]) -> Sequence[Row]:
+        """
+        Inserts many orders with one multi-row INSERT.
+        Returns (id, status, created_at) rows in the same order as `orders`.
+        """
+        stmt = insert(self.model).returning(
+            self.model.id, self.model.status, self.model.created_at,
+            sort_by_parameter_order=True
+        )
+        result = await self.db_session.execute(stmt, orders)
+        return result.all()
+
+    async def insert_items(self, items: List[dict]) -> Sequence[Row]:
+        """
+        Inserts many order items with one multi-row INSERT.
+        Returns (id, order_id, product_id, quantity, price_at_order) rows in input order.
+        """
+        stmt = insert(OrderItem).returning(
+            OrderItem.id, OrderItem.order_id, OrderItem.product_id,
+            OrderItem.quantity, OrderItem.price_at_order,
+            sort_by_parameter_order=True
+        )
+        result = await self.db_session.execute(stmt, items)
+        return result.all()
+
+    async def update_status_returning(
+        self,
+        order_id: UUID,
+        new_status: OrderStatus,
+        blocked_from: Sequence[OrderStatus] = (),
+    ) -> Sequence[Row]:
+        """
+        Sets the status in one statement: the order row is locked and its current status
+        read in a CTE, then `UPDATE ... WHERE previous status NOT IN (:blocked_from)`,
+        joined to the order's items in the same statement.
+        Returns one (id, status, previous_status, created_at, item_id, product_id, quantity,
+        price_at_order) row per item (one row with NULL item columns for an order without
+        items), or no rows if the order does not exist or the transition is not allowed.
+        """
+        previous = (
+            select(self.model.id, self.model.status)
+            .where(self.model.id == order_id, self.model.deleted_at == None)
+            .with_for_update()
+            .cte("previous")
+            .prefix_with("MATERIALIZED", dialect="postgresql")
+        )
+        updated = (
+            update(self.model)
+            .where(
+                self.model.id == previous.c.id,
+                previous.c.status.not_in(blocked_from),
+            )
+            .values(status=new_status)
+            .returning(
+                self.model.id, self.model.status,
+                previous.c.status.label("previous_status"), self.model.created_at,
+            )
+            .cte("updated")
+        )
+        query = (
+            select(
+                updated.c.id,
+                updated.c.status,
+                updated.c.previous_status,
+                updated.c.created_at,
+                OrderItem.id.label("item_id"),
+                OrderItem.product_id,
+                OrderItem.quantity,
+                OrderItem.price_at_order,
+            )
+            .outerjoin(OrderItem, OrderItem.order_id == updated.c.id)
+            .order_by(OrderItem.id)
+        )
+        rows = (await self.db_session.execute(query)).all()
+        if rows:
+            self._sync_status([rows[0].id], rows[0].status)
+        return rows
+
+    async def transition_statuses(
+        self,
+        new_status: OrderStatus,
+        blocked_from: Sequence[OrderStatus] = (),
+        order_ids: Optional[Sequence[UUID]] = None,
+        status: Optional[OrderStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        limit: int = 1000,
+    ) -> Sequence[Row]:
+        """
+        Moves many orders to `new_status` in one statement:
+
+            WITH target AS MATERIALIZED (SELECT id, status ... ORDER BY id FOR UPDATE),
+                 updated AS (UPDATE orders ... FROM target WHERE target.status NOT IN (:blocked_from) ...)
+            SELECT target.id, target.status, updated.id IS NOT NULL ...
+
+        Orders are picked by `order_ids`, or else by the listing filters (only orders that
+        can still make the transition, oldest id first, at most `limit`). Rows are locked in
+        id order, so concurrent bulk updates cannot deadlock, and orders already in
+        `new_status` are left untouched. Returns one (id, previous_status, changed) row per
+        existing order, in id order; unknown ids are simply not returned.
+        """
+        target = select(self.model.id, self.model.status).where(self.model.deleted_at == None)
+        if order_ids is not None:
+            target = target.where(self.model.id.in_(order_ids))
+        else:
+            target = self._apply_filters(target, status, created_from, created_to).where(
+                self.model.status.not_in([*blocked_from, new_status])
+            ).limit(limit)
+        target = (
+            target.order_by(self.model.id)
+            .with_for_update()
+            .cte("target")
+            .prefix_with("MATERIALIZED", dialect="postgresql")
+        )
+        updated = (
+            update(self.model)
+            .where(
+                self.model.id == target.c.id,
+                target.c.status.not_in([*blocked_from, new_status]),
+            )
+            .values(status=new_status)
+            .returning(self.model.id)
+            .cte("updated")
+        )
+        query = (
+            select(
+                target.c.id,
+                target.c.status.label("previous_status"),
+                updated.c.id.is_not(None).label("changed"),
+            )
+            .outerjoin(updated, updated.c.id == target.c.id)
+            .order_by(target.c.id)
+        )
+        rows = (await self.db_session.execute(query)).all()
+        self._sync_status([row.id for row in rows if row.changed], new_status)
+        return rows
+
+    async def item_quantities(self, order_ids: Sequence[UUID]) -> dict[UUID, int]:
+        """Total quantity per product over the items of the given orders, in one aggregate query."""
+        if not order_ids:
+            return {}
+        query = (
+            select(OrderItem.product_id, func.sum(OrderItem.quantity))
+            .where(OrderItem.order_id.in_(order_ids))
+            .group_by(OrderItem.product_id)
+        )
+        result = await self.db_session.execute(query)
+        return {product_id: int(quantity) for product_id, quantity in result.all()}
+
+    def _sync_status(self, order_ids: Sequence[UUID], new_status: OrderStatus) -> None:
+        """Keeps Orders already loaded in this session consistent with the updated rows."""
+        sync_session = self.db_session.sync_session
+        for order_id in order_ids:
+            order = sync_session.identity_map.get(sync_session.identity_key(self.model, order_id))
+            if order is not None:
+                set_committed_value(order, "status", new_status)
+
+    async def stream_export_rows(
+        self,
+        status: Optional[OrderStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Streams flat `orders JOIN order_items` rows in (created_at, id) order through a
+        server-side cursor, `batch_size` rows at a time. No ORM objects are built, so
+        memory stays bounded regardless of how many orders match.
+        """
+        query = (
+            select(
+                self.model.id.label("order_id"),
+                self.model.status,
+                self.model.created_at,
+                OrderItem.id.label("item_id"),
+                OrderItem.product_id,
+                OrderItem.quantity,
+                OrderItem.price_at_order,
+            )
+            .join(OrderItem, OrderItem.order_id == self.model.id)
+            .where(self.model.deleted_at == None)
+            .order_by(self.model.created_at, self.model.id)
+        )
+        query = self._apply_filters(query, status, created_from, created_to)
+
+        result = await self.db_session.stream(query.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield partition
+
+    async def claim_idempotency_key(self, key: str, request_hash: str) -> Optional[OrderIdempotencyKey]:
+        """
+        Claims `key` for this transaction with `INSERT ... ON CONFLICT DO NOTHING`.
+        Returns None when the key is new. If another transaction holds an uncommitted claim,
+        the insert waits on it (up to lock_timeout): once it commits, its stored key is
+        returned; if it rolled back, this transaction gets the claim instead.
+        """
+        stmt = (
+            pg_insert(OrderIdempotencyKey)
+            .values(key=key, request_hash=request_hash)
+            .on_conflict_do_nothing(index_elements=[OrderIdempotencyKey.key])
+            .returning(OrderIdempotencyKey.key)
+        )
+        while True:
+            if (await self.db_session.execute(stmt)).first() is not None:
+                return None
+            # Read committed: this statement's snapshot includes the claim we just waited on
+            result = await self.db_session.execute(
+                select(OrderIdempotencyKey).where(OrderIdempotencyKey.key == key)
+            )
+            existing = result.scalar_one_or_none()
+            if existing is not None:
+                return existing
+            # The sweeper deleted the key between the two statements: claim it again
+
+    async def complete_idempotency_key(self, key: str, response: dict) -> None:
+        """Stores the response to replay for `key`; commits together with the order."""
+        await self.db_session.execute(
+            update(OrderIdempotencyKey).where(OrderIdempotencyKey.key == key).values(response=response)
+        )
+
+    async def delete_expired_idempotency_keys(self, created_before: datetime, limit: int) -> int:
+        """
+        Deletes up to `limit` of the oldest keys created before `created_before`.
+        SKIP LOCKED lets the sweepers of several workers run at once without queueing on each other.
+        """
+        expired = (
+            select(OrderIdempotencyKey.key)
+            .where(OrderIdempotencyKey.created_at < created_before)
+            .order_by(OrderIdempotencyKey.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.db_session.execute(
+            delete(OrderIdempotencyKey).where(OrderIdempotencyKey.key.in_(expired))
+        )
+        return result.rowcount
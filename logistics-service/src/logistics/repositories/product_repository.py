@@ -1,6 +1,11 @@
-from typing import Optional
-from sqlalchemy import select
-from src.logistics.models.product import Product
+import random
+from datetime import datetime
+from typing import AsyncIterable, Optional, Sequence, Tuple
+from sqlalchemy import any_, bindparam, select, update, delete, insert, values, column, text, func, literal, tuple_, cast, BigInteger, Float, Integer, Row, Text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.orm.attributes import set_committed_value
+from src.logistics.models.product import Product, ProductChange, ProductStockShard
+from src.logistics.models.reservation import StockReservationItem
 from src.logistics.repositories.base import BaseRepository
 from uuid import UUID
 
@@ -14,12 +19,552 @@ class ProductRepository(BaseRepository[Product]):
         result = await self.db_session.execute(query)
         return result.scalar_one_or_none()
 
+    def _prefix_condition(self, q: str):
+        """
+        Case-insensitive `starts with`, with LIKE wildcards in the user input escaped.
+        The pattern is lowercased by PostgreSQL, like the indexed key, so both agree on
+        every character (Python's str.lower() does not always); lower() of a constant is
+        folded at plan time, so the index range scan is kept.
+        """
+        escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return self._prefix_key().like(func.lower(f"{escaped}%"), escape="\\")
+
+    def _prefix_key(self):
+        # Byte-order collation lets one btree serve both the LIKE range and the ORDER BY
+        return func.lower(self.model.name).collate("C")
+
+    async def search_prefix(
+        self,
+        q: str,
+        limit: int = 20,
+        after: Optional[Tuple[str, UUID]] = None,
+    ) -> list[tuple[Product, str]]:
+        """
+        Active products whose name starts with `q`, in (lower(name), id) order, each with
+        its lower(name) sort key (what a cursor must resume from).
+        Served as a range scan on the `lower(name) COLLATE "C"` index, so the cost
+        depends on the page size, not on how many names share the prefix.
+        """
+        key = tuple_(self._prefix_key(), self.model.id)
+        query = (
+            select(self.model, self._prefix_key().label("prefix_key"))
+            .where(self.model.deleted_at == None)
+            .where(self._prefix_condition(q))
+        )
+        if after is not None:
+            query = query.where(key > tuple_(*after))
+        query = query.order_by(self._prefix_key(), self.model.id).limit(limit)
+        result = await self.db_session.execute(query)
+        return [tuple(row) for row in result.all()]
+
+    async def search_fuzzy(
+        self,
+        q: str,
+        limit: int = 20,
+        after: Optional[Tuple[float, UUID]] = None,
+    ) -> list[tuple[Product, float]]:
+        """
+        Active products containing a word similar to `q` (pg_trgm `<%`, via the trigram GIN
+        index), excluding prefix matches, ranked by word similarity then id.
+        """
+        score = func.word_similarity(q, self.model.name)
+        query = (
+            select(self.model, score.label("score"))
+            .where(self.model.deleted_at == None)
+            .where(literal(q).op("<%")(self.model.name))
+            .where(~self._prefix_condition(q))
+        )
+        if after is not None:
+            # score DESC, id ASC expressed as one ascending row comparison
+            after_score, after_id = after
+            query = query.where(
+                tuple_(-score, self.model.id)
+                > tuple_(literal(-after_score, Float), literal(after_id, PG_UUID(as_uuid=True)))
+            )
+        query = query.order_by(score.desc(), self.model.id).limit(limit)
+        result = await self.db_session.execute(query)
+        return [tuple(row) for row in result.all()]
+
+    async def get_many(self, product_ids: list[UUID]) -> list[Product]:
+        """Batch fetch without locking."""
+        query = (
+            select(self.model)
+            .where(self.model.id.in_(product_ids))
+            .where(self.model.deleted_at == None)
+        )
+        result = await self.db_session.execute(query)
+        return list(result.scalars().all())
+
+    async def get_many_projected(self, product_ids: list[UUID], fields: Sequence[str]) -> Sequence[Row]:
+        """
+        Active products by id, reading only `fields` (plus id, each field once), in one
+        `id = ANY(:ids)` query. The ids travel as a single array parameter, so the statement
+        text and its cached plan are the same for any number of ids. Rows come back in no
+        particular order.
+        """
+        columns = {"stock_quantity": self.model.total_stock.label("stock_quantity")}
+        query = (
+            select(self.model.id, *(columns.get(f, getattr(self.model, f)) for f in dict.fromkeys(fields) if f != "id"))
+            .where(self.model.id == any_(bindparam("ids", product_ids, type_=ARRAY(PG_UUID(as_uuid=True)))))
+            .where(self.model.deleted_at == None)
+        )
+        result = await self.db_session.execute(query)
+        return result.all()
+
+    async def get_stock_levels(self, product_id: UUID) -> Optional[Row]:
+        """(available, reserved) of an active product: its stock and the quantity held by reservations."""
+        reserved = (
+            select(func.coalesce(func.sum(StockReservationItem.quantity), 0))
+            .where(StockReservationItem.product_id == self.model.id)
+            .scalar_subquery()
+        )
+        query = (
+            select(self.model.total_stock.label("available"), reserved.label("reserved"))
+            .where(self.model.id == product_id)
+            .where(self.model.deleted_at == None)
+        )
+        result = await self.db_session.execute(query)
+        return result.one_or_none()
+
     async def get_many_for_update(self, product_ids: list[UUID]) -> list[Product]:
+        """
+        Batch fetch and lock, always in id order to avoid deadlocks between writers.
+        Stock writers take FOR NO KEY UPDATE: it serializes them just the same, but leaves
+        the FOR KEY SHARE locks of foreign key checks (order_items, stock_reservation_items)
+        free, so inserting a reserved order never waits for a checkout of the same product.
+        """
         query = (
             select(self.model)
             .where(self.model.id.in_(product_ids))
             .where(self.model.deleted_at == None)
-            .with_for_update()
+            .order_by(self.model.id)
+            .with_for_update(key_share=True)
         )
         result = await self.db_session.execute(query)
         return result.scalars().all()
+
+    async def reserve_stock(self, quantities: dict[UUID, int]) -> Sequence[Row]:
+        """
+        Atomically decrements stock for many products in a single statement:
+
+            WITH locked AS MATERIALIZED (SELECT id ... ORDER BY id FOR NO KEY UPDATE)
+            UPDATE products SET stock_quantity = stock_quantity - requested.quantity
+            FROM (VALUES ...) AS requested, locked
+            WHERE ... AND stock_quantity >= requested.quantity
+            RETURNING id, price, stock_quantity
+
+        Rows are locked in id order to stay deadlock-free against concurrent orders.
+        Only products with enough stock are updated; the caller compares the returned
+        ids with the request and rolls back on any shortfall. Sharded products are
+        never locked here; see `reserve_sharded_stock`.
+        """
+        product_ids = sorted(quantities)
+        requested = values(
+            column("product_id", PG_UUID(as_uuid=True)),
+            column("quantity", Integer),
+            name="requested",
+        ).data([(pid, quantities[pid]) for pid in product_ids])
+
+        locked = (
+            select(self.model.id)
+            .where(self.model.id.in_(product_ids))
+            .where(self.model.deleted_at == None)
+            .where(self.model.stock_shard_count == 0)
+            .order_by(self.model.id)
+            .with_for_update(key_share=True)
+            .cte("locked")
+            .prefix_with("MATERIALIZED", dialect="postgresql")
+        )
+
+        stmt = (
+            update(self.model)
+            .where(self.model.id == requested.c.product_id)
+            .where(self.model.id == locked.c.id)
+            .where(self.model.stock_quantity >= requested.c.quantity)
+            .values(stock_quantity=self.model.stock_quantity - requested.c.quantity)
+            .returning(self.model.id, self.model.price, self.model.stock_quantity)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db_session.execute(stmt)
+        rows = result.all()
+        self._sync_stock(rows)
+        return rows
+
+    def _sync_stock(self, rows: Sequence[Row]) -> None:
+        """
+        Copies RETURNING stock levels onto Product objects already in the identity map,
+        without marking them dirty, so later reads in this session are not stale.
+        """
+        sync_session = self.db_session.sync_session
+        for row in rows:
+            product = sync_session.identity_map.get(sync_session.identity_key(self.model, row.id))
+            if product is not None:
+                set_committed_value(product, "stock_quantity", row.stock_quantity)
+                set_committed_value(product, "total_stock", row.stock_quantity)
+
+    async def decrement_stock(self, quantities: dict[UUID, int]) -> None:
+        """
+        Applies many stock decrements in one UPDATE ... FROM (VALUES ...).
+        The caller must already hold the row locks (see `get_many_for_update`).
+        """
+        if not quantities:
+            return
+        deltas = values(
+            column("product_id", PG_UUID(as_uuid=True)),
+            column("quantity", Integer),
+            name="deltas",
+        ).data(sorted(quantities.items()))
+
+        stmt = (
+            update(self.model)
+            .where(self.model.id == deltas.c.product_id)
+            .values(stock_quantity=self.model.stock_quantity - deltas.c.quantity)
+            .returning(self.model.id, self.model.stock_quantity)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db_session.execute(stmt)
+        self._sync_stock(result.all())
+
+    async def restock(self, quantities: dict[UUID, int]) -> set[UUID]:
+        """
+        Returns stock to many products in one statement:
+
+            WITH locked AS MATERIALIZED (SELECT id ... ORDER BY id FOR NO KEY UPDATE)
+            UPDATE products SET stock_quantity = stock_quantity + returned.quantity
+            FROM (VALUES ...) AS returned, locked
+            WHERE ... AND stock_shard_count = 0
+
+        Every requested product row is locked in id order, sharded ones included, so a
+        concurrent reshard cannot move their stock before `restock_shards` adds to it.
+        Returns the ids updated here; sharded products are left to `restock_shards`.
+        """
+        if not quantities:
+            return set()
+        product_ids = sorted(quantities)
+        returned = values(
+            column("product_id", PG_UUID(as_uuid=True)),
+            column("quantity", Integer),
+            name="returned",
+        ).data([(pid, quantities[pid]) for pid in product_ids])
+
+        locked = (
+            select(self.model.id)
+            .where(self.model.id.in_(product_ids))
+            .order_by(self.model.id)
+            .with_for_update(key_share=True)
+            .cte("locked")
+            .prefix_with("MATERIALIZED", dialect="postgresql")
+        )
+        stmt = (
+            update(self.model)
+            .where(self.model.id == returned.c.product_id)
+            .where(self.model.id == locked.c.id)
+            .where(self.model.stock_shard_count == 0)
+            .values(stock_quantity=self.model.stock_quantity + returned.c.quantity)
+            .returning(self.model.id, self.model.stock_quantity)
+            .execution_options(synchronize_session=False)
+        )
+        rows = (await self.db_session.execute(stmt)).all()
+        self._sync_stock(rows)
+        return {row.id for row in rows}
+
+    # --- Change feed ---
+
+    async def list_changes(
+        self,
+        after: Optional[Tuple[int, int]] = None,
+        limit: int = 100,
+    ) -> list[tuple[ProductChange, Product]]:
+        """
+        Logged changes after the `after` (txid, id) key, each with the product's current
+        row, in (txid, id) order on ix_product_changes_txid_id.
+
+        Only changes of transactions below the snapshot's xmin are returned: every such
+        transaction has finished, so nothing can later appear behind the last key
+        returned. Changes of transactions still in flight are picked up by a later call.
+        """
+        change = ProductChange
+        # xid8 has no cast to bigint; going through text gives the same 64-bit value as the trigger stores
+        horizon = cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger)
+        query = (
+            select(change, self.model)
+            .join(self.model, self.model.id == change.product_id)
+            .where(change.txid < horizon)
+        )
+        if after is not None:
+            query = query.where(tuple_(change.txid, change.id) > tuple_(*after))
+        query = query.order_by(change.txid, change.id).limit(limit)
+        result = await self.db_session.execute(query)
+        return [tuple(row) for row in result.all()]
+
+    async def delete_expired_changes(self, changed_before: datetime, limit: int) -> int:
+        """Deletes up to `limit` of the oldest changes logged before `changed_before`."""
+        expired = (
+            select(ProductChange.id)
+            .where(ProductChange.changed_at < changed_before)
+            .order_by(ProductChange.changed_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.db_session.execute(delete(ProductChange).where(ProductChange.id.in_(expired)))
+        return result.rowcount
+
+    # --- Sharded stock (hot SKUs) ---
+
+    async def reserve_sharded_stock(self, quantities: dict[UUID, int]) -> list[Row]:
+        """
+        Decrements stock of sharded products, returning (id, price) for each one reserved.
+
+        A single-product request claims one shard with enough stock, starting at a random
+        shard: first skipping shards other orders hold (`FOR UPDATE SKIP LOCKED`), then, if
+        they are all busy, queueing on one of them. Concurrent orders for a hot product thus
+        spread over the shards instead of all waiting for one row. If no single shard has
+        enough stock, or several sharded products are requested, every shard of the
+        requested products is locked in (product_id, shard_no) order and the quantity is
+        drawn across shards. Ids that are not sharded are simply not returned.
+        """
+        if len(quantities) == 1:
+            [(product_id, quantity)] = quantities.items()
+            for skip_locked in (True, False):
+                claimed = await self._claim_shard(product_id, quantity, skip_locked)
+                if claimed is not None:
+                    return [claimed]
+
+        totals = await self.lock_stock_shards(list(quantities))
+        enough = {pid: qty for pid, qty in quantities.items() if pid in totals and totals[pid].stock_quantity >= qty}
+        await self.take_from_shards(enough)
+        return [totals[pid] for pid in sorted(enough)]
+
+    async def _claim_shard(self, product_id: UUID, quantity: int, skip_locked: bool) -> Optional[Row]:
+        """Decrements one shard holding at least `quantity`, in one statement."""
+        shard_model = ProductStockShard
+        # Spread concurrent orders over the shards instead of all starting at shard 0
+        start = random.randrange(1 << 15)
+        target = (
+            select(shard_model.product_id, shard_model.shard_no, self.model.price)
+            .join(self.model, self.model.id == shard_model.product_id)
+            .where(shard_model.product_id == product_id)
+            .where(shard_model.quantity >= quantity)
+            .where(self.model.deleted_at == None)
+            .where(self.model.stock_shard_count > 0)
+            .order_by((shard_model.shard_no + literal(start, Integer)) % self.model.stock_shard_count)
+            .limit(1)
+            .with_for_update(of=shard_model, skip_locked=skip_locked)
+            .cte("target")
+        )
+        stmt = (
+            update(shard_model)
+            .where(shard_model.product_id == target.c.product_id)
+            .where(shard_model.shard_no == target.c.shard_no)
+            .values(quantity=shard_model.quantity - quantity)
+            .returning(target.c.product_id.label("id"), target.c.price)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db_session.execute(stmt)
+        return result.one_or_none()
+
+    async def lock_stock_shards(self, product_ids: list[UUID]) -> dict[UUID, Row]:
+        """
+        Locks every shard of the given active sharded products in (product_id, shard_no)
+        order and returns {id: (id, price, stock_quantity)} with the summed stock.
+        """
+        if not product_ids:
+            return {}
+        shard_model = ProductStockShard
+        locked = (
+            select(shard_model.product_id, shard_model.quantity, self.model.price)
+            .join(self.model, self.model.id == shard_model.product_id)
+            .where(shard_model.product_id.in_(product_ids))
+            .where(self.model.deleted_at == None)
+            .order_by(shard_model.product_id, shard_model.shard_no)
+            .with_for_update(of=shard_model)
+            .cte("locked")
+            .prefix_with("MATERIALIZED", dialect="postgresql")
+        )
+        query = select(
+            locked.c.product_id.label("id"),
+            func.min(locked.c.price).label("price"),
+            func.sum(locked.c.quantity).label("stock_quantity"),
+        ).group_by(locked.c.product_id)
+        result = await self.db_session.execute(query)
+        return {row.id: row for row in result.all()}
+
+    async def take_from_shards(self, quantities: dict[UUID, int]) -> None:
+        """
+        Draws each quantity from a product's shards in shard_no order, emptying shards
+        before moving on, in one UPDATE. The caller must hold the shard locks (see
+        `lock_stock_shards`) and have checked that the totals cover the quantities.
+        """
+        if not quantities:
+            return
+        shard_model = ProductStockShard
+        requested = values(
+            column("product_id", PG_UUID(as_uuid=True)),
+            column("quantity", Integer),
+            name="requested",
+        ).data(sorted(quantities.items()))
+        plan = (
+            select(
+                shard_model.product_id,
+                shard_model.shard_no,
+                shard_model.quantity.label("available"),
+                requested.c.quantity.label("wanted"),
+                (
+                    func.sum(shard_model.quantity).over(
+                        partition_by=shard_model.product_id, order_by=shard_model.shard_no
+                    ) - shard_model.quantity
+                ).label("drawn_before"),
+            )
+            .join(requested, requested.c.product_id == shard_model.product_id)
+            .subquery("plan")
+        )
+        stmt = (
+            update(shard_model)
+            .where(shard_model.product_id == plan.c.product_id)
+            .where(shard_model.shard_no == plan.c.shard_no)
+            .where(plan.c.drawn_before < plan.c.wanted)
+            .where(plan.c.available > 0)
+            .values(quantity=shard_model.quantity - func.least(plan.c.available, plan.c.wanted - plan.c.drawn_before))
+            .execution_options(synchronize_session=False)
+        )
+        await self.db_session.execute(stmt)
+
+    async def restock_shards(self, quantities: dict[UUID, int]) -> None:
+        """
+        Returns stock of sharded products to their shard 0, in one UPDATE with the shard
+        rows locked in product_id order. The caller must hold the product row locks (see
+        `restock`), which keeps the shard layout from changing underneath.
+        """
+        if not quantities:
+            return
+        shard_model = ProductStockShard
+        product_ids = sorted(quantities)
+        returned = values(
+            column("product_id", PG_UUID(as_uuid=True)),
+            column("quantity", Integer),
+            name="returned",
+        ).data([(pid, quantities[pid]) for pid in product_ids])
+        locked = (
+            select(shard_model.product_id, shard_model.shard_no)
+            .where(shard_model.product_id.in_(product_ids))
+            .where(shard_model.shard_no == 0)
+            .order_by(shard_model.product_id)
+            .with_for_update()
+            .cte("locked")
+            .prefix_with("MATERIALIZED", dialect="postgresql")
+        )
+        stmt = (
+            update(shard_model)
+            .where(shard_model.product_id == returned.c.product_id)
+            .where(shard_model.product_id == locked.c.product_id)
+            .where(shard_model.shard_no == locked.c.shard_no)
+            .values(quantity=shard_model.quantity + returned.c.quantity)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db_session.execute(stmt)
+
+    async def reshard_stock(self, product: Product, shard_count: int) -> None:
+        """
+        Moves the product's current total stock into `shard_count` evenly filled shards,
+        or back into products.stock_quantity when `shard_count` is 0.
+        The caller must hold the product row lock.
+        """
+        shard_model = ProductStockShard
+        totals = await self.lock_stock_shards([product.id]) if product.stock_shard_count else {}
+        total = totals[product.id].stock_quantity if product.id in totals else product.stock_quantity
+
+        await self.db_session.execute(delete(shard_model).where(shard_model.product_id == product.id))
+        if shard_count:
+            base, extra = divmod(total, shard_count)
+            await self.db_session.execute(insert(shard_model), [
+                {"product_id": product.id, "shard_no": n, "quantity": base + (1 if n < extra else 0)}
+                for n in range(shard_count)
+            ])
+        product.stock_shard_count = shard_count
+        product.stock_quantity = 0 if shard_count else total
+
+    # --- Bulk import ---
+
+    STAGING_TABLE = "product_import_staging"
+    STAGING_COLUMNS = ["name", "price", "stock_quantity"]
+
+    async def create_import_staging(self) -> None:
+        """Creates the session-local staging table that COPY streams into."""
+        conn = await self.db_session.connection()
+        await conn.exec_driver_sql(
+            f"CREATE TEMP TABLE {self.STAGING_TABLE} ("
+            " seq bigserial,"
+            " name varchar(255) NOT NULL,"
+            " price numeric(10, 2) NOT NULL,"
+            " stock_quantity integer NOT NULL"
+            ") ON COMMIT DROP"
+        )
+
+    async def copy_into_staging(self, records: AsyncIterable[tuple]) -> int:
+        """
+        Streams (name, price, stock_quantity) tuples into the staging table using
+        asyncpg's binary COPY on the session's own connection and transaction.
+        Records are pulled lazily, so memory does not grow with the input size.
+        """
+        conn = await self.db_session.connection()
+        raw = await conn.get_raw_connection()
+        status_line = await raw.driver_connection.copy_records_to_table(
+            self.STAGING_TABLE, records=records, columns=self.STAGING_COLUMNS
+        )
+        # asyncpg returns the command tag, e.g. "COPY 1000"
+        return int(status_line.split()[-1])
+
+    async def merge_import_staging(self) -> tuple[int, int, int]:
+        """
+        Upserts the staged rows into products by name in one statement.
+        The last occurrence of a name in the upload wins; rows whose price and
+        stock already match are left untouched. Returns (inserted, updated, unchanged).
+        """
+        result = await self.db_session.execute(text(f"""
+            WITH incoming AS (
+                SELECT DISTINCT ON (name) name, price, stock_quantity
+                FROM {self.STAGING_TABLE}
+                ORDER BY name, seq DESC
+            ),
+            updated AS (
+                UPDATE products AS p
+                SET price = i.price,
+                    stock_quantity = CASE WHEN p.stock_shard_count > 0 THEN 0 ELSE i.stock_quantity END,
+                    updated_at = now()
+                FROM incoming AS i
+                WHERE p.name = i.name
+                  AND p.deleted_at IS NULL
+                  AND (
+                      p.price,
+                      CASE WHEN p.stock_shard_count > 0
+                           THEN (SELECT t.stock_quantity FROM product_stock_totals AS t WHERE t.product_id = p.id)
+                           ELSE p.stock_quantity END
+                  ) IS DISTINCT FROM (i.price, i.stock_quantity)
+                RETURNING p.id, p.name, p.stock_shard_count, i.stock_quantity
+            ),
+            resharded AS (
+                -- Sharded products get the imported stock spread evenly over their shards
+                UPDATE product_stock_shards AS s
+                SET quantity = u.stock_quantity / u.stock_shard_count
+                             + CASE WHEN s.shard_no < u.stock_quantity % u.stock_shard_count THEN 1 ELSE 0 END
+                FROM updated AS u
+                WHERE s.product_id = u.id AND u.stock_shard_count > 0
+            ),
+            inserted AS (
+                INSERT INTO products (id, name, price, stock_quantity)
+                SELECT uuid_generate_v7(), i.name, i.price, i.stock_quantity
+                FROM incoming AS i
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM products AS p
+                    WHERE p.name = i.name AND p.deleted_at IS NULL
+                )
+                RETURNING 1
+            )
+            SELECT
+                (SELECT count(*) FROM inserted) AS inserted,
+                (SELECT count(DISTINCT name) FROM updated) AS updated,
+                (SELECT count(*) FROM incoming) AS distinct_names
+        """))
+        row = result.one()
+        await self.db_session.execute(text(f"DROP TABLE {self.STAGING_TABLE}"))
+        return row.inserted, row.updated, row.distinct_names - row.inserted - row.updated
@@ -0,0 +1,85 @@
+from datetime import timedelta
+from typing import List, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import delete, func, insert, select, true, Row
+from src.logistics.models.reservation import StockReservation, StockReservationItem
+from src.logistics.repositories.base import BaseRepository
+
+class ReservationRepository(BaseRepository[StockReservation]):
+    async def insert(self, ttl_seconds: int, items: List[dict]) -> Row:
+        """
+        Inserts a reservation expiring `ttl_seconds` from now (database clock, like the
+        sweeper) and its items. Returns the (id, expires_at) row.
+        """
+        reservation = (await self.db_session.execute(
+            insert(self.model)
+            .values(expires_at=func.now() + timedelta(seconds=ttl_seconds))
+            .returning(self.model.id, self.model.expires_at)
+        )).one()
+        await self.db_session.execute(
+            insert(StockReservationItem), [{**item, "reservation_id": reservation.id} for item in items]
+        )
+        return reservation
+
+    async def claim(self, reservation_id: UUID) -> Tuple[bool, Sequence[Row]]:
+        """
+        Deletes the reservation if it has not expired. Returns whether it existed and the
+        claimed items. Only the reservation row is locked; a reservation the sweeper is
+        expiring at the same moment is either claimed here or released there, never both.
+
+        Existence is read in the same statement, so from the same snapshot as the delete:
+        a reservation the sweeper removes meanwhile still counts as existing (expired).
+
+            WITH seen AS (SELECT id FROM stock_reservations WHERE id = :id),
+                 gone AS (DELETE ... RETURNING id), taken AS (DELETE ... RETURNING ...)
+            SELECT seen.id, taken.* FROM seen LEFT JOIN taken ON true
+        """
+        seen = select(self.model.id).where(self.model.id == reservation_id).cte("seen")
+        taken = self._delete_items(self.model.id == reservation_id, self.model.expires_at > func.now()).cte("taken")
+        rows = (await self.db_session.execute(
+            select(seen.c.id, *(column for column in taken.c)).select_from(seen.outerjoin(taken, true()))
+        )).all()
+        return bool(rows), [row for row in rows if row.product_id is not None]
+
+    async def release(self, reservation_id: UUID) -> Sequence[Row]:
+        """Deletes the reservation, expired or not, and returns its items."""
+        return await self._delete_returning_items(self.model.id == reservation_id)
+
+    async def delete_expired(self, limit: int) -> Sequence[Row]:
+        """
+        Deletes up to `limit` of the oldest expired reservations and returns their items.
+        SKIP LOCKED passes over reservations a checkout is converting right now, and lets
+        the sweepers of several workers run at once without queueing on each other.
+        """
+        expired = (
+            select(self.model.id)
+            .where(self.model.expires_at <= func.now())
+            .order_by(self.model.expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return await self._delete_returning_items(self.model.id.in_(expired))
+
+    async def _delete_returning_items(self, *conditions) -> Sequence[Row]:
+        result = await self.db_session.execute(
+            self._delete_items(*conditions).execution_options(synchronize_session=False)
+        )
+        return result.all()
+
+    def _delete_items(self, *conditions):
+        """
+        One statement:
+
+            WITH gone AS (DELETE FROM stock_reservations WHERE ... RETURNING id)
+            DELETE FROM stock_reservation_items WHERE reservation_id IN (SELECT id FROM gone)
+            RETURNING reservation_id, product_id, quantity, price_at_reservation
+        """
+        gone = delete(self.model).where(*conditions).returning(self.model.id).cte("gone")
+        return (
+            delete(StockReservationItem)
+            .where(StockReservationItem.reservation_id.in_(select(gone.c.id)))
+            .returning(
+                StockReservationItem.reservation_id, StockReservationItem.product_id,
+                StockReservationItem.quantity, StockReservationItem.price_at_reservation,
+            )
+        )
@@ -3,4 +3,30 @@ from enum import Enum
 class OrderStatus(str, Enum):
     PENDING = "pending"
     SHIPPED = "shipped"
-    CANCELLED = "cancelled"
\ No newline at end of file
+    CANCELLED = "cancelled"
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ProductChangeOperation(str, Enum):
+    INSERT = "insert"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+# Fields a product lookup can be projected to (the ProductRead fields)
+class ProductField(str, Enum):
+    ID = "id"
+    NAME = "name"
+    PRICE = "price"
+    STOCK_QUANTITY = "stock_quantity"
+    STOCK_SHARD_COUNT = "stock_shard_count"
+    CREATED_AT = "created_at"
+    UPDATED_AT = "updated_at"
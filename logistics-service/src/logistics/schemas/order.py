@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 from typing import List, Optional
 from decimal import Decimal
 from datetime import datetime
@@ -41,5 +41,64 @@ class OrderRead(OrderBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+# Listing entry: items are only loaded and returned when requested (include_items=true)
+class OrderListRead(OrderBase):
+    id: UUID
+    status: OrderStatus
+    created_at: datetime
+    items: Optional[List[OrderItemRead]] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
 class OrderUpdateStatus(BaseModel):
     status: OrderStatus
+
+
+# --- Bulk Status Schemas ---
+
+# Selects orders by their listing attributes instead of by id
+class OrderStatusFilter(BaseModel):
+    status: Optional[OrderStatus] = None
+    created_from: Optional[datetime] = Field(None, description="Inclusive lower bound on created_at")
+    created_to: Optional[datetime] = Field(None, description="Exclusive upper bound on created_at")
+
+class OrderBulkStatusUpdate(BaseModel):
+    status: OrderStatus
+    order_ids: Optional[List[UUID]] = Field(None, min_length=1, max_length=10_000)
+    filter: Optional[OrderStatusFilter] = None
+    limit: int = Field(1000, ge=1, le=10_000, description="Most orders moved per call when selecting by filter")
+
+    @model_validator(mode="after")
+    def one_selector(self):
+        if (self.order_ids is None) == (self.filter is None):
+            raise ValueError("Provide either order_ids or filter")
+        return self
+
+# Per-order outcome; a rejected order does not fail the rest
+class OrderStatusResult(BaseModel):
+    order_id: UUID
+    success: bool
+    status_code: int
+    previous_status: Optional[OrderStatus] = None
+    error: Optional[str] = None
+
+class OrderBulkStatusRead(BaseModel):
+    status: OrderStatus
+    results: List[OrderStatusResult]
+
+
+# --- Batch Schemas ---
+
+class OrderBatchCreate(BaseModel):
+    orders: List[OrderCreate] = Field(..., min_length=1, max_length=500, description="Orders to create in one transaction")
+
+# Per-order outcome; a failed order does not fail the rest of the batch
+class OrderBatchResult(BaseModel):
+    index: int
+    success: bool
+    status_code: int
+    order: Optional[OrderRead] = None
+    error: Optional[str] = None
+
+class OrderBatchRead(BaseModel):
+    results: List[OrderBatchResult]
@@ -1,8 +1,9 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import AliasChoices, BaseModel, Field, ConfigDict
 from decimal import Decimal
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
+from src.logistics.schemas.enums import ProductChangeOperation, ProductField
 
 # Base Schema: Shared properties
 class ProductBase(BaseModel):
@@ -20,7 +21,60 @@ class ProductUpdate(BaseModel):
 
 class ProductRead(ProductBase):
     id: UUID
+    # Read from Product.total_stock, which also covers products whose stock is sharded
+    stock_quantity: int = Field(..., ge=0, validation_alias=AliasChoices("total_stock", "stock_quantity"))
+    stock_shard_count: int = 0
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+# Batched lookup by id; `fields` limits which columns are read and returned (all by default)
+class ProductLookup(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, max_length=500)
+    fields: Optional[List[ProductField]] = Field(None, min_length=1)
+
+# A looked-up product with only the requested fields set; unset ones are left out of the response
+class ProductLookupItem(BaseModel):
+    id: UUID
+    name: Optional[str] = None
+    price: Optional[Decimal] = None
+    stock_quantity: Optional[int] = None
+    stock_shard_count: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+# Found products in request order (each id once), and the ids that do not exist or are deleted
+class ProductLookupRead(BaseModel):
+    items: List[ProductLookupItem]
+    missing: List[UUID]
+
+# Stock a product can still sell (`available`) and stock held by unconverted reservations
+class ProductStockRead(BaseModel):
+    product_id: UUID
+    available: int
+    reserved: int
+
+# Splits a hot product's stock over this many sub-counters; 0 merges it back into one
+class ProductStockShards(BaseModel):
+    shard_count: int = Field(..., ge=0, le=64)
+
+# Outcome of a bulk catalog import
+class ProductImportResult(BaseModel):
+    received: int = Field(..., description="Rows read from the upload")
+    inserted: int
+    updated: int
+    unchanged: int
+
+# One entry of the change feed, with the product as it is now (a later change may follow)
+class ProductChangeRead(BaseModel):
+    operation: ProductChangeOperation
+    changed_at: datetime
+    product: ProductRead
+
+# A page of the change feed. Unlike listings, `next_cursor` is always set: pass it as
+# `since` to resume, also after an empty page. `has_more` says whether to ask again right away.
+class ProductChangeFeed(BaseModel):
+    items: List[ProductChangeRead]
+    next_cursor: str
+    has_more: bool
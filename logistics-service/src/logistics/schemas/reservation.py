@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field, ConfigDict
+from typing import List, Optional
+from decimal import Decimal
+from datetime import datetime
+from uuid import UUID
+from src.logistics.schemas.order import OrderItemCreate
+
+# Input: the cart's items, held for `ttl_seconds` (RESERVATION_DEFAULT_TTL_SECONDS when omitted)
+class ReservationCreate(BaseModel):
+    items: List[OrderItemCreate] = Field(..., min_length=1, description="Reservation must contain at least one item")
+    ttl_seconds: Optional[int] = Field(None, gt=0, description="At most RESERVATION_MAX_TTL_SECONDS")
+
+class ReservationItemRead(BaseModel):
+    product_id: UUID
+    quantity: int
+    price_at_reservation: Decimal
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ReservationRead(BaseModel):
+    id: UUID
+    expires_at: datetime
+    items: List[ReservationItemRead]
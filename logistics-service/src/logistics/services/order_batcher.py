@@ -0,0 +1,161 @@
+import asyncio
+import logging
+from typing import AsyncContextManager, Callable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.logistics.core.metrics import Histogram, registry
+from src.logistics.schemas.order import OrderCreate, OrderRead
+from src.logistics.services.order_service import OrderService
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = registry.register(Histogram(
+    "order_group_commit_batch_size", "Orders committed per group-commit transaction.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 500),
+))
+BATCH_SECONDS = registry.register(Histogram(
+    "order_group_commit_batch_seconds", "Time to process and commit one group-commit batch.",
+))
+
+_Pending = Tuple[OrderCreate, asyncio.Future]
+
+# Queued by stop(): everything ahead of it is still committed, nothing after it is accepted
+_STOP = object()
+
+
+class OrderBatcher:
+    """
+    Group-commit ingestion for POST /orders/.
+
+    Callers enqueue an order and await a future. A single worker collects orders
+    until `max_batch_size` is reached or `max_wait_seconds` has passed since the
+    first one arrived, then creates the whole micro-batch in one transaction with
+    `OrderService.create_orders_batch` (one sorted lock pass, one commit/fsync).
+    Each caller gets its own order back, or the same 400/404 it would get from the
+    direct path; a failed order never fails the rest of its batch.
+
+    The queue holds at most `max_queue_size` orders, so a database that falls
+    behind pushes back on callers instead of buffering without limit.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncContextManager[AsyncSession]],
+        max_batch_size: int = 100,
+        max_wait_seconds: float = 0.005,
+        max_queue_size: int = 1000,
+    ):
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._worker: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._stopping = False
+            self._worker = asyncio.create_task(self._run(), name="order-batcher")
+
+    async def stop(self) -> None:
+        """Commits everything queued before the call, then stops the worker."""
+        if self._worker is None:
+            return
+        self._stopping = True
+        await self._queue.put(_STOP)
+        await self._worker
+        self._worker = None
+        # Only reachable if something was queued behind the sentinel; never leave a caller hanging
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP and not item[1].done():
+                item[1].set_exception(_shutting_down())
+
+    async def submit(self, order_in: OrderCreate) -> OrderRead:
+        if self._worker is None or self._stopping:
+            raise _shutting_down()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((order_in, future))
+        return await future
+
+    def _drain(self, batch: List[_Pending], limit: int) -> bool:
+        """Moves up to `limit` queued orders into `batch` without waiting. Returns True on the stop sentinel."""
+        while limit > 0 and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is _STOP:
+                return True
+            batch.append(item)
+            limit -= 1
+        return False
+
+    async def _collect(self) -> Tuple[List[_Pending], bool]:
+        """
+        Waits for the first order, then gathers more until the batch is full or the window closes.
+        Returns the batch and whether the stop sentinel was reached.
+        """
+        batch: List[_Pending] = []
+        first = await self._queue.get()
+        if first is _STOP:
+            return batch, True
+        batch.append(first)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait_seconds
+        while len(batch) < self.max_batch_size:
+            if self._drain(batch, self.max_batch_size - len(batch)):
+                return batch, True
+            remaining = deadline - loop.time()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._collect()
+            await self._process(batch)
+
+    async def _process(self, batch: List[_Pending]) -> None:
+        # Callers that went away (client disconnect) are dropped before touching the database
+        batch = [(order_in, future) for order_in, future in batch if not future.done()]
+        if not batch:
+            return
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            async with self.session_factory() as session:
+                results = await OrderService(session).create_orders_batch([o for o, _ in batch])
+        except Exception as exc:
+            logger.exception(f"Group-commit batch of {len(batch)} orders failed")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        finally:
+            BATCH_SIZE.observe(len(batch))
+            BATCH_SECONDS.observe(loop.time() - started)
+
+        for result in results:
+            future = batch[result.index][1]
+            if future.done():
+                continue
+            if result.success:
+                future.set_result(result.order)
+            else:
+                future.set_exception(HTTPException(status_code=result.status_code, detail=result.error))
+
+
+def _shutting_down() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Order ingestion is shutting down.")
@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+from typing import AsyncIterable, AsyncIterator, Sequence
+from sqlalchemy import Row
+from src.logistics.schemas.enums import ExportFormat
+
+CSV_COLUMNS = [
+    "order_id", "status", "created_at",
+    "item_id", "product_id", "quantity", "price_at_order",
+]
+
+
+def _item(row: Row) -> dict:
+    return {
+        "id": str(row.item_id),
+        "product_id": str(row.product_id),
+        "quantity": row.quantity,
+        "price_at_order": str(row.price_at_order),
+    }
+
+
+async def encode_ndjson(partitions: AsyncIterable[Sequence[Row]]) -> AsyncIterator[str]:
+    """
+    One JSON object per order, shaped like OrderRead.
+    Rows arrive ordered by order, so each order is emitted as soon as the next one starts;
+    one chunk is yielded per fetched partition.
+    """
+    current = None
+    async for partition in partitions:
+        lines = []
+        for row in partition:
+            if current is None or current["id"] != str(row.order_id):
+                if current is not None:
+                    lines.append(json.dumps(current))
+                current = {
+                    "id": str(row.order_id),
+                    "status": row.status.value,
+                    "created_at": row.created_at.isoformat(),
+                    "items": [],
+                }
+            current["items"].append(_item(row))
+        if lines:
+            yield "\n".join(lines) + "\n"
+    if current is not None:
+        yield json.dumps(current) + "\n"
+
+
+async def encode_csv(partitions: AsyncIterable[Sequence[Row]]) -> AsyncIterator[str]:
+    """One CSV row per order item, with a header line first."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    yield buffer.getvalue()
+
+    async for partition in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            (
+                row.order_id, row.status.value, row.created_at.isoformat(),
+                row.item_id, row.product_id, row.quantity, row.price_at_order,
+            )
+            for row in partition
+        )
+        yield buffer.getvalue()
+
+
+ENCODERS = {
+    ExportFormat.NDJSON: (encode_ndjson, "application/x-ndjson"),
+    ExportFormat.CSV: (encode_csv, "text/csv"),
+}
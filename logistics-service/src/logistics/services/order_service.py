@@ -1,88 +1,426 @@
-from typing import List, Optional
+import hashlib
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.logistics.models.order import Order, OrderItem
 from src.logistics.models.product import Product
 from src.logistics.repositories.order_repository import OrderRepository
 from src.logistics.repositories.product_repository import ProductRepository
-from src.logistics.schemas.order import OrderCreate
-from src.logistics.schemas.enums import OrderStatus
+from src.logistics.core.config import settings
+from src.logistics.core.pagination import encode_cursor, decode_cursor
+from src.logistics.db.transaction import run_in_transaction
+from src.logistics.schemas.order import (
+    OrderCreate, OrderRead, OrderItemRead, OrderListRead, OrderBatchResult, OrderStatusFilter, OrderStatusResult
+)
+from src.logistics.schemas.pagination import Page
+from src.logistics.schemas.enums import OrderStatus, ExportFormat
+from src.logistics.services.order_export import ENCODERS
+from src.logistics.services.product_cache import ProductCache, product_cache
+from src.logistics.services.stock_stream import notify_on_commit
+from uuid import UUID
+
+# (current, requested) status pairs that are rejected, with the error returned to the client
+INVALID_TRANSITIONS = {
+    (OrderStatus.CANCELLED, OrderStatus.SHIPPED): "Cannot ship a cancelled order.",
+    # Cancelling returns the stock, so a cancelled order no longer holds any to reopen with
+    (OrderStatus.CANCELLED, OrderStatus.PENDING): "Cannot reopen a cancelled order.",
+    # Shipped goods have left the warehouse; cancelling would put them back into stock
+    (OrderStatus.SHIPPED, OrderStatus.CANCELLED): "Cannot cancel a shipped order.",
+}
+
+
+def _blocked_from(new_status: OrderStatus) -> List[OrderStatus]:
+    """Current statuses an order may not leave for `new_status`."""
+    return [current for current, requested in INVALID_TRANSITIONS if requested == new_status]
+
+
+def _order_from_rows(rows: Sequence[Row]) -> OrderRead:
+    """Assembles an OrderRead from flat (order columns, item_id, product_id, quantity, price_at_order) rows."""
+    head = rows[0]
+    return OrderRead(
+        id=head.id,
+        status=head.status,
+        created_at=head.created_at,
+        items=[
+            OrderItemRead(
+                id=row.item_id,
+                product_id=row.product_id,
+                quantity=row.quantity,
+                price_at_order=row.price_at_order,
+            )
+            for row in rows if row.item_id is not None
+        ],
+    )
+
 
 class OrderService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, cache: ProductCache = product_cache):
         self.db = db
         self.repository = OrderRepository(Order, db)
         self.product_repository = ProductRepository(Product, db)
+        self.cache = cache
 
-    async def create_order(self, order_in: OrderCreate) -> Order:
+    async def create_order(self, order_in: OrderCreate) -> OrderRead:
         """
         Creates an order transactionally.
         Supports nested transactions if called within an existing session context.
         """
-        if self.db.in_transaction():
-            async with self.db.begin_nested():
-                return await self._create_order_logic(order_in)
-        else:
-            async with self.db.begin():
-                return await self._create_order_logic(order_in)
+        return await run_in_transaction(self.db, "create_order", lambda: self._create_order_logic(order_in))
+
+    async def create_order_idempotent(self, order_in: OrderCreate, idempotency_key: str) -> Tuple[OrderRead, bool]:
+        """
+        Creates an order at most once per `idempotency_key` and returns it, with True if
+        it is the stored response of an earlier request rather than a new order.
+        The key is claimed before any product row is locked and committed with the order,
+        so a retry never decrements stock twice and a concurrent duplicate waits for the
+        first request instead of racing it. A rejected order (400/404) rolls back its
+        claim, so the client may retry the same key once stock is available.
+        """
+        request_hash = hashlib.sha256(order_in.model_dump_json().encode()).hexdigest()
+        return await run_in_transaction(
+            self.db, "create_order",
+            lambda: self._create_order_idempotent_logic(order_in, idempotency_key, request_hash),
+        )
+
+    async def _create_order_idempotent_logic(
+        self, order_in: OrderCreate, idempotency_key: str, request_hash: str
+    ) -> Tuple[OrderRead, bool]:
+        """Internal logic to be run inside a transaction block."""
+        stored = await self.repository.claim_idempotency_key(idempotency_key, request_hash)
+        if stored is not None:
+            if stored.request_hash != request_hash:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                    detail="Idempotency-Key was already used with a different request.",
+                )
+            return OrderRead.model_validate(stored.response), True
+
+        order = await self._create_order_logic(order_in)
+        await self.repository.complete_idempotency_key(idempotency_key, order.model_dump(mode="json"))
+        return order, False
 
-    async def _create_order_logic(self, order_in: OrderCreate) -> Order:
+    async def _create_order_logic(self, order_in: OrderCreate) -> OrderRead:
         """Internal logic to be run inside a transaction block."""
-        # Initialize Order
-        new_order = Order(status=OrderStatus.PENDING)
+        item_map = {item.product_id: item.quantity for item in order_in.items}
+        reserved = await self.take_stock(item_map)
+
+        new_order = Order(
+            status=OrderStatus.PENDING,
+            items=[
+                OrderItem(product_id=row.id, quantity=item_map[row.id], price_at_order=row.price)
+                for row in reserved
+            ],
+        )
         self.db.add(new_order)
+        # Ids are generated client-side and created_at comes back via INSERT ... RETURNING,
+        # so the response is built from the objects in hand instead of re-fetching the order
         await self.db.flush()
+        return OrderRead.model_validate(new_order)
 
-        # sort prdduct IDs to prevent deadlocks
-        item_map = {item.product_id: item.quantity for item in order_in.items}
-        sorted_product_ids = sorted(item_map.keys())
+    async def take_stock(self, item_map: dict) -> List[Row]:
+        """
+        Takes `item_map` ({product_id: quantity}) out of stock, or raises 404/400 for the
+        whole request, and returns an (id, price) row per product. Runs inside the
+        caller's transaction; used by orders and stock reservations.
+        """
+        # Lock (in sorted id order), check and decrement every product in one statement,
+        # before anything is inserted, so a rejected order costs a single round trip
+        reserved = list(await self.product_repository.reserve_stock(item_map))
+        if len(reserved) != len(item_map):
+            # Whatever is left is either sharded (hot SKU) or cannot be fulfilled
+            reserved_ids = {row.id for row in reserved}
+            reserved += await self.product_repository.reserve_sharded_stock(
+                {pid: qty for pid, qty in item_map.items() if pid not in reserved_ids}
+            )
+            if len(reserved) != len(item_map):
+                await self._raise_unreserved(item_map, {row.id for row in reserved})
+        self.cache.invalidate_on_commit(self.db, item_map)
+        notify_on_commit(self.db, item_map)
+        return reserved
 
-        # Batch Fetch & Lock (for N+1 Problem)
-        products = await self.product_repository.get_many_for_update(sorted_product_ids)
+    async def expire_idempotency_keys(self, limit: int) -> int:
+        """Deletes up to `limit` keys older than ORDER_IDEMPOTENCY_TTL_HOURS; run by the sweeper."""
+        created_before = datetime.now(timezone.utc) - timedelta(hours=settings.ORDER_IDEMPOTENCY_TTL_HOURS)
+        return await self.repository.delete_expired_idempotency_keys(created_before, limit)
+
+    async def _raise_unreserved(self, item_map: dict, reserved_ids: set) -> None:
+        """
+        Explains why a reservation came up short: products that do not exist (404)
+        take precedence over products without enough stock (400).
+        The enclosing transaction rolls back any partial decrement.
+        """
+        unreserved_ids = sorted(set(item_map) - reserved_ids)
+        products = await self.product_repository.get_many(unreserved_ids)
 
-        if len(products) != len(sorted_product_ids):
-            found_ids = {p.id for p in products}
-            missing_ids = set(sorted_product_ids) - found_ids
+        missing_ids = set(unreserved_ids) - {p.id for p in products}
+        if missing_ids:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, 
+                status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Products not found: {missing_ids}"
             )
 
-        for product in products:
-            qty_needed = item_map[product.id]
+        short_names = ", ".join(p.name for p in sorted(products, key=lambda p: p.id))
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Insufficient stock for {short_names}"
+        )
 
-            if product.stock_quantity < qty_needed:
-                raise HTTPException(
+    async def create_orders_batch(self, orders_in: List[OrderCreate]) -> List[OrderBatchResult]:
+        """
+        Creates many orders in a single transaction.
+        Orders that cannot be fulfilled are reported individually instead of failing the batch.
+        """
+        return await run_in_transaction(
+            self.db, "create_orders_batch", lambda: self._create_orders_batch_logic(orders_in)
+        )
+
+    async def _create_orders_batch_logic(self, orders_in: List[OrderCreate]) -> List[OrderBatchResult]:
+        """Internal logic to be run inside a transaction block."""
+        # One sorted lock pass over the union of all products in the batch
+        product_ids = sorted({item.product_id for order_in in orders_in for item in order_in.items})
+        products = {p.id: p for p in await self.product_repository.get_many_for_update(product_ids)}
+        shard_totals = await self.product_repository.lock_stock_shards(
+            [pid for pid, p in products.items() if p.stock_shard_count]
+        )
+        stock = {pid: p.stock_quantity for pid, p in products.items()}
+        stock.update({pid: row.stock_quantity for pid, row in shard_totals.items()})
+
+        results: List[OrderBatchResult] = []
+        accepted: List[tuple[int, dict]] = []
+        decrements: dict = {}
+
+        # Allocate stock in memory, in submission order
+        for index, order_in in enumerate(orders_in):
+            item_map = {item.product_id: item.quantity for item in order_in.items}
+
+            missing_ids = set(item_map) - set(products)
+            if missing_ids:
+                results.append(OrderBatchResult(
+                    index=index, success=False,
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    error=f"Products not found: {missing_ids}"
+                ))
+                continue
+
+            short = [products[pid].name for pid in sorted(item_map) if stock[pid] < item_map[pid]]
+            if short:
+                results.append(OrderBatchResult(
+                    index=index, success=False,
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Insufficient stock for {product.name}"
-                )
+                    error=f"Insufficient stock for {', '.join(short)}"
+                ))
+                continue
+
+            for pid, qty in item_map.items():
+                stock[pid] -= qty
+                decrements[pid] = decrements.get(pid, 0) + qty
+            accepted.append((index, item_map))
 
-            product.stock_quantity -= qty_needed
+        if not accepted:
+            return results
 
-            order_item = OrderItem(
-                order_id=new_order.id,
-                product_id=product.id,
-                quantity=qty_needed,
-                price_at_order=product.price
+        # Write everything back with set-based statements
+        await self.product_repository.decrement_stock(
+            {pid: qty for pid, qty in decrements.items() if pid not in shard_totals}
+        )
+        await self.product_repository.take_from_shards(
+            {pid: qty for pid, qty in decrements.items() if pid in shard_totals}
+        )
+        self.cache.invalidate_on_commit(self.db, decrements)
+        notify_on_commit(self.db, decrements)
+        order_rows = await self.repository.insert_many(
+            [{"status": OrderStatus.PENDING} for _ in accepted]
+        )
+        item_rows = await self.repository.insert_items([
+            {
+                "order_id": order_row.id,
+                "product_id": pid,
+                "quantity": qty,
+                "price_at_order": products[pid].price,
+            }
+            for order_row, (_, item_map) in zip(order_rows, accepted)
+            for pid, qty in item_map.items()
+        ])
+
+        items_by_order: dict = {}
+        for item_row in item_rows:
+            items_by_order.setdefault(item_row.order_id, []).append(item_row._asdict())
+
+        for order_row, (index, _) in zip(order_rows, accepted):
+            order = OrderRead(
+                id=order_row.id,
+                status=order_row.status,
+                created_at=order_row.created_at,
+                items=items_by_order[order_row.id],
             )
-            self.db.add(order_item)
+            results.append(OrderBatchResult(
+                index=index, success=True,
+                status_code=status.HTTP_201_CREATED,
+                order=order
+            ))
 
-        await self.db.flush()
-        return await self.repository.get_with_items(new_order.id)
+        return sorted(results, key=lambda r: r.index)
+
+    def export_orders(
+        self,
+        format: ExportFormat,
+        status: Optional[OrderStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Returns a lazily evaluated stream of encoded order history.
+        Nothing is read from the database until the stream is iterated.
+        """
+        encode, _ = ENCODERS[format]
+        partitions = self.repository.stream_export_rows(
+            status=status, created_from=created_from, created_to=created_to
+        )
+        return encode(partitions)
+
+    async def list_orders(
+        self,
+        status: Optional[OrderStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        product_id: Optional[UUID] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        include_items: bool = False,
+    ) -> Page[OrderListRead]:
+        """Returns a page of active orders, newest first, matching every given filter."""
+        after = decode_cursor(cursor, datetime.fromisoformat, UUID) if cursor is not None else None
+        # Fetch one extra row to know whether another page exists
+        orders = await self.repository.list_filtered(
+            status=status, created_from=created_from, created_to=created_to,
+            product_id=product_id, after=after, limit=limit + 1, include_items=include_items,
+        )
+
+        next_cursor = None
+        if len(orders) > limit:
+            orders = orders[:limit]
+            next_cursor = encode_cursor(orders[-1].created_at, orders[-1].id)
+        if include_items:
+            items = [OrderListRead.model_validate(order) for order in orders]
+        else:
+            items = [
+                OrderListRead(id=order.id, status=order.status, created_at=order.created_at)
+                for order in orders
+            ]
+        return Page[OrderListRead](items=items, next_cursor=next_cursor)
 
     async def get_order(self, order_id: int) -> Optional[Order]:
         return await self.repository.get_with_items(order_id)
 
-    async def update_status(self, order_id: int, new_status: OrderStatus) -> Order:
-        order = await self.repository.get_with_items(order_id)
+    async def get_order_json(self, order_id: UUID) -> Optional[str]:
+        """The order serialized by PostgreSQL; the same document as the `OrderRead` response."""
+        return await self.repository.get_json(order_id)
+
+    async def update_status(self, order_id: UUID, new_status: OrderStatus) -> OrderRead:
+        """
+        Changes an order's status with a single conditional UPDATE; the transition
+        rules are checked by the database in the same statement. Cancelling returns
+        the order's items to stock (once: cancelling again changes nothing).
+        """
+        return await run_in_transaction(
+            self.db, "update_order_status", lambda: self._update_status_logic(order_id, new_status)
+        )
+
+    async def _update_status_logic(self, order_id: UUID, new_status: OrderStatus) -> OrderRead:
+        """Internal logic to be run inside a transaction block."""
+        rows = await self.repository.update_status_returning(order_id, new_status, _blocked_from(new_status))
+        if rows:
+            if new_status == OrderStatus.CANCELLED and rows[0].previous_status != OrderStatus.CANCELLED:
+                returned: dict = {}
+                for row in rows:
+                    if row.item_id is not None:
+                        returned[row.product_id] = returned.get(row.product_id, 0) + row.quantity
+                await self.return_stock(returned)
+            return _order_from_rows(rows)
+
+        # Nothing updated: only now pay for a read to tell "missing" from "not allowed"
+        order = await self.repository.get(order_id)
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
-        if order.status == OrderStatus.CANCELLED and new_status == OrderStatus.SHIPPED:
-            raise HTTPException(status_code=400, detail="Cannot ship a cancelled order.")
+        raise HTTPException(
+            status_code=400,
+            detail=INVALID_TRANSITIONS.get(
+                (order.status, new_status),
+                f"Cannot change a {order.status.value} order to {new_status.value}."
+            )
+        )
+
+    async def update_statuses(
+        self,
+        new_status: OrderStatus,
+        order_ids: Optional[List[UUID]] = None,
+        filter: Optional[OrderStatusFilter] = None,
+        limit: int = 1000,
+    ) -> List[OrderStatusResult]:
+        """
+        Moves many orders, picked by id or by `filter`, to `new_status` in one transaction:
+        one set-based UPDATE that validates every transition, plus, for cancellations, one
+        aggregate over the cancelled orders' items and one restock UPDATE per stock layout.
+        Returns an outcome per requested id (in request order), or per moved order (in id
+        order) for a filter; rejected and unknown orders do not fail the rest.
+        """
+        return await run_in_transaction(
+            self.db, "update_order_statuses",
+            lambda: self._update_statuses_logic(new_status, order_ids, filter, limit),
+        )
+
+    async def _update_statuses_logic(
+        self,
+        new_status: OrderStatus,
+        order_ids: Optional[List[UUID]],
+        filter: Optional[OrderStatusFilter],
+        limit: int,
+    ) -> List[OrderStatusResult]:
+        """Internal logic to be run inside a transaction block."""
+        filters = filter.model_dump() if filter is not None else {}
+        rows = await self.repository.transition_statuses(
+            new_status, _blocked_from(new_status), order_ids=order_ids, limit=limit, **filters
+        )
+
+        if new_status == OrderStatus.CANCELLED:
+            cancelled = [row.id for row in rows if row.changed]
+            await self.return_stock(await self.repository.item_quantities(cancelled))
+
+        outcomes = {}
+        for row in rows:
+            if row.changed or row.previous_status == new_status:
+                outcomes[row.id] = OrderStatusResult(
+                    order_id=row.id, success=True, status_code=status.HTTP_200_OK,
+                    previous_status=row.previous_status,
+                )
+            else:
+                outcomes[row.id] = OrderStatusResult(
+                    order_id=row.id, success=False, status_code=status.HTTP_400_BAD_REQUEST,
+                    previous_status=row.previous_status,
+                    error=INVALID_TRANSITIONS[(row.previous_status, new_status)],
+                )
+        if order_ids is None:
+            return list(outcomes.values())
+        return [
+            outcomes.get(order_id) or OrderStatusResult(
+                order_id=order_id, success=False, status_code=status.HTTP_404_NOT_FOUND, error="Order not found"
+            )
+            for order_id in dict.fromkeys(order_ids)
+        ]
 
-        order.status = new_status
-        await self.db.commit()
-        await self.db.refresh(order)
-        return await self.repository.get_with_items(order_id)
\ No newline at end of file
+    async def return_stock(self, quantities: dict) -> None:
+        """
+        Returns cancelled or released quantities to stock, sharded products included.
+        Runs inside the caller's transaction.
+        """
+        if not quantities:
+            return
+        restocked = await self.product_repository.restock(quantities)
+        await self.product_repository.restock_shards(
+            {pid: qty for pid, qty in quantities.items() if pid not in restocked}
+        )
+        self.cache.invalidate_on_commit(self.db, quantities)
+        notify_on_commit(self.db, quantities)
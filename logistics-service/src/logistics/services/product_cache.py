@@ -0,0 +1,142 @@
+from typing import Iterable, Optional
+from uuid import UUID
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from src.logistics.core.cache import CacheBackend, InMemoryLRUCache
+from src.logistics.core.config import settings
+from src.logistics.db.routing import wants_primary
+from src.logistics.schemas.pagination import Page
+from src.logistics.schemas.product import ProductRead
+
+_PENDING_KEY = "product_cache_invalidations"
+_ALL = "*"
+
+
+class _PageGeneration:
+    """Version baked into listing-page keys; shared by every view of one backend."""
+
+    def __init__(self):
+        self.value = 0
+
+
+class ProductCache:
+    """
+    Read-through cache for catalog reads (`ProductRead` and listing pages).
+
+    Only non-locking reads go through here. Stock reservation always reads and
+    updates the locked row in PostgreSQL, so a stale entry can never cause an oversell;
+    at worst a listing shows a stock level that is up to one TTL old on another worker.
+    """
+
+    PRODUCT_PREFIX = "product:"
+    PAGE_PREFIX = "products:page:"
+
+    def __init__(self, backend: CacheBackend, enabled: bool = True, generation: Optional[_PageGeneration] = None):
+        self.backend = backend
+        self.enabled = enabled
+        self.generation = generation or _PageGeneration()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key: str):
+        if not self.enabled:
+            return None
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def get_product(self, product_id: UUID) -> Optional[ProductRead]:
+        return self._get(f"{self.PRODUCT_PREFIX}{product_id}")
+
+    def set_product(self, product: ProductRead) -> None:
+        if self.enabled:
+            self.backend.set(f"{self.PRODUCT_PREFIX}{product.id}", product)
+
+    def _page_key(self, page_key: str) -> str:
+        return f"{self.PAGE_PREFIX}{self.generation.value}:{page_key}"
+
+    def get_page(self, page_key: str) -> Optional[Page[ProductRead]]:
+        return self._get(self._page_key(page_key))
+
+    def set_page(self, page_key: str, page: Page[ProductRead]) -> None:
+        if self.enabled:
+            self.backend.set(self._page_key(page_key), page)
+
+    def invalidate(self, product_ids: Iterable[UUID] = ()) -> None:
+        """
+        Drops the given products and retires every cached listing page (any product can
+        appear on any page). Pages are retired by bumping the generation in their keys,
+        which is O(1); the orphaned entries age out through the LRU and TTL.
+        """
+        self.backend.delete(*(f"{self.PRODUCT_PREFIX}{pid}" for pid in product_ids))
+        self.generation.value += 1
+
+    def invalidate_all(self) -> None:
+        self.backend.delete_prefix(self.PRODUCT_PREFIX)
+        self.generation.value += 1
+
+    def invalidate_on_commit(self, db: AsyncSession, product_ids: Optional[Iterable[UUID]] = None) -> None:
+        """
+        Invalidates now and again once the surrounding transaction commits, so a
+        concurrent reader cannot re-populate the cache with the pre-commit row.
+        Pass `product_ids=None` to drop every product entry.
+        """
+        ids = None if product_ids is None else set(product_ids)
+        if ids is None:
+            self.invalidate_all()
+        else:
+            self.invalidate(ids)
+        pending = db.sync_session.info.setdefault(_PENDING_KEY, set())
+        pending.update({_ALL} if ids is None else ids)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            **self.backend.stats(),
+        }
+
+
+product_cache = ProductCache(
+    InMemoryLRUCache(
+        max_size=settings.PRODUCT_CACHE_MAX_SIZE,
+        ttl=settings.PRODUCT_CACHE_TTL_SECONDS,
+    ),
+    enabled=settings.PRODUCT_CACHE_ENABLED,
+)
+
+# Same backend, so writes still invalidate it, but nothing is read from or stored in it
+_bypass_cache = ProductCache(product_cache.backend, enabled=False, generation=product_cache.generation)
+
+
+def read_cache(request: Request) -> ProductCache:
+    """
+    Dependency for cached read routes: the shared cache, except inside the client's
+    read-your-writes window. There an entry re-populated from a lagging replica after the
+    client's write could still be served, so those reads skip the cache (and go to the primary).
+    """
+    return _bypass_cache if wants_primary(request) else product_cache
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    if _ALL in pending:
+        product_cache.invalidate_all()
+    else:
+        product_cache.invalidate(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
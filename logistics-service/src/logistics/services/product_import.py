@@ -0,0 +1,131 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterable, AsyncIterator, Dict, List, Tuple
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from src.logistics.schemas.enums import ImportFormat
+from src.logistics.schemas.product import ProductCreate
+
+# Row shape expected by ProductRepository.copy_into_staging
+ImportRecord = Tuple[str, object, int]
+
+# Bounds how much of the body one line, or one CSV record whose quoted fields span lines, may buffer
+MAX_CSV_RECORD_CHARS = 64 * 1024
+
+
+def _line_too_long(line_number: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+        detail=f"Line {line_number} is longer than {MAX_CSV_RECORD_CHARS} characters"
+    )
+
+
+async def _iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Re-assembles UTF-8 lines from an async byte stream, yielding (line_number, line).
+    Only the current partial line is buffered, up to MAX_CSV_RECORD_CHARS.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line_number += 1
+            if len(line) > MAX_CSV_RECORD_CHARS:
+                raise _line_too_long(line_number)
+            yield line_number, line.rstrip("\r")
+        if len(buffer) > MAX_CSV_RECORD_CHARS:
+            raise _line_too_long(line_number + 1)
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield line_number + 1, buffer.rstrip("\r")
+
+
+async def _iter_csv_records(chunks: AsyncIterable[bytes]) -> AsyncIterator[Tuple[int, List[str]]]:
+    """
+    Parses CSV records from an async byte stream, yielding (first line number, fields).
+    A quoted field may contain line breaks: lines are gathered until their quotes
+    balance (a literal quote is doubled, so the count stays even) and then parsed as one
+    record. Blank lines are skipped.
+    """
+    pending: List[str] = []
+    pending_chars = quotes = start = 0
+    async for line_number, line in _iter_lines(chunks):
+        if not pending:
+            start = line_number
+        pending.append(line)
+        pending_chars += len(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            if pending_chars > MAX_CSV_RECORD_CHARS:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                    detail=f"CSV record starting on line {start} is too long or has an unterminated quote"
+                )
+            continue
+        record, pending, pending_chars, quotes = pending, [], 0, 0
+        if len(record) == 1 and not record[0].strip():
+            continue
+        yield start, next(csv.reader(f"{part}\n" for part in record))
+    if pending:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Unterminated quoted field in the CSV record starting on line {start}"
+        )
+
+
+def _to_record(line_number: int, data: Dict[str, object]) -> ImportRecord:
+    """Validates one row with the same rules as POST /products/."""
+    try:
+        product = ProductCreate.model_validate(data)
+    except ValidationError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Invalid product on line {line_number}: {exc.errors(include_url=False)}"
+        )
+    return product.name, product.price, product.stock_quantity
+
+
+async def parse_csv(chunks: AsyncIterable[bytes]) -> AsyncIterator[ImportRecord]:
+    """Parses a CSV upload with a `name,price,stock_quantity` header, one product per record."""
+    header = None
+    async for line_number, fields in _iter_csv_records(chunks):
+        if header is None:
+            header = [field.strip() for field in fields]
+            missing = {"name", "price", "stock_quantity"} - set(header)
+            if missing:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                    detail=f"CSV header is missing columns: {sorted(missing)}"
+                )
+            continue
+        yield _to_record(line_number, dict(zip(header, fields)))
+
+
+async def parse_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[ImportRecord]:
+    """Parses newline-delimited JSON objects with name, price and stock_quantity keys."""
+    async for line_number, line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail=f"Invalid JSON on line {line_number}"
+            )
+        if not isinstance(data, dict):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail=f"Expected a JSON object on line {line_number}"
+            )
+        yield _to_record(line_number, data)
+
+
+PARSERS = {
+    ImportFormat.CSV: parse_csv,
+    ImportFormat.NDJSON: parse_ndjson,
+}
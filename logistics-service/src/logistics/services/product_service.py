@@ -1,25 +1,50 @@
-from typing import List, Optional
+from typing import AsyncIterable, List, Optional
 from uuid import UUID  # Fix: Added missing import
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.logistics.repositories.product_repository import ProductRepository
-from src.logistics.schemas.product import ProductCreate, ProductUpdate, ProductRead
+from src.logistics.schemas.product import (
+    ProductCreate, ProductUpdate, ProductRead, ProductImportResult, ProductChangeFeed, ProductChangeRead,
+    ProductLookupItem, ProductLookupRead, ProductStockRead,
+)
+from src.logistics.schemas.enums import ImportFormat, ProductField
+from src.logistics.services.product_import import PARSERS
+from src.logistics.services.product_cache import ProductCache, product_cache
+from src.logistics.schemas.pagination import Page
+from src.logistics.core.config import settings
+from src.logistics.core.pagination import encode_cursor, decode_cursor
+from src.logistics.db.transaction import TransactionPolicy, run_in_transaction
+from datetime import datetime, timedelta, timezone
 from src.logistics.models.product import Product
 
+# Long COPY statements are expected, and the streamed request body cannot be replayed
+IMPORT_POLICY = TransactionPolicy(
+    statement_timeout_ms=settings.PRODUCT_IMPORT_STATEMENT_TIMEOUT_MS, max_attempts=1
+)
+
+SEARCH_TIER_PREFIX = "prefix"
+SEARCH_TIER_FUZZY = "fuzzy"
+
+def _search_tier(value):
+    """Cursor converter: a tier this service never issues makes the cursor invalid (400)."""
+    if value not in (SEARCH_TIER_PREFIX, SEARCH_TIER_FUZZY):
+        raise ValueError(f"Unknown search tier: {value!r}")
+    return value
+
+def _optional(convert):
+    """Cursor converter for a key part that is null at the start of a tier."""
+    return lambda value: None if value is None else convert(value)
+
 class ProductService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, cache: ProductCache = product_cache):
         self.repository = ProductRepository(Product, db)
         self.db = db
+        self.cache = cache
 
     async def create_product(self, product_in: ProductCreate) -> Product:
         """
         Creates a new product.
         """
-        if self.db.in_transaction():
-            async with self.db.begin_nested():
-                return await self._create_product_logic(product_in)
-        else:
-            async with self.db.begin():
-                return await self._create_product_logic(product_in)
+        return await run_in_transaction(self.db, "create_product", lambda: self._create_product_logic(product_in))
 
     async def _create_product_logic(self, product_in: ProductCreate) -> Product:
         """Internal logic to be run inside a transaction block."""
@@ -27,14 +52,201 @@ class ProductService:
         new_product = await self.repository.create(product_data)
         await self.db.flush() 
         await self.db.refresh(new_product)
+        # New products shift listing pages
+        self.cache.invalidate_on_commit(self.db, [])
         return new_product
 
-    async def get_all_products(self, skip: int = 0, limit: int = 100) -> List[Product]:
+    async def set_stock_shards(self, product_id: UUID, shard_count: int) -> Optional[ProductRead]:
+        """
+        Flags a hot product for sharded stock (or unflags it with 0 shards), keeping its total.
+        Returns None if the product does not exist.
+        """
+        return await run_in_transaction(
+            self.db, "set_stock_shards", lambda: self._set_stock_shards_logic(product_id, shard_count)
+        )
+
+    async def _set_stock_shards_logic(self, product_id: UUID, shard_count: int) -> Optional[ProductRead]:
+        """Internal logic to be run inside a transaction block."""
+        products = await self.repository.get_many_for_update([product_id])
+        if not products:
+            return None
+        product = products[0]
+        await self.repository.reshard_stock(product, shard_count)
+        await self.db.flush()
+        await self.db.refresh(product)
+        self.cache.invalidate_on_commit(self.db, [product_id])
+        return ProductRead.model_validate(product)
+
+    async def import_products(
+        self, chunks: AsyncIterable[bytes], format: ImportFormat
+    ) -> ProductImportResult:
+        """
+        Bulk catalog sync: streams the upload through binary COPY into a staging
+        table and merges it into products by name in one statement.
+        Runs in a single transaction; any invalid row aborts the whole import.
+        The upload is consumed as it is copied, so a failed import is not retried.
+        """
+        return await run_in_transaction(
+            self.db, "import_products", lambda: self._import_products_logic(chunks, format), IMPORT_POLICY
+        )
+
+    async def _import_products_logic(
+        self, chunks: AsyncIterable[bytes], format: ImportFormat
+    ) -> ProductImportResult:
+        """Internal logic to be run inside a transaction block."""
+        await self.repository.create_import_staging()
+        received = await self.repository.copy_into_staging(PARSERS[format](chunks))
+        inserted, updated, unchanged = await self.repository.merge_import_staging()
+        self.cache.invalidate_on_commit(self.db)
+        return ProductImportResult(
+            received=received, inserted=inserted, updated=updated, unchanged=unchanged
+        )
+
+    async def get_all_products(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Page[ProductRead]:
+        """
+        Returns a page of active products ordered by (created_at, id).
+        A `cursor` seeks past the previous page; `skip` is kept for legacy offset clients.
+        """
+        page_key = f"{cursor}:{skip}:{limit}"
+        page = self.cache.get_page(page_key)
+        if page is not None:
+            return page
+
+        # Fetch one extra row to know whether another page exists
+        if cursor is not None:
+            after = decode_cursor(cursor, datetime.fromisoformat, UUID)
+            products = await self.repository.list_after(after=after, limit=limit + 1)
+        elif skip:
+            products = await self.repository.list(skip=skip, limit=limit + 1)
+        else:
+            products = await self.repository.list_after(limit=limit + 1)
+
+        next_cursor = None
+        if len(products) > limit:
+            products = products[:limit]
+            next_cursor = encode_cursor(products[-1].created_at, products[-1].id)
+        page = Page[ProductRead](items=products, next_cursor=next_cursor)
+        self.cache.set_page(page_key, page)
+        return page
+
+    async def search_products(
+        self, q: str, limit: int = 20, cursor: Optional[str] = None
+    ) -> Page[ProductRead]:
+        """
+        Type-ahead search in two ranked tiers: names starting with `q` (alphabetical),
+        then names containing a word similar to `q` (by similarity).
+        The cursor records the tier, the last row's sort key in that tier (lower(name) or
+        similarity) and its id.
+        """
+        tier, name_key, score_key, last_id = (
+            decode_cursor(cursor, _search_tier, _optional(str), _optional(float), _optional(UUID))
+            if cursor is not None
+            else (SEARCH_TIER_PREFIX, None, None, None)
+        )
+
+        items: list = []
+        next_cursor = None
+
+        if tier == SEARCH_TIER_PREFIX:
+            after = (name_key, last_id) if last_id is not None else None
+            prefix_hits = await self.repository.search_prefix(q, limit=limit + 1, after=after)
+            items = [product for product, _ in prefix_hits[:limit]]
+            if len(prefix_hits) > limit:
+                last, name_key = prefix_hits[limit - 1]
+                return Page[ProductRead](
+                    items=items,
+                    next_cursor=encode_cursor(SEARCH_TIER_PREFIX, name_key, None, last.id),
+                )
+            score_key, last_id = None, None
+
+        remaining = limit - len(items)
+        after = (score_key, last_id) if last_id is not None else None
+        fuzzy_hits = await self.repository.search_fuzzy(q, limit=remaining + 1, after=after)
+        if len(fuzzy_hits) > remaining:
+            fuzzy_hits = fuzzy_hits[:remaining]
+            if fuzzy_hits:
+                last, score = fuzzy_hits[-1]
+                next_cursor = encode_cursor(SEARCH_TIER_FUZZY, None, score, last.id)
+            else:
+                # The page filled up exactly at the end of the prefix tier
+                next_cursor = encode_cursor(SEARCH_TIER_FUZZY, None, None, None)
+        items.extend(product for product, _ in fuzzy_hits)
+        return Page[ProductRead](items=items, next_cursor=next_cursor)
+
+    async def list_changes(self, since: Optional[str] = None, limit: int = 100) -> ProductChangeFeed:
+        """
+        Returns up to `limit` catalog changes after the `since` cursor (from the oldest
+        retained change without one), with a cursor to resume from.
+        """
+        after = decode_cursor(since, int, int) if since is not None else None
+        # Fetch one extra row to know whether more changes are ready
+        changes = await self.repository.list_changes(after=after, limit=limit + 1)
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        if changes:
+            last = changes[-1][0]
+            next_cursor = encode_cursor(last.txid, last.id)
+        else:
+            next_cursor = since or encode_cursor(0, 0)
+        return ProductChangeFeed(
+            items=[
+                ProductChangeRead(
+                    operation=change.operation,
+                    changed_at=change.changed_at,
+                    product=ProductRead.model_validate(product),
+                )
+                for change, product in changes
+            ],
+            next_cursor=next_cursor,
+            has_more=has_more,
+        )
+
+    async def expire_changes(self, limit: int) -> int:
+        """Deletes up to `limit` changes older than PRODUCT_CHANGES_RETENTION_HOURS; run by the sweeper."""
+        changed_before = datetime.now(timezone.utc) - timedelta(hours=settings.PRODUCT_CHANGES_RETENTION_HOURS)
+        return await self.repository.delete_expired_changes(changed_before, limit)
+
+    async def lookup_products(
+        self, product_ids: List[UUID], fields: Optional[List[ProductField]] = None
+    ) -> ProductLookupRead:
+        """
+        Resolves many products in one query. Items follow the order of `product_ids`
+        (duplicates once, at their first position) and carry only `fields` (all when
+        omitted, `id` always); ids that do not exist or are deleted are listed in `missing`.
+        """
+        ordered = list(dict.fromkeys(product_ids))
+        names = [f.value for f in fields] if fields else [f.value for f in ProductField]
+        rows = await self.repository.get_many_projected(ordered, names)
+        found = {row.id: row for row in rows}
+        return ProductLookupRead(
+            items=[ProductLookupItem(**found[pid]._mapping) for pid in ordered if pid in found],
+            missing=[pid for pid in ordered if pid not in found],
+        )
+
+    async def get_stock(self, product_id: UUID) -> Optional[ProductStockRead]:
         """
-        Returns a paginated list of active products.
+        Stock a product can still sell and stock held by reservations; expired reservations
+        count as reserved until the sweeper returns their stock. None if not found.
         """
-        return await self.repository.list(skip=skip, limit=limit)
+        levels = await self.repository.get_stock_levels(product_id)
+        if levels is None:
+            return None
+        return ProductStockRead(product_id=product_id, available=levels.available, reserved=levels.reserved)
 
-    async def get_product_by_id(self, product_id: UUID) -> Optional[Product]:
+    async def get_product_by_id(self, product_id: UUID) -> Optional[ProductRead]:
         """Retrieves a single product or returns None if it doesn't exist or is deleted."""
-        return await self.repository.get(product_id)
\ No newline at end of file
+        cached = self.cache.get_product(product_id)
+        if cached is not None:
+            return cached
+        product = await self.repository.get(product_id)
+        if product is None:
+            return None
+        product_read = ProductRead.model_validate(product)
+        self.cache.set_product(product_read)
+        return product_read
@@ -0,0 +1,123 @@
+from typing import Sequence
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.logistics.core.config import settings
+from src.logistics.db.transaction import run_in_transaction
+from src.logistics.models.order import Order
+from src.logistics.models.reservation import StockReservation
+from src.logistics.repositories.order_repository import OrderRepository
+from src.logistics.repositories.reservation_repository import ReservationRepository
+from src.logistics.schemas.enums import OrderStatus
+from src.logistics.schemas.order import OrderRead
+from src.logistics.schemas.reservation import ReservationCreate, ReservationItemRead, ReservationRead
+from src.logistics.services.order_service import OrderService
+from src.logistics.services.product_cache import ProductCache, product_cache
+
+
+def _returned_quantities(rows: Sequence[Row]) -> dict:
+    """Sums released reservation items per product."""
+    quantities: dict = {}
+    for row in rows:
+        quantities[row.product_id] = quantities.get(row.product_id, 0) + row.quantity
+    return quantities
+
+
+class ReservationService:
+    def __init__(self, db: AsyncSession, cache: ProductCache = product_cache):
+        self.db = db
+        self.repository = ReservationRepository(StockReservation, db)
+        self.order_repository = OrderRepository(Order, db)
+        self.orders = OrderService(db, cache)
+
+    async def create_reservation(self, reservation_in: ReservationCreate) -> ReservationRead:
+        """
+        Holds stock for a cart: takes the quantities out of stock exactly like an order
+        would (404/400 for the whole request on a missing product or shortfall) and keeps
+        them until the reservation becomes an order, is released, or expires.
+        """
+        ttl_seconds = reservation_in.ttl_seconds or settings.RESERVATION_DEFAULT_TTL_SECONDS
+        if ttl_seconds > settings.RESERVATION_MAX_TTL_SECONDS:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail=f"ttl_seconds must be at most {settings.RESERVATION_MAX_TTL_SECONDS}",
+            )
+        return await run_in_transaction(
+            self.db, "create_reservation", lambda: self._create_reservation_logic(reservation_in, ttl_seconds)
+        )
+
+    async def _create_reservation_logic(self, reservation_in: ReservationCreate, ttl_seconds: int) -> ReservationRead:
+        """Internal logic to be run inside a transaction block."""
+        item_map = {item.product_id: item.quantity for item in reservation_in.items}
+        taken = await self.orders.take_stock(item_map)
+        items = [
+            {"product_id": row.id, "quantity": item_map[row.id], "price_at_reservation": row.price}
+            for row in taken
+        ]
+        reservation = await self.repository.insert(ttl_seconds, items)
+        return ReservationRead(
+            id=reservation.id,
+            expires_at=reservation.expires_at,
+            items=[ReservationItemRead(**item) for item in items],
+        )
+
+    async def create_order(self, reservation_id: UUID) -> OrderRead:
+        """
+        Turns an unexpired reservation into a pending order at the reserved prices. The stock
+        was taken when reserving, so this deletes the reservation and inserts the order
+        without locking any product row: a checkout never queues behind orders for the
+        same hot product. 404 for an unknown (or already used) reservation, 410 once expired.
+        """
+        return await run_in_transaction(
+            self.db, "create_order_from_reservation", lambda: self._create_order_logic(reservation_id)
+        )
+
+    async def _create_order_logic(self, reservation_id: UUID) -> OrderRead:
+        """Internal logic to be run inside a transaction block."""
+        existed, items = await self.repository.claim(reservation_id)
+        if not existed:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found")
+        if not items:
+            # Expired, or removed while we claimed it: the sweeper returns its stock and
+            # the client has to reserve again
+            raise HTTPException(status_code=status.HTTP_410_GONE, detail="Reservation expired")
+
+        [order_row] = await self.order_repository.insert_many([{"status": OrderStatus.PENDING}])
+        item_rows = await self.order_repository.insert_items([
+            {
+                "order_id": order_row.id,
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+                "price_at_order": item.price_at_reservation,
+            }
+            for item in items
+        ])
+        return OrderRead(
+            id=order_row.id,
+            status=order_row.status,
+            created_at=order_row.created_at,
+            items=[item_row._asdict() for item_row in item_rows],
+        )
+
+    async def release_reservation(self, reservation_id: UUID) -> None:
+        """Cancels a reservation, expired or not, and returns its stock (404 if unknown)."""
+        await run_in_transaction(
+            self.db, "release_reservation", lambda: self._release_reservation_logic(reservation_id)
+        )
+
+    async def _release_reservation_logic(self, reservation_id: UUID) -> None:
+        """Internal logic to be run inside a transaction block."""
+        items = await self.repository.release(reservation_id)
+        if not items:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found")
+        await self.orders.return_stock(_returned_quantities(items))
+
+    async def expire_reservations(self, limit: int) -> int:
+        """
+        Releases up to `limit` expired reservations and returns their stock with one
+        restock per stock layout; run by the sweeper. Returns how many were released.
+        """
+        items = await self.repository.delete_expired(limit)
+        await self.orders.return_stock(_returned_quantities(items))
+        return len({item.reservation_id for item in items})
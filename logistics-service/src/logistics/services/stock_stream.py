@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Dict, FrozenSet, Iterable, Optional, Set
+from uuid import UUID
+
+import asyncpg
+from sqlalchemy import Text, cast, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.logistics.core.config import settings
+from src.logistics.core.metrics import Counter, Gauge, registry
+from src.logistics.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+STOCK_CHANNEL = "product_stock"
+_PENDING_KEY = "stock_notifications"
+
+STREAM_SUBSCRIBERS = registry.register(Gauge(
+    "product_stream_subscribers", "Open /products/stream connections on this worker.",
+))
+STREAM_NOTIFICATIONS = registry.register(Counter(
+    "product_stream_notifications_total", "Stock notifications received on the LISTEN connection.",
+))
+STREAM_DROPPED = registry.register(Counter(
+    "product_stream_updates_dropped_total",
+    "Stock updates a slow subscriber never saw because a newer one replaced them.",
+))
+
+
+def notify_on_commit(db: AsyncSession, product_ids: Iterable[UUID]) -> None:
+    """
+    Publishes the stock of `product_ids` on the `product_stock` channel when the
+    surrounding transaction commits: one NOTIFY per product, however often the
+    transaction changed it, carrying the committed total. Rolled back changes send nothing.
+    """
+    if settings.PRODUCT_STOCK_STREAM_ENABLED:
+        db.sync_session.info.setdefault(_PENDING_KEY, set()).update(product_ids)
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_before_commit(session: Session) -> None:
+    if session.in_nested_transaction():
+        return  # Releasing a savepoint; notify once, for the whole transaction
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    # NOTIFY is transactional: queued here, delivered to listeners only once the commit succeeds
+    payload = cast(func.json_build_object("id", Product.id, "stock_quantity", Product.total_stock), Text)
+    session.execute(select(func.pg_notify(STOCK_CHANNEL, payload)).where(Product.id.in_(sorted(pending))))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+class Subscription:
+    """
+    One stream client's pending updates: only the latest stock per product is kept, so a
+    slow consumer skips stale levels instead of building up a backlog. At most
+    `max_pending` products are held; beyond that the oldest pending update is dropped.
+    """
+
+    def __init__(self, product_ids: Optional[FrozenSet[UUID]] = None, max_pending: int = 1000):
+        self.product_ids = product_ids
+        self.max_pending = max_pending
+        self._pending: Dict[UUID, int] = {}
+        self._ready = asyncio.Event()
+
+    def offer(self, product_id: UUID, stock_quantity: int) -> None:
+        if self.product_ids is not None and product_id not in self.product_ids:
+            return
+        if self._pending.pop(product_id, None) is not None:
+            STREAM_DROPPED.inc()
+        elif len(self._pending) >= self.max_pending:
+            del self._pending[next(iter(self._pending))]
+            STREAM_DROPPED.inc()
+        self._pending[product_id] = stock_quantity
+        self._ready.set()
+
+    async def next_updates(self, timeout: float) -> Dict[UUID, int]:
+        """Waits up to `timeout` seconds for updates and takes all pending ones (empty on timeout)."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return {}
+        updates, self._pending = self._pending, {}
+        self._ready.clear()
+        return updates
+
+
+class StockBroadcaster:
+    """
+    Fans stock notifications out to every stream subscriber of this worker over one
+    dedicated LISTEN connection, opened outside the pool, so subscribers cost no database
+    connection at all. The connection is re-established after a failure; updates sent
+    while it is down are not replayed, so clients should treat the stream as a hint and
+    re-read a product when exact stock matters.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        max_subscribers: int = 1000,
+        max_pending: int = 1000,
+        reconnect_seconds: float = 1.0,
+    ):
+        self.dsn = dsn
+        self.max_subscribers = max_subscribers
+        self.max_pending = max_pending
+        self.reconnect_seconds = reconnect_seconds
+        self._subscribers: Set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.listening = asyncio.Event()  # Set while the LISTEN connection is up
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, product_ids: Optional[Iterable[UUID]] = None) -> Optional[Subscription]:
+        """Returns a new subscription, or None when this worker already has `max_subscribers`."""
+        if len(self._subscribers) >= self.max_subscribers:
+            return None
+        subscription = Subscription(frozenset(product_ids) if product_ids else None, self.max_pending)
+        self._subscribers.add(subscription)
+        STREAM_SUBSCRIBERS.set(len(self._subscribers))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+        STREAM_SUBSCRIBERS.set(len(self._subscribers))
+
+    def publish(self, payload: str) -> None:
+        """Hands one notification payload ({"id": ..., "stock_quantity": ...}) to every subscriber."""
+        STREAM_NOTIFICATIONS.inc()
+        try:
+            update = json.loads(payload)
+            product_id, stock_quantity = UUID(update["id"]), int(update["stock_quantity"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Ignoring malformed {STOCK_CHANNEL} payload: {payload!r}")
+            return
+        for subscription in self._subscribers:
+            subscription.offer(product_id, stock_quantity)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="stock-broadcaster")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning(f"Stock LISTEN connection failed, retrying: {exc}")
+                await asyncio.sleep(self.reconnect_seconds)
+                continue
+
+            closed = loop.create_future()
+            connection.add_termination_listener(lambda _: closed.done() or closed.set_result(None))
+            try:
+                await connection.add_listener(STOCK_CHANNEL, lambda *args: self.publish(args[-1]))
+                self.listening.set()
+                await closed
+                logger.warning("Stock LISTEN connection lost, reconnecting")
+            finally:
+                self.listening.clear()
+                if not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self.reconnect_seconds)
+
+
+async def sse_events(
+    broadcaster: StockBroadcaster, subscription: Subscription, keepalive_seconds: float
+) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for one subscription: an `event: stock` message per updated product,
+    and a comment line after `keepalive_seconds` of silence so proxies keep the connection.
+    Unsubscribes when the client disconnects (the response task is cancelled).
+    """
+    try:
+        yield ": connected\n\n"
+        while True:
+            updates = await subscription.next_updates(keepalive_seconds)
+            if not updates:
+                yield ": keepalive\n\n"
+                continue
+            yield "".join(
+                f"event: stock\ndata: {json.dumps({'id': str(pid), 'stock_quantity': stock})}\n\n"
+                for pid, stock in updates.items()
+            )
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+stock_broadcaster = StockBroadcaster(
+    # The plain libpq form of the SQLAlchemy URL: asyncpg itself does not know "+asyncpg"
+    str(settings.SQLALCHEMY_DATABASE_URI).replace("postgresql+asyncpg://", "postgresql://", 1),
+    max_subscribers=settings.PRODUCT_STREAM_MAX_SUBSCRIBERS,
+    max_pending=settings.PRODUCT_STREAM_MAX_PENDING,
+)
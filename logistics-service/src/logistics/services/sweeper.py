@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from typing import AsyncContextManager, Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.logistics.core.metrics import Counter, registry
+
+logger = logging.getLogger(__name__)
+
+SWEPT_ROWS = registry.register(Counter(
+    "sweeper_rows_total", "Rows removed or released by background sweepers.", ("sweeper",),
+))
+
+
+class Sweeper:
+    """
+    Background housekeeping for one table, one task per worker.
+
+    Every `interval_seconds` it calls `sweep(session, batch_size)` in a fresh session and
+    transaction; `sweep` handles at most `batch_size` rows and returns how many it did.
+    A full batch is followed straight away by the next one, so a backlog drains in short
+    transactions that never hold many row locks at once. Failures are logged and the
+    next round runs as scheduled.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        session_factory: Callable[[], AsyncContextManager[AsyncSession]],
+        sweep: Callable[[AsyncSession, int], Awaitable[int]],
+        interval_seconds: float = 60.0,
+        batch_size: int = 1000,
+    ):
+        self.name = name
+        self.session_factory = session_factory
+        self.sweep = sweep
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"{self.name}-sweeper")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> int:
+        """Sweeps until a batch comes back short. Returns the number of rows handled."""
+        total = 0
+        while True:
+            async with self.session_factory() as session, session.begin():
+                count = await self.sweep(session, self.batch_size)
+            total += count
+            if count:
+                SWEPT_ROWS.inc(self.name, amount=count)
+            if count < self.batch_size:
+                return total
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                swept = await self.run_once()
+                if swept:
+                    logger.info(f"{self.name} sweeper: {swept} row(s)")
+            except Exception:
+                logger.exception(f"{self.name} sweeper failed")
+            await asyncio.sleep(self.interval_seconds)
@@ -6,8 +6,9 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 
 from src.logistics.main import app
 from src.logistics.db.base import Base
-from src.logistics.db.session import get_db
+from src.logistics.db.session import get_db, get_read_db
 from src.logistics.core.config import settings
+from src.logistics.services.product_cache import product_cache
 
 @pytest.fixture(scope="session")
 async def db_engine():
@@ -33,12 +34,22 @@ async def setup_db(db_engine):
     Runs once per session.
     """
     async with db_engine.begin() as conn:
+        await conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
     yield
     async with db_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
+@pytest.fixture(autouse=True)
+def clear_product_cache():
+    """
+    Test data is rolled back after each test, so cached reads must not outlive it.
+    """
+    product_cache.invalidate_all()
+    yield
+    product_cache.invalidate_all()
+
 @pytest.fixture
 async def db_session(db_session_factory) -> AsyncGenerator[AsyncSession, None]:
     """
@@ -53,12 +64,13 @@ async def db_session(db_session_factory) -> AsyncGenerator[AsyncSession, None]:
 async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     """
     Provides an AsyncClient for FastAPI.
-    Overrides the get_db dependency to use the test session.
+    Overrides the get_db and get_read_db dependencies to use the test session.
     """
     async def override_get_db():
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
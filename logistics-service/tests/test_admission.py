@@ -0,0 +1,116 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from src.logistics.core.admission import ADMISSION_SHED, AdmissionController, Priority
+
+async def settle():
+    """Lets queued acquire() calls reach their wait."""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+@pytest.mark.asyncio
+async def test_requests_under_capacity_are_admitted_immediately():
+    controller = AdmissionController(capacity=2)
+
+    await controller.acquire("get_order", Priority.NORMAL)
+    await controller.acquire("get_order", Priority.NORMAL)
+
+    assert controller.stats()["in_flight"] == 2
+    controller.release("get_order")
+    controller.release("get_order")
+    assert controller.stats()["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_newcomer_with_retry_after():
+    controller = AdmissionController(capacity=1, max_queue=1, retry_after=3)
+    await controller.acquire("get_order", Priority.NORMAL)
+    queued = asyncio.create_task(controller.acquire("get_order", Priority.NORMAL))
+    await settle()
+
+    with pytest.raises(HTTPException) as exc:
+        await controller.acquire("list_orders", Priority.LOW)
+
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "3"
+    assert controller.shed == {"queue_full": 1}
+
+    controller.release("get_order")
+    await queued
+    assert controller.stats() == {"enabled": True, "capacity": 1, "in_flight": 1, "queued": 0, "shed": {"queue_full": 1}}
+
+@pytest.mark.asyncio
+async def test_critical_request_evicts_low_priority_waiter():
+    controller = AdmissionController(capacity=1, max_queue=1)
+    await controller.acquire("get_order", Priority.NORMAL)
+    listing = asyncio.create_task(controller.acquire("list_orders", Priority.LOW))
+    await settle()
+    evicted_before = ADMISSION_SHED.value("list_orders", "evicted")
+
+    order = asyncio.create_task(controller.acquire("create_order", Priority.CRITICAL))
+    with pytest.raises(HTTPException):
+        await listing
+    controller.release("get_order")
+    await order
+
+    assert controller.shed == {"evicted": 1}
+    assert ADMISSION_SHED.value("list_orders", "evicted") == evicted_before + 1
+
+@pytest.mark.asyncio
+async def test_waiter_is_shed_after_queue_timeout():
+    controller = AdmissionController(capacity=1, queue_timeout=0.05)
+    await controller.acquire("get_order", Priority.NORMAL)
+
+    with pytest.raises(HTTPException) as exc:
+        await controller.acquire("get_order", Priority.NORMAL)
+
+    assert exc.value.status_code == 503
+    assert controller.stats()["queued"] == 0
+    assert controller.shed == {"timeout": 1}
+
+@pytest.mark.asyncio
+async def test_route_limit_does_not_block_other_routes():
+    controller = AdmissionController(capacity=5, route_limits={"export_orders": 1})
+    await controller.acquire("export_orders", Priority.LOW)
+    second_export = asyncio.create_task(controller.acquire("export_orders", Priority.LOW))
+    await settle()
+
+    # Queued behind the export limit, yet a different route still gets in at once
+    await asyncio.wait_for(controller.acquire("get_order", Priority.NORMAL), 0.1)
+    assert not second_export.done()
+
+    controller.release("export_orders")
+    await second_export
+    assert controller.stats()["in_flight"] == 2
+
+@pytest.mark.asyncio
+async def test_full_queue_does_not_shed_requests_with_a_free_slot():
+    controller = AdmissionController(capacity=5, max_queue=1, route_limits={"export_orders": 1})
+    await controller.acquire("export_orders", Priority.LOW)
+    second_export = asyncio.create_task(controller.acquire("export_orders", Priority.LOW))
+    await settle()
+
+    # The queue is full of a waiter blocked by its route limit; a free slot is still taken at once
+    await asyncio.wait_for(controller.acquire("get_order", Priority.NORMAL), 0.1)
+    assert controller.shed == {}
+
+    controller.release("export_orders")
+    await second_export
+
+@pytest.mark.asyncio
+async def test_reserved_slots_are_kept_for_critical_routes():
+    controller = AdmissionController(capacity=3, reserved_critical=1, queue_timeout=0.05)
+    await controller.acquire("list_orders", Priority.LOW)
+    await controller.acquire("get_order", Priority.NORMAL)
+
+    with pytest.raises(HTTPException):
+        await controller.acquire("list_products", Priority.LOW)
+    await asyncio.wait_for(controller.acquire("create_order", Priority.CRITICAL), 0.1)
+
+    assert controller.stats()["in_flight"] == 3
+
+@pytest.mark.asyncio
+async def test_admission_stats_endpoint(client):
+    response = await client.get("/health/admission")
+
+    assert response.status_code == 200
+    assert {"capacity", "in_flight", "queued", "shed"} <= response.json().keys()
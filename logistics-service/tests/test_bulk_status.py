@@ -0,0 +1,109 @@
+import pytest
+import uuid
+from httpx import AsyncClient
+from sqlalchemy import select
+from src.logistics.models.product import Product, ProductStockShard
+from src.logistics.schemas.enums import OrderStatus
+
+async def place_order(client: AsyncClient, *items) -> str:
+    response = await client.post("/api/v1/orders/", json={
+        "items": [{"product_id": str(product.id), "quantity": quantity} for product, quantity in items]
+    })
+    assert response.status_code == 201
+    return response.json()["id"]
+
+@pytest.mark.asyncio
+async def test_cancel_restocks_once_and_blocks_reopening(client: AsyncClient, db_session):
+    product = Product(name="Cancelled Blender", price=50.00, stock_quantity=10)
+    db_session.add(product)
+    await db_session.flush()
+    order_id = await place_order(client, (product, 4))
+
+    for _ in range(2):
+        response = await client.patch(f"/api/v1/orders/{order_id}/status", json={"status": "cancelled"})
+        assert response.status_code == 200
+    await db_session.refresh(product)
+    assert product.stock_quantity == 10
+
+    response = await client.patch(f"/api/v1/orders/{order_id}/status", json={"status": "pending"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cannot reopen a cancelled order."
+
+@pytest.mark.asyncio
+async def test_bulk_cancel_reports_per_order_outcomes_and_restocks(client: AsyncClient, db_session):
+    desk = Product(name="Bulk Desk", price=120.00, stock_quantity=10)
+    chair = Product(name="Bulk Chair", price=60.00, stock_quantity=10)
+    db_session.add_all([desk, chair])
+    await db_session.flush()
+    first = await place_order(client, (desk, 1), (chair, 2))
+    second = await place_order(client, (desk, 3))
+    shipped = await place_order(client, (chair, 1))
+    await client.patch(f"/api/v1/orders/{shipped}/status", json={"status": "shipped"})
+    missing = str(uuid.uuid4())
+
+    response = await client.patch("/api/v1/orders/status", json={
+        "status": "cancelled", "order_ids": [second, missing, first, shipped],
+    })
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["order_id"] for r in results] == [second, missing, first, shipped]
+    assert [r["status_code"] for r in results] == [200, 404, 200, 400]
+    assert results[3]["previous_status"] == OrderStatus.SHIPPED
+    assert results[3]["error"] == "Cannot cancel a shipped order."
+    # Only the pending orders come back; the shipped chair stays sold
+    await db_session.refresh(desk)
+    await db_session.refresh(chair)
+    assert (desk.stock_quantity, chair.stock_quantity) == (10, 9)
+    assert (await client.get(f"/api/v1/orders/{shipped}")).json()["status"] == OrderStatus.SHIPPED
+
+    response = await client.patch(f"/api/v1/orders/{shipped}/status", json={"status": "cancelled"})
+    assert response.status_code == 400
+    await db_session.refresh(chair)
+    assert chair.stock_quantity == 9
+
+    # Shipping cancelled orders is rejected per order
+    response = await client.patch("/api/v1/orders/status", json={"status": "shipped", "order_ids": [first]})
+    [result] = response.json()["results"]
+    assert not result["success"] and result["status_code"] == 400
+    assert result["error"] == "Cannot ship a cancelled order."
+
+@pytest.mark.asyncio
+async def test_bulk_ship_by_filter_moves_at_most_limit(client: AsyncClient, db_session):
+    product = Product(name="Wave Parcel", price=5.00, stock_quantity=10)
+    db_session.add(product)
+    await db_session.flush()
+    created = [await place_order(client, (product, 1)) for _ in range(3)]
+    body = {"status": "shipped", "filter": {"status": "pending"}, "limit": 2}
+
+    moved = []
+    while results := (await client.patch("/api/v1/orders/status", json=body)).json()["results"]:
+        assert len(results) <= 2 and all(r["success"] for r in results)
+        moved += [r["order_id"] for r in results]
+
+    assert set(created) <= set(moved)
+    for order_id in created:
+        assert (await client.get(f"/api/v1/orders/{order_id}")).json()["status"] == OrderStatus.SHIPPED
+
+@pytest.mark.asyncio
+async def test_bulk_update_needs_exactly_one_selector(client: AsyncClient):
+    response = await client.patch("/api/v1/orders/status", json={"status": "shipped"})
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_cancel_restocks_sharded_product(client: AsyncClient, db_session):
+    product = Product(name="Cancelled Hot Item", price=9.00, stock_quantity=8)
+    db_session.add(product)
+    await db_session.flush()
+    await client.put(f"/api/v1/products/{product.id}/stock-shards", json={"shard_count": 4})
+    order_id = await place_order(client, (product, 3))
+
+    await client.patch("/api/v1/orders/status", json={"status": "cancelled", "order_ids": [order_id]})
+
+    total = await db_session.scalar(
+        select(Product.total_stock).where(Product.id == product.id).execution_options(populate_existing=True)
+    )
+    shards = await db_session.scalars(
+        select(ProductStockShard.quantity).where(ProductStockShard.product_id == product.id)
+    )
+    assert total == 8 and sum(shards) == 8
@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+import uuid
+from datetime import datetime, timedelta, timezone
+from httpx import AsyncClient
+from sqlalchemy import delete, select
+from src.logistics.models.order import Order, OrderIdempotencyKey, OrderItem
+from src.logistics.models.product import Product
+from src.logistics.schemas.order import OrderCreate
+from src.logistics.services.order_service import OrderService
+
+@pytest.mark.asyncio
+async def test_repeated_key_replays_order_without_touching_stock(client: AsyncClient, db_session):
+    product = Product(name="Retried Router", price=80.00, stock_quantity=5)
+    db_session.add(product)
+    await db_session.flush()
+    body = {"items": [{"product_id": str(product.id), "quantity": 2}]}
+    headers = {"Idempotency-Key": f"checkout-{uuid.uuid4()}"}
+
+    first = await client.post("/api/v1/orders/", json=body, headers=headers)
+    retry = await client.post("/api/v1/orders/", json=body, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert "Idempotent-Replayed" not in first.headers
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    await db_session.refresh(product)
+    assert product.stock_quantity == 3
+
+@pytest.mark.asyncio
+async def test_key_reused_with_different_body_is_rejected(client: AsyncClient, db_session):
+    product = Product(name="Reused Key Lamp", price=15.00, stock_quantity=5)
+    db_session.add(product)
+    await db_session.flush()
+    headers = {"Idempotency-Key": f"checkout-{uuid.uuid4()}"}
+
+    await client.post("/api/v1/orders/", json={"items": [{"product_id": str(product.id), "quantity": 1}]}, headers=headers)
+    response = await client.post(
+        "/api/v1/orders/", json={"items": [{"product_id": str(product.id), "quantity": 4}]}, headers=headers
+    )
+
+    assert response.status_code == 422
+    await db_session.refresh(product)
+    assert product.stock_quantity == 4
+
+@pytest.mark.asyncio
+async def test_rejected_order_does_not_keep_its_key(client: AsyncClient, db_session):
+    product = Product(name="Sold Out Kettle", price=30.00, stock_quantity=0)
+    db_session.add(product)
+    await db_session.flush()
+    body = {"items": [{"product_id": str(product.id), "quantity": 1}]}
+    headers = {"Idempotency-Key": f"checkout-{uuid.uuid4()}"}
+
+    assert (await client.post("/api/v1/orders/", json=body, headers=headers)).status_code == 400
+    product.stock_quantity = 1
+    await db_session.flush()
+    response = await client.post("/api/v1/orders/", json=body, headers=headers)
+
+    assert response.status_code == 201
+    assert "Idempotent-Replayed" not in response.headers
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicate_waits_for_first_request(db_session_factory):
+    """The duplicate blocks on the first transaction's claim and then replays its committed order."""
+    key = f"checkout-{uuid.uuid4()}"
+    async with db_session_factory() as setup, setup.begin():
+        product = Product(name="Concurrent Checkout Item", price=10.00, stock_quantity=5)
+        setup.add(product)
+    order_in = OrderCreate(items=[{"product_id": product.id, "quantity": 1}])
+
+    try:
+        async with db_session_factory() as first_session, db_session_factory() as second_session:
+            async with first_session.begin():
+                first, replayed = await OrderService(first_session).create_order_idempotent(order_in, key)
+                assert not replayed
+                duplicate = asyncio.create_task(
+                    OrderService(second_session).create_order_idempotent(order_in, key)
+                )
+                await asyncio.sleep(0.2)
+                assert not duplicate.done()
+            second, replayed = await duplicate
+
+        assert replayed and second == first
+        async with db_session_factory() as check:
+            assert await check.scalar(select(Product.stock_quantity).where(Product.id == product.id)) == 4
+    finally:
+        async with db_session_factory() as cleanup, cleanup.begin():
+            await cleanup.execute(delete(OrderIdempotencyKey).where(OrderIdempotencyKey.key == key))
+            order_ids = select(OrderItem.order_id).where(OrderItem.product_id == product.id)
+            await cleanup.execute(delete(Order).where(Order.id.in_(order_ids.scalar_subquery())))
+            await cleanup.execute(delete(Product).where(Product.id == product.id))
+
+@pytest.mark.asyncio
+async def test_expired_keys_are_swept_in_batches(db_session):
+    now = datetime.now(timezone.utc)
+    db_session.add_all([
+        OrderIdempotencyKey(key=f"old-{i}", request_hash="x", response={}, created_at=now - timedelta(days=2))
+        for i in range(3)
+    ] + [OrderIdempotencyKey(key="fresh", request_hash="x", response={}, created_at=now)])
+    await db_session.flush()
+    service = OrderService(db_session)
+
+    assert await service.expire_idempotency_keys(limit=2) == 2
+    assert await service.expire_idempotency_keys(limit=2) == 1
+    remaining = await db_session.scalars(select(OrderIdempotencyKey.key))
+    assert list(remaining) == ["fresh"]
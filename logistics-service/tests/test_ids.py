@@ -0,0 +1,34 @@
+import pytest
+import time
+import uuid
+from sqlalchemy import text
+from src.logistics.core.ids import uuid7
+
+def test_uuid7_layout_and_ordering():
+    before_ms = time.time_ns() // 1_000_000
+    ids = [uuid7() for _ in range(10_000)]
+
+    assert all(i.version == 7 and i.variant == uuid.RFC_4122 for i in ids)
+    # Strictly increasing within one process, even inside the same millisecond
+    assert ids == sorted(ids) and len(set(ids)) == len(ids)
+    assert ids[0].int >> 80 >= before_ms
+
+@pytest.mark.asyncio
+async def test_sql_uuid7_matches_python_layout(db_session):
+    python_id = uuid7()
+    result = await db_session.execute(text("SELECT uuid_generate_v7() FROM generate_series(1, 100)"))
+    sql_ids = [row[0] for row in result]
+
+    assert all(i.version == 7 and i.variant == uuid.RFC_4122 for i in sql_ids)
+    # Same 48-bit millisecond prefix, so SQL- and Python-generated keys interleave by time
+    assert abs((sql_ids[0].int >> 80) - (python_id.int >> 80)) < 5_000
+
+@pytest.mark.asyncio
+async def test_new_rows_get_time_ordered_ids(client):
+    created = []
+    for name in ("Ordered A", "Ordered B", "Ordered C"):
+        response = await client.post("/api/v1/products/", json={"name": name, "price": 1.0, "stock_quantity": 1})
+        created.append(uuid.UUID(response.json()["id"]))
+
+    assert all(i.version == 7 for i in created)
+    assert created == sorted(created)
@@ -0,0 +1,54 @@
+import pytest
+from httpx import AsyncClient
+from src.logistics.core.config import settings
+from src.logistics.core.metrics import QUERY_COUNT_HEADER, REQUEST_QUERIES
+from src.logistics.models.product import Product
+
+@pytest.mark.asyncio
+async def test_query_count_header_only_in_debug(client: AsyncClient, db_session, monkeypatch):
+    product = Product(name="Metered Lamp", price=10.00, stock_quantity=5)
+    db_session.add(product)
+    await db_session.flush()
+
+    response = await client.get("/api/v1/products/")
+    assert QUERY_COUNT_HEADER not in response.headers
+
+    monkeypatch.setattr(settings, "DEBUG", True)
+    response = await client.post(
+        "/api/v1/orders/", json={"items": [{"product_id": str(product.id), "quantity": 1}]}
+    )
+    assert response.status_code == 201
+    assert int(response.headers[QUERY_COUNT_HEADER]) > 0
+
+    # Product listings are cached, so a repeated read makes no round trip at all
+    await client.get("/api/v1/products/")
+    response = await client.get("/api/v1/products/")
+    assert response.headers[QUERY_COUNT_HEADER] == "0"
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_per_route_histograms(client: AsyncClient):
+    labels = ("GET", "/api/v1/orders/{order_id}")
+    before = REQUEST_QUERIES.count(*labels)
+
+    response = await client.get("/api/v1/orders/00000000-0000-0000-0000-000000000000")
+    assert response.status_code == 404
+    assert REQUEST_QUERIES.count(*labels) == before + 1
+    assert REQUEST_QUERIES.sum(*labels) >= 1
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'http_requests_total{method="GET",route="/api/v1/orders/{order_id}",status="404"}' in body
+    assert 'http_request_db_queries_bucket{method="GET",route="/api/v1/orders/{order_id}",le="+Inf"}' in body
+    assert 'http_request_db_pool_wait_seconds_count{method="GET",route="/api/v1/orders/{order_id}"}' in body
+
+@pytest.mark.asyncio
+async def test_unmatched_paths_share_one_route_label(client: AsyncClient):
+    await client.get("/no/such/path/12345")
+    await client.get("/no/such/path/67890")
+
+    body = (await client.get("/metrics")).text
+    assert 'route="unmatched",status="404"' in body
+    assert "12345" not in body and "67890" not in body
@@ -0,0 +1,134 @@
+import asyncio
+import pytest
+import uuid
+from contextlib import asynccontextmanager
+from fastapi import HTTPException
+from src.logistics.main import app
+from src.logistics.models.product import Product
+from src.logistics.schemas.order import OrderCreate
+from src.logistics.services.order_batcher import BATCH_SIZE, OrderBatcher
+
+def order_for(product_id, quantity: int) -> OrderCreate:
+    return OrderCreate(items=[{"product_id": product_id, "quantity": quantity}])
+
+@pytest.fixture
+async def batcher(db_session):
+    """A batcher whose transactions run as savepoints inside the test session."""
+    @asynccontextmanager
+    async def session_factory():
+        yield db_session
+
+    batcher = OrderBatcher(session_factory, max_batch_size=10, max_wait_seconds=0.05)
+    batcher.start()
+    yield batcher
+    await batcher.stop()
+
+@pytest.mark.asyncio
+async def test_concurrent_orders_share_one_transaction(batcher, db_session):
+    product = Product(name="Flash Sale Item", price=20.00, stock_quantity=5)
+    db_session.add(product)
+    await db_session.flush()
+    batches_before = BATCH_SIZE.count()
+
+    results = await asyncio.gather(
+        batcher.submit(order_for(product.id, 2)),
+        batcher.submit(order_for(product.id, 2)),
+        batcher.submit(order_for(product.id, 2)),
+        batcher.submit(order_for(uuid.uuid4(), 1)),
+        return_exceptions=True,
+    )
+
+    # One batch, and every caller gets its own outcome in submission order
+    assert BATCH_SIZE.count() == batches_before + 1
+    assert [r.items[0].quantity for r in results[:2]] == [2, 2]
+    assert isinstance(results[2], HTTPException) and results[2].status_code == 400
+    assert isinstance(results[3], HTTPException) and results[3].status_code == 404
+
+    await db_session.refresh(product)
+    assert product.stock_quantity == 1
+
+@pytest.mark.asyncio
+async def test_batch_size_limit_splits_batches(db_session):
+    @asynccontextmanager
+    async def session_factory():
+        yield db_session
+
+    product = Product(name="Split Batch Item", price=1.00, stock_quantity=100)
+    db_session.add(product)
+    await db_session.flush()
+
+    batcher = OrderBatcher(session_factory, max_batch_size=2, max_wait_seconds=0.05)
+    batcher.start()
+    try:
+        batches_before = BATCH_SIZE.count()
+        results = await asyncio.gather(*(batcher.submit(order_for(product.id, 1)) for _ in range(5)))
+    finally:
+        await batcher.stop()
+
+    assert len({r.id for r in results}) == 5
+    assert BATCH_SIZE.count() == batches_before + 3
+
+@pytest.mark.asyncio
+async def test_post_orders_goes_through_batcher_when_enabled(client, batcher, db_session, monkeypatch):
+    product = Product(name="Batched Endpoint Item", price=7.50, stock_quantity=3)
+    db_session.add(product)
+    await db_session.flush()
+    monkeypatch.setattr(app.state, "order_batcher", batcher, raising=False)
+
+    payload = {"items": [{"product_id": str(product.id), "quantity": 2}]}
+    first, second = await asyncio.gather(
+        client.post("/api/v1/orders/", json=payload),
+        client.post("/api/v1/orders/", json=payload),
+    )
+
+    assert sorted([first.status_code, second.status_code]) == [201, 400]
+    created = first if first.status_code == 201 else second
+    assert created.json()["items"][0]["price_at_order"] == "7.50"
+
+@pytest.mark.asyncio
+async def test_orders_queued_before_start_are_not_dropped(db_session):
+    """Orders already waiting when a batch is collected must land in this or the next batch."""
+    @asynccontextmanager
+    async def session_factory():
+        yield db_session
+
+    product = Product(name="Backlog Item", price=1.00, stock_quantity=100)
+    db_session.add(product)
+    await db_session.flush()
+
+    batcher = OrderBatcher(session_factory, max_batch_size=3, max_wait_seconds=0.05)
+    batcher.start()
+    # Fill the queue before the worker gets a chance to run
+    submissions = [asyncio.ensure_future(batcher.submit(order_for(product.id, 1))) for _ in range(7)]
+    try:
+        results = await asyncio.wait_for(asyncio.gather(*submissions), timeout=5)
+    finally:
+        await batcher.stop()
+
+    assert len({r.id for r in results}) == 7
+
+@pytest.mark.asyncio
+async def test_stop_commits_queued_orders_and_rejects_new_ones(db_session):
+    @asynccontextmanager
+    async def session_factory():
+        yield db_session
+
+    product = Product(name="Shutdown Item", price=1.00, stock_quantity=10)
+    db_session.add(product)
+    await db_session.flush()
+
+    batcher = OrderBatcher(session_factory, max_batch_size=10, max_wait_seconds=1.0)
+    batcher.start()
+    pending = [asyncio.ensure_future(batcher.submit(order_for(product.id, 1))) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    # stop() must not wait out the batching window or cancel the batch mid-transaction
+    await asyncio.wait_for(batcher.stop(), timeout=0.5)
+    assert all(f.done() and f.exception() is None for f in pending)
+
+    with pytest.raises(HTTPException) as exc:
+        await batcher.submit(order_for(product.id, 1))
+    assert exc.value.status_code == 503
+
+    await db_session.refresh(product)
+    assert product.stock_quantity == 7
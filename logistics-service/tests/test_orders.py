@@ -1,6 +1,13 @@
 import pytest
 import uuid
+import csv
+import io
+import json
+from datetime import datetime, timezone
 from httpx import AsyncClient
+from sqlalchemy import update
+from src.logistics.core.config import settings
+from src.logistics.models.order import Order
 from src.logistics.models.product import Product
 from src.logistics.schemas.enums import OrderStatus  # <--- Import Enum
 
@@ -70,4 +77,227 @@ async def test_create_order_product_not_found(client: AsyncClient, db_session):
     response = await client.post("/api/v1/orders/", json=order_data)
     
     assert response.status_code == 404
-    assert "not found" in response.json()["detail"].lower()
\ No newline at end of file
+    assert "not found" in response.json()["detail"].lower()
+
+
+@pytest.mark.asyncio
+async def test_create_order_partial_shortage_rolls_back(client: AsyncClient, db_session):
+    """A shortage on one product reports it by name and leaves every other product untouched."""
+    # 1. Setup
+    plenty = Product(name="Plenty Item", price=10.00, stock_quantity=10)
+    scarce = Product(name="Scarce Item", price=20.00, stock_quantity=1)
+    db_session.add_all([plenty, scarce])
+    await db_session.flush()
+
+    # 2. Action
+    order_data = {
+        "items": [
+            {"product_id": str(plenty.id), "quantity": 3},
+            {"product_id": str(scarce.id), "quantity": 2}
+        ]
+    }
+    response = await client.post("/api/v1/orders/", json=order_data)
+
+    # 3. Assertions
+    assert response.status_code == 400
+    detail = response.json()["detail"]
+    assert "Scarce Item" in detail
+    assert "Plenty Item" not in detail
+
+    await db_session.refresh(plenty)
+    await db_session.refresh(scarce)
+    assert plenty.stock_quantity == 10
+    assert scarce.stock_quantity == 1
+
+@pytest.mark.asyncio
+async def test_create_orders_batch_partial_failure(client: AsyncClient, db_session):
+    """One order running out of stock does not fail the rest of the batch."""
+    # 1. Setup
+    product = Product(name="Batch Item", price=15.00, stock_quantity=5)
+    db_session.add(product)
+    await db_session.flush()
+
+    # 2. Action: the second order exceeds what is left after the first
+    batch = {
+        "orders": [
+            {"items": [{"product_id": str(product.id), "quantity": 3}]},
+            {"items": [{"product_id": str(product.id), "quantity": 3}]},
+            {"items": [{"product_id": str(uuid.uuid4()), "quantity": 1}]},
+            {"items": [{"product_id": str(product.id), "quantity": 2}]},
+        ]
+    }
+    response = await client.post("/api/v1/orders/batch", json=batch)
+
+    # 3. Assertions
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert [r["status_code"] for r in results] == [201, 400, 404, 201]
+    assert results[0]["order"]["items"][0]["quantity"] == 3
+    assert float(results[3]["order"]["items"][0]["price_at_order"]) == 15.00
+
+    created = await client.get(f"/api/v1/orders/{results[0]['order']['id']}")
+    assert created.status_code == 200
+
+    # 4. stock check
+    await db_session.refresh(product)
+    assert product.stock_quantity == 0
+
+@pytest.mark.asyncio
+async def test_export_orders_ndjson_and_csv(client: AsyncClient, db_session):
+    """Export streams one JSON object per order, or one CSV row per item."""
+    # 1. Setup
+    first = Product(name="Export A", price=4.00, stock_quantity=10)
+    second = Product(name="Export B", price=6.00, stock_quantity=10)
+    db_session.add_all([first, second])
+    await db_session.flush()
+
+    order_data = {
+        "items": [
+            {"product_id": str(first.id), "quantity": 1},
+            {"product_id": str(second.id), "quantity": 2}
+        ]
+    }
+    created = (await client.post("/api/v1/orders/", json=order_data)).json()
+
+    # 2. NDJSON
+    response = await client.get("/api/v1/orders/export", params={"format": "ndjson", "status": "pending"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    orders = [json.loads(line) for line in response.text.splitlines()]
+    exported = next(o for o in orders if o["id"] == created["id"])
+    assert exported["status"] == "pending"
+    assert sorted(i["quantity"] for i in exported["items"]) == [1, 2]
+
+    # 3. CSV
+    response = await client.get("/api/v1/orders/export", params={"format": "csv"})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len([r for r in rows if r["order_id"] == created["id"]]) == 2
+
+    # 4. Filters exclude it
+    response = await client.get("/api/v1/orders/export", params={"status": "shipped"})
+    assert created["id"] not in response.text
+
+@pytest.mark.asyncio
+async def test_update_status_transitions(client: AsyncClient, db_session):
+    """Status changes return the full order; shipping a cancelled order is rejected."""
+    # 1. Setup
+    product = Product(name="Status Item", price=8.00, stock_quantity=10)
+    db_session.add(product)
+    await db_session.flush()
+    created = (await client.post(
+        "/api/v1/orders/", json={"items": [{"product_id": str(product.id), "quantity": 2}]}
+    )).json()
+    assert created["created_at"] and created["items"][0]["id"]
+
+    # 2. Allowed transition
+    response = await client.patch(f"/api/v1/orders/{created['id']}/status", json={"status": "cancelled"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == OrderStatus.CANCELLED
+    assert data["created_at"] == created["created_at"]
+    assert data["items"] == created["items"]
+
+    # 3. Rejected transition leaves the order untouched
+    response = await client.patch(f"/api/v1/orders/{created['id']}/status", json={"status": "shipped"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cannot ship a cancelled order."
+    fetched = await client.get(f"/api/v1/orders/{created['id']}")
+    assert fetched.json()["status"] == OrderStatus.CANCELLED
+
+    # 4. Unknown order
+    response = await client.patch(f"/api/v1/orders/{uuid.uuid4()}/status", json={"status": "shipped"})
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_get_order_json_projection_matches_orm_path(client: AsyncClient, db_session, monkeypatch):
+    """The single-query json_agg read returns the same document as the ORM + Pydantic path."""
+    # 1. Setup
+    first = Product(name="Projection A", price=2.50, stock_quantity=10)
+    second = Product(name="Projection B", price=100.00, stock_quantity=10)
+    db_session.add_all([first, second])
+    await db_session.flush()
+    order_data = {
+        "items": [
+            {"product_id": str(first.id), "quantity": 1},
+            {"product_id": str(second.id), "quantity": 3}
+        ]
+    }
+    order_id = (await client.post("/api/v1/orders/", json=order_data)).json()["id"]
+
+    # 2. Both paths
+    orm_response = await client.get(f"/api/v1/orders/{order_id}")
+    monkeypatch.setattr(settings, "ORDER_READ_JSON_PROJECTION", True)
+    json_response = await client.get(f"/api/v1/orders/{order_id}")
+
+    # 3. Assertions
+    assert json_response.status_code == 200
+    assert json_response.headers["content-type"] == "application/json"
+    orm_order, json_order = orm_response.json(), json_response.json()
+    orm_order["items"].sort(key=lambda i: i["id"])
+    assert json_order == orm_order
+    assert list(json_order) == ["id", "status", "created_at", "items"]
+
+    missing = await client.get(f"/api/v1/orders/{uuid.uuid4()}")
+    assert missing.status_code == 404
+
+@pytest.mark.asyncio
+async def test_get_order_json_projection_whole_second_timestamp(client: AsyncClient, db_session, monkeypatch):
+    """Pydantic leaves out a zero fraction of a second; the projection must as well."""
+    product = Product(name="Projection Clock", price=1.00, stock_quantity=5)
+    db_session.add(product)
+    await db_session.flush()
+    order_id = (await client.post("/api/v1/orders/", json={
+        "items": [{"product_id": str(product.id), "quantity": 1}]
+    })).json()["id"]
+    await db_session.execute(
+        update(Order).where(Order.id == uuid.UUID(order_id)).values(created_at=datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc))
+    )
+
+    orm_order = (await client.get(f"/api/v1/orders/{order_id}")).json()
+    monkeypatch.setattr(settings, "ORDER_READ_JSON_PROJECTION", True)
+    json_order = (await client.get(f"/api/v1/orders/{order_id}")).json()
+
+    assert orm_order["created_at"] == "2026-01-02T03:04:05Z"
+    assert json_order == orm_order
+
+@pytest.mark.asyncio
+async def test_list_orders_filters_and_pagination(client: AsyncClient, db_session):
+    """Listing filters by status and product, pages newest first, and embeds items on request."""
+    # 1. Setup: three orders for one product, one for another; the oldest gets shipped
+    tracked = Product(name="Listed Item", price=3.00, stock_quantity=10)
+    other = Product(name="Unlisted Item", price=3.00, stock_quantity=10)
+    db_session.add_all([tracked, other])
+    await db_session.flush()
+
+    ids = []
+    for product in (tracked, tracked, tracked, other):
+        response = await client.post(
+            "/api/v1/orders/", json={"items": [{"product_id": str(product.id), "quantity": 1}]}
+        )
+        ids.append(response.json()["id"])
+    await client.patch(f"/api/v1/orders/{ids[0]}/status", json={"status": "shipped"})
+
+    # 2. Product filter, paged one at a time, newest first
+    seen = []
+    params = {"product_id": str(tracked.id), "limit": 1}
+    while True:
+        page = (await client.get("/api/v1/orders/", params=params)).json()
+        seen += [order["id"] for order in page["items"]]
+        assert all(order["items"] is None for order in page["items"])
+        if not page["next_cursor"]:
+            break
+        params["cursor"] = page["next_cursor"]
+    assert seen == ids[2::-1]
+
+    # 3. Status + product filters with items embedded
+    response = await client.get("/api/v1/orders/", params={
+        "product_id": str(tracked.id), "status": "pending", "include_items": "true",
+    })
+    orders = response.json()["items"]
+    assert [order["id"] for order in orders] == [ids[2], ids[1]]
+    assert orders[0]["items"][0]["product_id"] == str(tracked.id)
+
+    # 4. Date range excludes everything
+    response = await client.get("/api/v1/orders/", params={"created_to": "2000-01-01T00:00:00Z"})
+    assert response.json() == {"items": [], "next_cursor": None}
@@ -0,0 +1,95 @@
+import pytest
+import uuid
+from datetime import datetime, timezone
+from httpx import AsyncClient
+from sqlalchemy import delete, func, select, update
+from src.logistics.models.product import Product, ProductChange
+from src.logistics.services.product_service import ProductService
+
+async def latest_cursor(db_session_factory) -> str:
+    """Skips changes committed by earlier tests."""
+    async with db_session_factory() as session:
+        feed = await ProductService(session).list_changes(limit=1000)
+        while feed.has_more:
+            feed = await ProductService(session).list_changes(since=feed.next_cursor, limit=1000)
+        return feed.next_cursor
+
+@pytest.fixture
+async def committed_products(db_session_factory):
+    """Ids of products created by a test with committed transactions; deleted afterwards."""
+    ids = []
+    yield ids
+    async with db_session_factory() as session, session.begin():
+        await session.execute(delete(ProductChange).where(ProductChange.product_id.in_(ids)))
+        await session.execute(delete(Product).where(Product.id.in_(ids)))
+
+@pytest.mark.asyncio
+async def test_feed_returns_catalog_changes_in_commit_order(db_session_factory, committed_products):
+    since = await latest_cursor(db_session_factory)
+    async with db_session_factory() as session, session.begin():
+        lamp = Product(name="Feed Lamp", price=20.00, stock_quantity=5)
+        desk = Product(name="Feed Desk", price=90.00, stock_quantity=5)
+        session.add_all([lamp, desk])
+    committed_products += [lamp.id, desk.id]
+    async with db_session_factory() as session, session.begin():
+        await session.execute(update(Product).where(Product.id == lamp.id).values(price=25.00))
+        # Stock changes alone are not part of the feed
+        await session.execute(update(Product).where(Product.id == desk.id).values(stock_quantity=1))
+    async with db_session_factory() as session, session.begin():
+        await session.execute(
+            update(Product).where(Product.id == desk.id).values(deleted_at=datetime.now(timezone.utc))
+        )
+
+    async with db_session_factory() as session:
+        service = ProductService(session)
+        first = await service.list_changes(since=since, limit=2)
+        rest = await service.list_changes(since=first.next_cursor, limit=10)
+
+    assert first.has_more and not rest.has_more
+    changes = [(c.product.id, c.operation.value) for c in first.items + rest.items]
+    assert sorted(changes[:2]) == sorted([(lamp.id, "insert"), (desk.id, "insert")])
+    assert changes[2:] == [(lamp.id, "update"), (desk.id, "delete")]
+    assert rest.items[0].product.price == 25
+    # Nothing new: the cursor stays put
+    async with db_session_factory() as session:
+        idle = await ProductService(session).list_changes(since=rest.next_cursor)
+    assert idle.items == [] and idle.next_cursor == rest.next_cursor
+
+@pytest.mark.asyncio
+async def test_changes_of_open_transactions_are_held_back(db_session_factory, committed_products):
+    since = await latest_cursor(db_session_factory)
+    async with db_session_factory() as writer:
+        writer.add(Product(name="Uncommitted Feed Item", price=1.00, stock_quantity=1))
+        await writer.flush()
+        product_id = await writer.scalar(select(Product.id).where(Product.name == "Uncommitted Feed Item"))
+        committed_products.append(product_id)
+
+        # A later transaction commits first; it must not move the cursor past the open one
+        async with db_session_factory() as other, other.begin():
+            later = Product(name="Committed Feed Item", price=1.00, stock_quantity=1)
+            other.add(later)
+        committed_products.append(later.id)
+        async with db_session_factory() as session:
+            held = await ProductService(session).list_changes(since=since)
+        assert held.items == []
+
+        await writer.commit()
+
+    async with db_session_factory() as session:
+        feed = await ProductService(session).list_changes(since=held.next_cursor)
+    assert [c.product.id for c in feed.items] == [product_id, later.id]
+
+@pytest.mark.asyncio
+async def test_changes_endpoint_rejects_foreign_cursor(client: AsyncClient):
+    response = await client.get("/api/v1/products/changes", params={"since": "not-a-cursor"})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_expired_changes_are_swept(db_session):
+    db_session.add(ProductChange(
+        txid=1, product_id=uuid.uuid4(), operation="update", changed_at=datetime(2000, 1, 1, tzinfo=timezone.utc)
+    ))
+    await db_session.flush()
+
+    assert await ProductService(db_session).expire_changes(limit=10) == 1
+    assert await db_session.scalar(select(func.count()).select_from(ProductChange).where(ProductChange.txid == 1)) == 0
@@ -0,0 +1,63 @@
+import pytest
+import uuid
+from httpx import AsyncClient
+from datetime import datetime, timezone
+from src.logistics.models.product import Product
+from src.logistics.repositories.product_repository import ProductRepository
+
+@pytest.mark.asyncio
+async def test_lookup_keeps_request_order_and_reports_missing(client: AsyncClient, db_session):
+    lamp = Product(name="Lookup Lamp", price=20.00, stock_quantity=4)
+    desk = Product(name="Lookup Desk", price=90.00, stock_quantity=2)
+    gone = Product(name="Lookup Gone", price=5.00, stock_quantity=1, deleted_at=datetime.now(timezone.utc))
+    db_session.add_all([lamp, desk, gone])
+    await db_session.flush()
+    unknown = uuid.uuid4()
+
+    response = await client.post("/api/v1/products/lookup", json={
+        "ids": [str(desk.id), str(unknown), str(lamp.id), str(desk.id), str(gone.id)],
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [str(desk.id), str(lamp.id)]
+    assert body["items"][0]["name"] == "Lookup Desk" and body["items"][0]["stock_quantity"] == 2
+    assert body["missing"] == [str(unknown), str(gone.id)]
+
+@pytest.mark.asyncio
+async def test_lookup_projects_requested_fields(client: AsyncClient, db_session):
+    product = Product(name="Projected Chair", price=60.00, stock_quantity=7)
+    db_session.add(product)
+    await db_session.flush()
+    await client.put(f"/api/v1/products/{product.id}/stock-shards", json={"shard_count": 2})
+
+    response = await client.post("/api/v1/products/lookup", json={
+        "ids": [str(product.id)], "fields": ["stock_quantity", "price", "stock_quantity", "id"],
+    })
+
+    assert response.json()["items"] == [{"id": str(product.id), "price": "60.00", "stock_quantity": 7}]
+
+    # Each column is read once, however often it was asked for
+    [row] = await ProductRepository(Product, db_session).get_many_projected(
+        [product.id], ["stock_quantity", "price", "stock_quantity", "id"]
+    )
+    assert row._fields == ("id", "stock_quantity", "price")
+
+@pytest.mark.asyncio
+async def test_lookup_rejects_unknown_field(client: AsyncClient):
+    response = await client.post("/api/v1/products/lookup", json={"ids": [str(uuid.uuid4())], "fields": ["cost"]})
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_get_product_by_id(client: AsyncClient, db_session):
+    product = Product(name="Single Shelf", price=35.00, stock_quantity=3)
+    db_session.add(product)
+    await db_session.flush()
+
+    response = await client.get(f"/api/v1/products/{product.id}")
+    assert response.status_code == 200
+    assert response.json()["name"] == "Single Shelf"
+
+    assert (await client.get(f"/api/v1/products/{uuid.uuid4()}")).status_code == 404
+    # Fixed paths are not shadowed by the id route
+    assert (await client.get("/api/v1/products/search", params={"q": "Single"})).status_code == 200
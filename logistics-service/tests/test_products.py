@@ -0,0 +1,235 @@
+import pytest
+import uuid
+from httpx import AsyncClient
+from sqlalchemy import select
+from src.logistics.core.cache import InMemoryLRUCache
+from src.logistics.core.pagination import encode_cursor
+from src.logistics.models.product import Product
+from src.logistics.schemas.pagination import Page
+from src.logistics.schemas.product import ProductRead
+from src.logistics.services.product_service import ProductService
+from src.logistics.services.product_cache import ProductCache, product_cache
+from src.logistics.services.product_import import MAX_CSV_RECORD_CHARS
+
+@pytest.mark.asyncio
+async def test_list_products_cursor_pagination(client: AsyncClient, db_session):
+    """Walking next_cursor visits every product exactly once, in (created_at, id) order."""
+    # 1. Setup: same transaction, so created_at ties and id breaks them
+    products = [Product(name=f"Paged {i}", price=10.00, stock_quantity=1) for i in range(5)]
+    db_session.add_all(products)
+    await db_session.flush()
+
+    # 2. Action
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/api/v1/products/page", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    # 3. Assertions
+    expected = [str(p.id) for p in sorted(products, key=lambda p: p.id)]
+    assert [i for i in seen if i in expected] == expected
+    assert len(seen) == len(set(seen))
+
+@pytest.mark.asyncio
+async def test_list_products_returns_a_bare_array(client: AsyncClient, db_session):
+    """The original listing keeps its array shape and agrees with the keyset pages."""
+    db_session.add_all([Product(name=f"Offset {i}", price=5.00, stock_quantity=1) for i in range(3)])
+    await db_session.flush()
+
+    first = (await client.get("/api/v1/products/page", params={"limit": 3})).json()
+    plain = (await client.get("/api/v1/products/", params={"limit": 3})).json()
+    skipped = (await client.get("/api/v1/products/", params={"skip": 1, "limit": 2})).json()
+
+    assert plain == first["items"]
+    assert [p["id"] for p in skipped] == [p["id"] for p in first["items"][1:3]]
+
+@pytest.mark.asyncio
+async def test_list_products_invalid_cursor(client: AsyncClient):
+    response = await client.get("/api/v1/products/page", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_import_products_csv_upsert(client: AsyncClient, db_session):
+    """CSV import inserts new names, updates changed ones and skips identical rows."""
+    # 1. Setup
+    existing = Product(name="Import Existing", price=10.00, stock_quantity=1)
+    same = Product(name="Import Same", price=3.00, stock_quantity=7)
+    db_session.add_all([existing, same])
+    await db_session.flush()
+
+    # 2. Action: the last row for a repeated name wins
+    body = (
+        "name,price,stock_quantity\n"
+        "Import Existing,11.50,4\n"
+        "Import Same,3.00,7\n"
+        "Import New,2.25,9\n"
+        "Import New,2.50,8\n"
+    )
+    response = await client.post("/api/v1/products/import", params={"format": "csv"}, content=body)
+
+    # 3. Assertions
+    assert response.status_code == 200
+    assert response.json() == {"received": 4, "inserted": 1, "updated": 1, "unchanged": 1}
+
+    await db_session.refresh(existing)
+    assert float(existing.price) == 11.50
+    assert existing.stock_quantity == 4
+
+    result = await db_session.execute(select(Product).where(Product.name == "Import New"))
+    new_product = result.scalar_one()
+    assert float(new_product.price) == 2.50
+    assert new_product.stock_quantity == 8
+
+@pytest.mark.asyncio
+async def test_import_products_csv_quoted_line_breaks(client: AsyncClient, db_session):
+    """Quoted fields may span lines and contain quotes; an unterminated quote is rejected."""
+    body = (
+        "name,price,stock_quantity\r\n"
+        '"Import Two-Line\nLamp",4.00,2\r\n'
+        '"Import ""Quoted"" Desk",9.00,1\r\n'
+    )
+    response = await client.post("/api/v1/products/import", params={"format": "csv"}, content=body)
+
+    assert response.status_code == 200
+    assert response.json()["received"] == 2
+    names = await db_session.scalars(select(Product.name).where(Product.name.like("Import %")))
+    assert sorted(names) == ['Import "Quoted" Desk', "Import Two-Line\nLamp"]
+
+    response = await client.post(
+        "/api/v1/products/import", params={"format": "csv"},
+        content='name,price,stock_quantity\n"Import Broken,1.00,1\nImport Next,1.00,1\n',
+    )
+    assert response.status_code == 422
+    assert "line 2" in response.json()["detail"]
+
+@pytest.mark.asyncio
+async def test_import_rejects_overlong_lines(client: AsyncClient):
+    """A line without a newline is not buffered past the record limit."""
+    async def body():
+        yield b'{"name": "Import Endless", "price": "1.00", "stock_quantity": 1}\n'
+        for _ in range(MAX_CSV_RECORD_CHARS // 1024 + 1):
+            yield b"x" * 1024
+
+    response = await client.post("/api/v1/products/import", params={"format": "ndjson"}, content=body())
+
+    assert response.status_code == 422
+    assert "Line 2" in response.json()["detail"]
+
+@pytest.mark.asyncio
+async def test_import_products_ndjson_invalid_row_aborts(client: AsyncClient, db_session):
+    """A bad row rejects the whole import."""
+    body = (
+        '{"name": "Import Valid", "price": "1.00", "stock_quantity": 1}\n'
+        '{"name": "Import Invalid", "price": "-1.00", "stock_quantity": 1}\n'
+    )
+    response = await client.post("/api/v1/products/import", params={"format": "ndjson"}, content=body)
+
+    assert response.status_code == 422
+    assert "line 2" in response.json()["detail"]
+
+    result = await db_session.execute(select(Product).where(Product.name == "Import Valid"))
+    assert result.scalar_one_or_none() is None
+
+@pytest.mark.asyncio
+async def test_product_cache_hits_and_order_invalidation(client: AsyncClient, db_session):
+    """Reads are served from cache until an order changes the product's stock."""
+    # 1. Setup
+    product = Product(name="Cached Item", price=9.00, stock_quantity=5)
+    db_session.add(product)
+    await db_session.flush()
+    service = ProductService(db_session)
+
+    # 2. Second read is a hit
+    hits_before = product_cache.hits
+    first = await service.get_product_by_id(product.id)
+    second = await service.get_product_by_id(product.id)
+    assert second is first
+    assert product_cache.hits == hits_before + 1
+
+    # 3. An order invalidates the entry
+    order_data = {"items": [{"product_id": str(product.id), "quantity": 2}]}
+    response = await client.post("/api/v1/orders/", json=order_data)
+    assert response.status_code == 201
+
+    refreshed = await service.get_product_by_id(product.id)
+    assert refreshed.stock_quantity == 3
+
+    stats = (await client.get("/health/cache")).json()
+    assert stats["hits"] >= 1 and stats["misses"] >= 2
+
+def test_invalidation_retires_listing_pages_for_every_view():
+    """Pages are keyed by generation, so a write through the bypass view retires them too."""
+    cache = ProductCache(InMemoryLRUCache())
+    bypass = ProductCache(cache.backend, enabled=False, generation=cache.generation)
+    page = Page[ProductRead](items=[], next_cursor=None)
+    cache.set_page("None:None:10", page)
+    assert cache.get_page("None:None:10") is page
+
+    bypass.invalidate([])
+    assert cache.get_page("None:None:10") is None
+
+@pytest.mark.asyncio
+async def test_search_products_ranking_and_pagination(client: AsyncClient, db_session):
+    """Prefix matches rank before word and fuzzy matches; cursors page through all hits."""
+    # 1. Setup
+    db_session.add_all([
+        Product(name="Zephyr Blender", price=1.00, stock_quantity=1),
+        Product(name="Blender Pro", price=1.00, stock_quantity=1),
+        Product(name="Mini Blendar", price=1.00, stock_quantity=1),
+        Product(name="Toaster", price=1.00, stock_quantity=1),
+    ])
+    await db_session.flush()
+
+    # 2. Ranking
+    response = await client.get("/api/v1/products/search", params={"q": "blender"})
+    assert response.status_code == 200
+    names = [p["name"] for p in response.json()["items"]]
+    assert names == ["Blender Pro", "Zephyr Blender", "Mini Blendar"]
+
+    # 3. Pagination yields the same hits in the same order
+    paged, cursor = [], None
+    while True:
+        params = {"q": "blender", "limit": 1}
+        if cursor:
+            params["cursor"] = cursor
+        page = (await client.get("/api/v1/products/search", params=params)).json()
+        paged.extend(p["name"] for p in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert paged == names
+
+@pytest.mark.asyncio
+async def test_search_products_case_and_foreign_cursors(client: AsyncClient, db_session):
+    db_session.add(Product(name="Kettle Deluxe", price=1.00, stock_quantity=1))
+    await db_session.flush()
+
+    response = await client.get("/api/v1/products/search", params={"q": "KETTLE D"})
+    assert [p["name"] for p in response.json()["items"]] == ["Kettle Deluxe"]
+
+    # A tier or key type this service never issues is an invalid cursor, not a server error
+    for cursor in (encode_cursor("substring", None, None, None), encode_cursor("fuzzy", None, "high", str(uuid.uuid4()))):
+        response = await client.get("/api/v1/products/search", params={"q": "kettle", "cursor": cursor})
+        assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_search_products_escapes_wildcards(client: AsyncClient, db_session):
+    db_session.add_all([
+        Product(name="100% Cotton Tee", price=1.00, stock_quantity=1),
+        Product(name="1000 Piece Puzzle", price=1.00, stock_quantity=1),
+    ])
+    await db_session.flush()
+
+    response = await client.get("/api/v1/products/search", params={"q": "100%"})
+    names = [p["name"] for p in response.json()["items"]]
+    assert names[0] == "100% Cotton Tee"
@@ -0,0 +1,118 @@
+import pytest
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from sqlalchemy import event, insert, text
+from src.logistics.models.order import Order, OrderItem
+from src.logistics.models.product import Product
+from src.logistics.repositories.order_repository import OrderRepository
+from src.logistics.repositories.product_repository import ProductRepository
+from src.logistics.schemas.enums import OrderStatus
+
+# The planner needs realistic statistics to choose between indexes that share the
+# `deleted_at IS NULL` predicate, so each test seeds rows and runs ANALYZE inside its
+# own (rolled back) transaction. Sequential scans are disabled on top of that.
+
+@asynccontextmanager
+async def captured_statements(db_engine):
+    """Records every (statement, parameters) pair sent to the database."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", capture)
+
+async def explain(db_session, statement, parameters) -> str:
+    conn = await db_session.connection()
+    result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+    return "\n".join(row[0] for row in result)
+
+async def seed(db_session, products: int = 2000, orders: int = 500) -> None:
+    now = datetime.now(timezone.utc)
+    product_ids = [uuid.uuid4() for _ in range(products)]
+    await db_session.execute(insert(Product), [
+        {"id": pid, "name": f"Plan Product {i}", "price": 1, "stock_quantity": 1}
+        for i, pid in enumerate(product_ids)
+    ])
+    order_ids = [uuid.uuid4() for _ in range(orders)]
+    # Mostly shipped history with a small pending backlog, like production
+    await db_session.execute(insert(Order), [
+        {"id": oid, "status": OrderStatus.PENDING if i % 20 == 0 else OrderStatus.SHIPPED}
+        for i, oid in enumerate(order_ids)
+    ])
+    await db_session.execute(insert(OrderItem), [
+        {"order_id": oid, "product_id": product_ids[i], "quantity": 1, "price_at_order": 1}
+        for i, oid in enumerate(order_ids)
+    ])
+    # Soft-deleted history that the partial indexes leave out
+    await db_session.execute(
+        text("UPDATE products SET deleted_at = :now WHERE name LIKE 'Plan Product 1%'"), {"now": now}
+    )
+    await db_session.execute(text("ANALYZE products, orders, order_items"))
+
+async def plans_for(db_session, db_engine, call) -> list[str]:
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    async with captured_statements(db_engine) as statements:
+        await call()
+    return [await explain(db_session, stmt, params) for stmt, params in statements]
+
+@pytest.mark.asyncio
+async def test_product_queries_use_partial_indexes(db_session, db_engine):
+    await seed(db_session)
+    repository = ProductRepository(Product, db_session)
+    cursor = (datetime.now(timezone.utc), uuid.uuid4())
+
+    [first_page] = await plans_for(db_session, db_engine, lambda: repository.list_after(limit=10))
+    assert "ix_products_active_created_at_id" in first_page
+
+    [next_page] = await plans_for(db_session, db_engine, lambda: repository.list_after(after=cursor, limit=10))
+    assert "ix_products_active_created_at_id" in next_page
+
+    [by_name] = await plans_for(db_session, db_engine, lambda: repository.get_by_name("Widget"))
+    assert "ix_products_active_name" in by_name
+
+    [by_id] = await plans_for(db_session, db_engine, lambda: repository.get(uuid.uuid4()))
+    assert "Index Cond: (id = " in by_id
+
+    [locked] = await plans_for(db_session, db_engine, lambda: repository.get_many_for_update([uuid.uuid4()]))
+    assert "Index Cond: (id = " in locked
+
+@pytest.mark.asyncio
+async def test_order_queries_use_partial_indexes(db_session, db_engine):
+    await seed(db_session)
+    # One order so selectinload issues its items query as well
+    order = Order()
+    db_session.add(order)
+    await db_session.flush()
+    repository = OrderRepository(Order, db_session)
+    cursor = (datetime.now(timezone.utc), uuid.uuid4())
+
+    plans = await plans_for(db_session, db_engine, lambda: repository.list_with_items(after=cursor, limit=10))
+    assert "ix_orders_active_created_at_id" in plans[0]
+    assert "ix_order_items_order_id" in plans[1]
+
+    plans = await plans_for(db_session, db_engine, lambda: repository.get_with_items(order.id))
+    assert "Index Cond: (id = " in plans[0]
+    assert "ix_order_items_order_id" in plans[1]
+
+@pytest.mark.asyncio
+async def test_order_listing_filters_use_composite_indexes(db_session, db_engine):
+    await seed(db_session)
+    repository = OrderRepository(Order, db_session)
+    since = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+    [by_status] = await plans_for(db_session, db_engine, lambda: repository.list_filtered(
+        status=OrderStatus.PENDING, created_from=since, limit=10
+    ))
+    assert "ix_orders_active_status_created_at_id" in by_status
+    assert "Sort" not in by_status
+
+    [by_product] = await plans_for(db_session, db_engine, lambda: repository.list_filtered(
+        product_id=uuid.uuid4(), limit=10
+    ))
+    assert "ix_order_items_product_id_order_id" in by_product
@@ -0,0 +1,155 @@
+import asyncio
+import pytest
+import uuid
+from datetime import datetime, timezone
+from httpx import AsyncClient
+from sqlalchemy import delete, select, update
+from src.logistics.models.order import Order, OrderItem
+from src.logistics.models.product import Product
+from src.logistics.models.reservation import StockReservation, StockReservationItem
+from src.logistics.schemas.order import OrderCreate
+from src.logistics.schemas.reservation import ReservationCreate
+from src.logistics.services.order_service import OrderService
+from src.logistics.services.reservation_service import ReservationService
+
+async def reserve(client: AsyncClient, *items, **extra) -> dict:
+    response = await client.post("/api/v1/reservations/", json={
+        "items": [{"product_id": str(product.id), "quantity": quantity} for product, quantity in items], **extra
+    })
+    assert response.status_code == 201
+    return response.json()
+
+async def stock_of(client: AsyncClient, product: Product) -> tuple:
+    body = (await client.get(f"/api/v1/products/{product.id}/stock")).json()
+    return body["available"], body["reserved"]
+
+async def expire(db_session, reservation_id) -> None:
+    await db_session.execute(
+        update(StockReservation).where(StockReservation.id == reservation_id)
+        .values(expires_at=datetime(2000, 1, 1, tzinfo=timezone.utc))
+    )
+
+@pytest.mark.asyncio
+async def test_reservation_holds_stock_until_it_becomes_an_order(client: AsyncClient, db_session):
+    product = Product(name="Reserved Headphones", price=70.00, stock_quantity=5)
+    db_session.add(product)
+    await db_session.flush()
+
+    reservation = await reserve(client, (product, 3))
+    assert await stock_of(client, product) == (2, 3)
+    # The held units are gone for everyone else
+    response = await client.post("/api/v1/orders/", json={"items": [{"product_id": str(product.id), "quantity": 3}]})
+    assert response.status_code == 400
+
+    response = await client.post(f"/api/v1/reservations/{reservation['id']}/order")
+    assert response.status_code == 201
+    order = response.json()
+    assert [(i["product_id"], i["quantity"], i["price_at_order"]) for i in order["items"]] == [(str(product.id), 3, "70.00")]
+    assert (await client.get(f"/api/v1/orders/{order['id']}")).json()["status"] == "pending"
+    assert await stock_of(client, product) == (2, 0)
+
+    response = await client.post(f"/api/v1/reservations/{reservation['id']}/order")
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_reservation_fails_up_front_on_shortage(client: AsyncClient, db_session):
+    product = Product(name="Scarce Console", price=400.00, stock_quantity=1)
+    db_session.add(product)
+    await db_session.flush()
+
+    response = await client.post("/api/v1/reservations/", json={
+        "items": [{"product_id": str(product.id), "quantity": 2}]
+    })
+    assert response.status_code == 400
+    assert await stock_of(client, product) == (1, 0)
+
+    response = await client.post("/api/v1/reservations/", json={
+        "items": [{"product_id": str(product.id), "quantity": 1}], "ttl_seconds": 10 ** 6
+    })
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_released_reservation_returns_stock(client: AsyncClient, db_session):
+    product = Product(name="Abandoned Cart Mug", price=8.00, stock_quantity=4)
+    db_session.add(product)
+    await db_session.flush()
+    reservation = await reserve(client, (product, 4))
+
+    assert (await client.delete(f"/api/v1/reservations/{reservation['id']}")).status_code == 204
+    assert await stock_of(client, product) == (4, 0)
+    assert (await client.delete(f"/api/v1/reservations/{reservation['id']}")).status_code == 404
+
+@pytest.mark.asyncio
+async def test_expired_reservations_are_swept_in_batches(client: AsyncClient, db_session):
+    plain = Product(name="Expiring Kettle", price=25.00, stock_quantity=6)
+    hot = Product(name="Expiring Hot Item", price=5.00, stock_quantity=8)
+    db_session.add_all([plain, hot])
+    await db_session.flush()
+    await client.put(f"/api/v1/products/{hot.id}/stock-shards", json={"shard_count": 4})
+    first = await reserve(client, (plain, 2), (hot, 3))
+    second = await reserve(client, (plain, 1))
+    await expire(db_session, first["id"])
+    await expire(db_session, second["id"])
+
+    response = await client.post(f"/api/v1/reservations/{first['id']}/order")
+    assert response.status_code == 410
+    assert await stock_of(client, plain) == (3, 3)
+
+    service = ReservationService(db_session)
+    assert await service.expire_reservations(limit=1) == 1
+    assert await service.expire_reservations(limit=1) == 1
+    assert await service.expire_reservations(limit=1) == 0
+    assert await stock_of(client, plain) == (6, 0)
+    assert await stock_of(client, hot) == (8, 0)
+
+@pytest.fixture
+async def committed_product(db_session_factory):
+    """A product created with a committed transaction; it and its orders are deleted afterwards."""
+    async with db_session_factory() as session, session.begin():
+        product = Product(name="Contended Checkout Item", price=10.00, stock_quantity=10)
+        session.add(product)
+    yield product
+    async with db_session_factory() as session, session.begin():
+        order_ids = select(OrderItem.order_id).where(OrderItem.product_id == product.id)
+        await session.execute(delete(Order).where(Order.id.in_(order_ids.scalar_subquery())))
+        reservation_ids = select(StockReservationItem.reservation_id).where(
+            StockReservationItem.product_id == product.id
+        )
+        await session.execute(delete(StockReservation).where(StockReservation.id.in_(reservation_ids.scalar_subquery())))
+        await session.execute(delete(Product).where(Product.id == product.id))
+
+@pytest.mark.asyncio
+async def test_checkout_does_not_wait_for_orders_locking_the_product(db_session_factory, committed_product):
+    async with db_session_factory() as session, session.begin():
+        reservation = await ReservationService(session).create_reservation(
+            ReservationCreate(items=[{"product_id": committed_product.id, "quantity": 2}])
+        )
+
+    async with db_session_factory() as busy, db_session_factory() as checkout:
+        async with busy.begin():
+            # A concurrent order holds the product row lock until it commits
+            await OrderService(busy).create_order(
+                OrderCreate(items=[{"product_id": committed_product.id, "quantity": 1}])
+            )
+            async with checkout.begin():
+                order = await asyncio.wait_for(ReservationService(checkout).create_order(reservation.id), 2)
+    assert [item.quantity for item in order.items] == [2]
+
+@pytest.mark.asyncio
+async def test_sweeper_skips_reservations_being_checked_out(db_session_factory, committed_product):
+    async with db_session_factory() as session, session.begin():
+        reservation = await ReservationService(session).create_reservation(
+            ReservationCreate(items=[{"product_id": committed_product.id, "quantity": 2}])
+        )
+        await expire(session, reservation.id)
+
+    async with db_session_factory() as holder, db_session_factory() as sweeper:
+        async with holder.begin():
+            await holder.execute(
+                select(StockReservation.id).where(StockReservation.id == reservation.id).with_for_update()
+            )
+            async with sweeper.begin():
+                released = await asyncio.wait_for(ReservationService(sweeper).expire_reservations(limit=10), 2)
+            assert released == 0
+        async with sweeper.begin():
+            assert await ReservationService(sweeper).expire_reservations(limit=10) == 1
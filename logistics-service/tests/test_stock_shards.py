@@ -0,0 +1,92 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from src.logistics.models.product import Product, ProductStockShard
+from src.logistics.schemas.order import OrderCreate
+from src.logistics.services.order_service import OrderService
+
+async def shard_quantities(db_session, product_id) -> list[int]:
+    result = await db_session.execute(
+        select(ProductStockShard.quantity)
+        .where(ProductStockShard.product_id == product_id)
+        .order_by(ProductStockShard.shard_no)
+    )
+    return list(result.scalars().all())
+
+async def sharded_product(client: AsyncClient, db_session, name: str, stock: int, shards: int) -> Product:
+    product = Product(name=name, price=4.00, stock_quantity=stock)
+    db_session.add(product)
+    await db_session.flush()
+    response = await client.put(f"/api/v1/products/{product.id}/stock-shards", json={"shard_count": shards})
+    assert response.status_code == 200
+    return product
+
+@pytest.mark.asyncio
+async def test_resharding_spreads_and_restores_total_stock(client: AsyncClient, db_session):
+    product = await sharded_product(client, db_session, "Viral Sneaker", stock=10, shards=4)
+
+    assert await shard_quantities(db_session, product.id) == [3, 3, 2, 2]
+    # Reads report the summed total, not the (now zero) product row
+    response = await client.get("/api/v1/products/search", params={"q": "Viral Sneaker"})
+    [item] = response.json()["items"]
+    assert item["stock_quantity"] == 10 and item["stock_shard_count"] == 4
+
+    response = await client.put(f"/api/v1/products/{product.id}/stock-shards", json={"shard_count": 0})
+    assert response.json()["stock_quantity"] == 10
+    assert await shard_quantities(db_session, product.id) == []
+    await db_session.refresh(product)
+    assert product.stock_quantity == 10
+
+@pytest.mark.asyncio
+async def test_order_decrements_a_single_shard(client: AsyncClient, db_session):
+    product = await sharded_product(client, db_session, "Hot Console", stock=8, shards=4)
+
+    response = await client.post("/api/v1/orders/", json={"items": [{"product_id": str(product.id), "quantity": 2}]})
+
+    assert response.status_code == 201
+    assert response.json()["items"][0]["price_at_order"] == "4.00"
+    quantities = await shard_quantities(db_session, product.id)
+    assert sorted(quantities) == [0, 2, 2, 2]
+
+@pytest.mark.asyncio
+async def test_order_larger_than_any_shard_draws_across_shards(client: AsyncClient, db_session):
+    product = await sharded_product(client, db_session, "Hot Headphones", stock=8, shards=4)
+    other = Product(name="Plain Cable", price=1.00, stock_quantity=5)
+    db_session.add(other)
+    await db_session.flush()
+
+    order = {"items": [
+        {"product_id": str(product.id), "quantity": 7},
+        {"product_id": str(other.id), "quantity": 1},
+    ]}
+    response = await client.post("/api/v1/orders/", json=order)
+    assert response.status_code == 201
+    assert await shard_quantities(db_session, product.id) == [0, 0, 0, 1]
+
+    # Stock is never oversold, even though it is spread over shards
+    response = await client.post("/api/v1/orders/", json={"items": [{"product_id": str(product.id), "quantity": 2}]})
+    assert response.status_code == 400
+    assert "Insufficient stock for Hot Headphones" in response.json()["detail"]
+    assert await shard_quantities(db_session, product.id) == [0, 0, 0, 1]
+
+@pytest.mark.asyncio
+async def test_batch_orders_use_shard_totals(client: AsyncClient, db_session):
+    product = await sharded_product(client, db_session, "Hot Batch Item", stock=5, shards=2)
+
+    results = await OrderService(db_session).create_orders_batch([
+        OrderCreate(items=[{"product_id": product.id, "quantity": 4}]),
+        OrderCreate(items=[{"product_id": product.id, "quantity": 2}]),
+    ])
+
+    assert [r.status_code for r in results] == [201, 400]
+    assert sum(await shard_quantities(db_session, product.id)) == 1
+
+@pytest.mark.asyncio
+async def test_import_sets_stock_of_sharded_product(client: AsyncClient, db_session):
+    product = await sharded_product(client, db_session, "Hot Import Item", stock=3, shards=2)
+
+    body = "name,price,stock_quantity\nHot Import Item,4.00,9\n"
+    response = await client.post("/api/v1/products/import", params={"format": "csv"}, content=body)
+
+    assert response.json()["updated"] == 1
+    assert await shard_quantities(db_session, product.id) == [5, 4]
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import pytest
+import uuid
+from sqlalchemy import delete, select
+from src.logistics.core.config import settings
+from src.logistics.models.order import Order, OrderItem
+from src.logistics.models.product import Product, ProductChange
+from src.logistics.schemas.order import OrderCreate
+from src.logistics.services.order_service import OrderService
+from src.logistics.services.stock_stream import (
+    STREAM_NOTIFICATIONS, StockBroadcaster, Subscription, sse_events,
+)
+
+@pytest.fixture
+async def broadcaster():
+    dsn = str(settings.SQLALCHEMY_TEST_DATABASE_URI).replace("postgresql+asyncpg://", "postgresql://", 1)
+    broadcaster = StockBroadcaster(dsn, max_subscribers=2)
+    broadcaster.start()
+    await asyncio.wait_for(broadcaster.listening.wait(), 5)
+    yield broadcaster
+    await broadcaster.stop()
+
+@pytest.fixture
+async def committed_product(db_session_factory):
+    async with db_session_factory() as session, session.begin():
+        product = Product(name="Streamed Console", price=300.00, stock_quantity=10)
+        session.add(product)
+    yield product
+    async with db_session_factory() as session, session.begin():
+        order_ids = select(OrderItem.order_id).where(OrderItem.product_id == product.id)
+        await session.execute(delete(Order).where(Order.id.in_(order_ids.scalar_subquery())))
+        await session.execute(delete(ProductChange).where(ProductChange.product_id == product.id))
+        await session.execute(delete(Product).where(Product.id == product.id))
+
+def test_slow_subscriber_keeps_only_latest_level_per_product():
+    first, second, third = (uuid.uuid4() for _ in range(3))
+    subscription = Subscription(max_pending=2)
+    subscription.offer(first, 5)
+    subscription.offer(first, 4)
+    subscription.offer(second, 9)
+    subscription.offer(third, 1)  # Over max_pending: the oldest pending product is dropped
+
+    assert list(asyncio.run(subscription.next_updates(0.1)).items()) == [(second, 9), (third, 1)]
+
+@pytest.mark.asyncio
+async def test_committed_orders_notify_once_per_product_per_transaction(
+    broadcaster, committed_product, db_session_factory, monkeypatch
+):
+    monkeypatch.setattr(settings, "PRODUCT_STOCK_STREAM_ENABLED", True)
+    watched = broadcaster.subscribe([committed_product.id])
+    unrelated = broadcaster.subscribe([uuid.uuid4()])
+    order_in = OrderCreate(items=[{"product_id": committed_product.id, "quantity": 2}])
+    received_before = STREAM_NOTIFICATIONS.value()
+
+    async with db_session_factory() as session, session.begin():
+        service = OrderService(session)
+        await service.create_order(order_in)
+        await service.create_order(order_in)
+    async with db_session_factory() as session:
+        with pytest.raises(RuntimeError):
+            async with session.begin():
+                await OrderService(session).create_order(order_in)
+                raise RuntimeError("rolled back")
+
+    assert await watched.next_updates(5) == {committed_product.id: 6}
+    await asyncio.sleep(0.2)
+    assert STREAM_NOTIFICATIONS.value() == received_before + 1
+    assert await unrelated.next_updates(0.01) == {}
+
+@pytest.mark.asyncio
+async def test_sse_events_render_updates_and_unsubscribe(broadcaster, committed_product):
+    subscription = broadcaster.subscribe()
+    assert broadcaster.subscribe() is not None and broadcaster.subscribe() is None  # max_subscribers=2
+    events = sse_events(broadcaster, subscription, keepalive_seconds=0.05)
+
+    assert await anext(events) == ": connected\n\n"
+    assert await anext(events) == ": keepalive\n\n"
+    broadcaster.publish(json.dumps({"id": str(committed_product.id), "stock_quantity": 3}))
+    message = await anext(events)
+    await events.aclose()
+
+    assert message.startswith("event: stock\ndata: ")
+    assert json.loads(message.split("data: ")[1]) == {"id": str(committed_product.id), "stock_quantity": 3}
+    assert subscription not in broadcaster._subscribers
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_is_off_unless_enabled(client):
+    response = await client.get("/api/v1/products/stream")
+    assert response.status_code == 404
@@ -0,0 +1,123 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from src.logistics.core.config import settings
+from src.logistics.db.session import SERVER_SETTINGS
+from src.logistics.db.transaction import (
+    DEFAULT_POLICY, TRANSACTION_FAILURES, TRANSACTION_RETRIES, TransactionPolicy, run_in_transaction,
+)
+
+class FakeDriverError(Exception):
+    def __init__(self, sqlstate: str):
+        super().__init__(f"sqlstate {sqlstate}")
+        self.sqlstate = sqlstate
+
+@pytest.mark.asyncio
+async def test_deadlock_is_retried_until_success(db_session):
+    attempts = []
+
+    async def work():
+        attempts.append(1)
+        await db_session.execute(text("SELECT 1"))
+        if len(attempts) == 1:
+            raise DBAPIError("UPDATE products ...", {}, FakeDriverError("40P01"))
+        return "done"
+
+    retries_before = TRANSACTION_RETRIES.value("test_deadlock", "deadlock")
+    assert await run_in_transaction(db_session, "test_deadlock", work) == "done"
+    assert len(attempts) == 2
+    assert TRANSACTION_RETRIES.value("test_deadlock", "deadlock") == retries_before + 1
+
+@pytest.mark.asyncio
+async def test_lock_timeout_exhausts_budget_with_503(db_session, db_engine):
+    policy = TransactionPolicy(lock_timeout_ms=50, max_attempts=3)
+
+    async def work():
+        await db_session.execute(text("SELECT pg_advisory_xact_lock(4242)"))
+
+    retries_before = TRANSACTION_RETRIES.value("test_lock_timeout", "lock_timeout")
+    failures_before = TRANSACTION_FAILURES.value("test_lock_timeout", "lock_timeout")
+    async with db_engine.connect() as holder:
+        await holder.execute(text("SELECT pg_advisory_lock(4242)"))
+        try:
+            with pytest.raises(HTTPException) as exc:
+                await run_in_transaction(db_session, "test_lock_timeout", work, policy)
+        finally:
+            await holder.execute(text("SELECT pg_advisory_unlock(4242)"))
+
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "1"
+    assert TRANSACTION_RETRIES.value("test_lock_timeout", "lock_timeout") == retries_before + 2
+    assert TRANSACTION_FAILURES.value("test_lock_timeout", "lock_timeout") == failures_before + 1
+
+@pytest.mark.asyncio
+async def test_default_policy_retries_a_lock_timeout(db_engine):
+    """With the shipped settings a lock timeout fits in the budget and gets another attempt."""
+    assert DEFAULT_POLICY.budget_ms > 2 * settings.DB_LOCK_TIMEOUT_MS
+
+    # Connections configured like the application's, so lock_timeout is the shipped default
+    app_engine = create_async_engine(
+        str(settings.SQLALCHEMY_TEST_DATABASE_URI), connect_args={"server_settings": SERVER_SETTINGS},
+    )
+    async with AsyncSession(app_engine) as session:
+        async def work():
+            await session.execute(text("SELECT pg_advisory_xact_lock(4243)"))
+            return "done"
+
+        retries_before = TRANSACTION_RETRIES.value("test_default_policy", "lock_timeout")
+        async with db_engine.connect() as holder:
+            await holder.execute(text("SELECT pg_advisory_lock(4243)"))
+
+            async def release_later():
+                # Outlast the first attempt's lock_timeout, then let the retry through
+                await asyncio.sleep(settings.DB_LOCK_TIMEOUT_MS / 1000 + 0.3)
+                await holder.execute(text("SELECT pg_advisory_unlock(4243)"))
+
+            release = asyncio.create_task(release_later())
+            try:
+                assert await run_in_transaction(session, "test_default_policy", work) == "done"
+            finally:
+                await release
+    await app_engine.dispose()
+
+    assert TRANSACTION_RETRIES.value("test_default_policy", "lock_timeout") == retries_before + 1
+
+@pytest.mark.asyncio
+async def test_savepoint_policy_does_not_leak_into_the_caller(db_session):
+    before = await db_session.scalar(text("SHOW lock_timeout"))
+
+    await run_in_transaction(
+        db_session, "test_savepoint_policy",
+        lambda: db_session.execute(text("SELECT 1")), TransactionPolicy(lock_timeout_ms=50),
+    )
+
+    assert await db_session.scalar(text("SHOW lock_timeout")) == before
+
+@pytest.mark.asyncio
+async def test_serialization_failure_is_not_retried_inside_a_savepoint(db_session):
+    """The enclosing transaction is doomed, so re-running only the savepoint cannot help."""
+    await db_session.execute(text("SELECT 1"))  # Open the enclosing transaction
+
+    async def work():
+        raise DBAPIError("SELECT ...", {}, FakeDriverError("40001"))
+
+    retries_before = TRANSACTION_RETRIES.value("test_serialization", "serialization_failure")
+    with pytest.raises(DBAPIError):
+        await run_in_transaction(db_session, "test_serialization", work)
+    assert TRANSACTION_RETRIES.value("test_serialization", "serialization_failure") == retries_before
+
+@pytest.mark.asyncio
+async def test_statement_timeout_answers_503_without_retry(db_session):
+    policy = TransactionPolicy(statement_timeout_ms=50)
+    failures_before = TRANSACTION_FAILURES.value("test_statement_timeout", "statement_timeout")
+
+    with pytest.raises(HTTPException) as exc:
+        await run_in_transaction(
+            db_session, "test_statement_timeout", lambda: db_session.execute(text("SELECT pg_sleep(1)")), policy
+        )
+
+    assert exc.value.status_code == 503
+    assert TRANSACTION_FAILURES.value("test_statement_timeout", "statement_timeout") == failures_before + 1